@@ -0,0 +1,72 @@
+"""Benchmark paginated Skript release fetching against a local stub server.
+
+The stub (tests/stub_api.py) serves N pages of GitHub-style releases with a
+``Link`` header and sleeps for a fixed latency on every request, emulating the round trip to
+api.github.com. Run with:
+
+    python benchmarks/bench_skript_pagination.py --pages 8 --latency 0.1
+"""
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+import requests
+from stub_api import StubAPI, github_releases
+from versions import SKRIPT, VersionCache, fetch_remaining_pages, fetch_versions
+
+
+def run(pages: int, latency: float, rounds: int) -> dict:
+    api = StubAPI(github_releases(pages), latency, "/releases")
+    url = api.url
+    source = SKRIPT._replace(url=url)
+    results = {}
+    try:
+        # Full fetch through fetch_versions(): parallel pages over one session
+        timings = []
+        for _ in range(rounds):
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = VersionCache(Path(tmp) / "versions.json")
+                start = time.perf_counter()
+                result = fetch_versions(source, cache, timeout=30)
+                timings.append(time.perf_counter() - start)
+        results["parallel"] = min(timings)
+        results["versions"] = len(result.versions)
+        results["prereleases"] = len(result.prereleases)
+
+        # Same pages walked one after another, for comparison
+        timings = []
+        for _ in range(rounds):
+            with requests.Session() as session:
+                start = time.perf_counter()
+                first = session.get(url, params=source.params, timeout=30)
+                fetch_remaining_pages(session, first, 30, workers=1)
+                timings.append(time.perf_counter() - start)
+        results["sequential"] = min(timings)
+    finally:
+        api.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1, help="injected per-request latency (s)")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.pages, args.latency, args.rounds)
+    rtt = args.latency
+    print(f"pages: {args.pages}, injected RTT: {rtt * 1000:.0f} ms, "
+          f"versions: {results['versions']} ({results['prereleases']} prereleases)")
+    print(f"sequential: {results['sequential'] * 1000:8.1f} ms ({results['sequential'] / rtt:.1f} RTT)")
+    print(f"parallel:   {results['parallel'] * 1000:8.1f} ms ({results['parallel'] / rtt:.1f} RTT)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Load-test the scaffold HTTP service (``main.py serve``) on localhost.
+
+Opens ``--concurrency`` keep-alive connections that POST addon configs to
+``/addon`` as fast as possible and reports latency percentiles and throughput.
+Without ``--url`` a server is started in offline mode on a free port. Run with:
+
+    python benchmarks/load_test.py --requests 5000 --concurrency 32
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def client(host: str, port: int, bodies, latencies, errors, archive_format: str):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            request = (f"POST /addon?format={archive_format} HTTP/1.1\r\nHost: {host}\r\n"
+                       f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n")[1:]:
+                name, _, value = line.partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0].decode())
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, total: int, concurrency: int, distinct: int, archive_format: str):
+    configs = [json.dumps({"addon_name": f"LoadAddon{i % distinct}",
+                           "package_name": f"com.example.load{i % distinct}"}).encode()
+               for i in range(total)]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, configs[i::concurrency], latencies, errors, archive_format)
+                           for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def start_server():
+    """Start an offline server on a free port and wait until it answers."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, str(ROOT / "src" / "main.py"), "--offline",
+                                "serve", "--port", str(port)], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="server to test, e.g. http://127.0.0.1:8080 (default: start one)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct", type=int, default=100, help="number of distinct configs sent")
+    parser.add_argument("--format", default="zip", choices=["zip", "tar.gz"])
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        process, port = start_server()
+        host = "127.0.0.1"
+    try:
+        latencies, errors, elapsed = asyncio.run(
+            run(host, port, args.requests, args.concurrency, args.distinct, args.format))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    print(f"requests: {len(latencies)}, concurrency: {args.concurrency}, errors: {len(errors)}")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1000:.2f} ms, "
+          f"p99: {percentile(latencies, 0.99) * 1000:.2f} ms, "
+          f"mean: {statistics.mean(latencies) * 1000:.2f} ms")
+    if errors:
+        print(f"first error: {errors[0]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
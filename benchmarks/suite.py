@@ -0,0 +1,262 @@
+"""Benchmark suite for every phase of creating an addon.
+
+Measures each Templates render, the full project render, writing the tree to
+disk, AddonCreator._init_git (single pass and step by step) and version
+fetching against a local stub API with injected latency. Everything runs
+offline. Save a baseline, then compare later runs against it:
+
+    python benchmarks/suite.py --save benchmarks/baseline.json
+    python benchmarks/suite.py --compare benchmarks/baseline.json --threshold 0.2
+"""
+from pathlib import Path
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from addon_creator import AddonCreator
+from elements import SKRIPT_TYPES, parse_element
+from project import AddonConfig, render_project, write_project
+from stub_api import StubAPI, github_releases
+from templates import Templates
+from versions import MINECRAFT, SKRIPT, VersionCache, fetch_all
+
+RESULTS_SCHEMA = 1
+
+CONFIG = AddonConfig(addon_name="BenchAddon", package_name="com.example.benchaddon")
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # Runs the measured operation `number` times and returns the seconds spent
+    # in it; setup and cleanup happen outside the timed region
+    run: Callable[[int], float]
+
+
+def template_benchmarks() -> List[Benchmark]:
+    """One benchmark per Templates method, bypassing its render cache."""
+    values = {
+        "addon_name": CONFIG.addon_name, "package_name": CONFIG.package_name, "impl": CONFIG.impl,
+        "java_version": CONFIG.java_version, "mc_version": CONFIG.mc_version,
+        "skript_version": CONFIG.skript_version,
+        "spec": parse_element({"kind": "effect", "class": "EffHeal", "patterns": ["heal %players% by %number%"]},
+                              SKRIPT_TYPES),
+    }
+    benchmarks = []
+    for name in sorted(vars(Templates)):
+        if not name.startswith("get_"):
+            continue
+        render = getattr(Templates, name).__wrapped__
+        arguments = render.__code__.co_varnames[:render.__code__.co_argcount]
+        # Options with defaults (Gradle switches, ...) keep their default value
+        kwargs = {argument: values[argument] for argument in arguments if argument in values}
+
+        def run(number, render=render, kwargs=kwargs):
+            start = time.perf_counter()
+            for _ in range(number):
+                render(**kwargs)
+            return time.perf_counter() - start
+
+        benchmarks.append(Benchmark(f"template.{name[4:]}", run))
+    return benchmarks
+
+
+def render_benchmark(number: int) -> float:
+    render = render_project.__wrapped__
+    start = time.perf_counter()
+    for _ in range(number):
+        render(CONFIG)
+    return time.perf_counter() - start
+
+
+def write_benchmark(number: int) -> float:
+    files = render_project(CONFIG)
+    elapsed = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        for index in range(number):
+            start = time.perf_counter()
+            write_project(files, Path(tmp) / str(index))
+            elapsed += time.perf_counter() - start
+    return elapsed
+
+
+@contextmanager
+def silenced():
+    """Send the output of child processes (the git commands) to /dev/null."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        os.dup2(devnull.fileno(), 2)
+    try:
+        yield
+    finally:
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in saved:
+            os.close(fd)
+
+
+def git_benchmark(single_pass: bool) -> Callable[[int], float]:
+    files = render_project(CONFIG)
+    creator = AddonCreator(offline=True)
+
+    def run(number):
+        elapsed = 0.0
+        for _ in range(number):
+            with tempfile.TemporaryDirectory() as tmp:
+                base = Path(tmp) / CONFIG.addon_name
+                write_project(files, base)
+                with silenced():
+                    start = time.perf_counter()
+                    initialized = creator._init_git(base, files if single_pass else None)
+                    elapsed += time.perf_counter() - start
+                if not initialized:
+                    raise RuntimeError("git initialization failed")
+        return elapsed
+
+    return run
+
+
+def make_stub_apis(latency: float, pages: int = 4, per_page: int = 100) -> List[StubAPI]:
+    """Paper- and GitHub-shaped version APIs whose every request sleeps ``latency`` seconds."""
+    paper = {"versions": [f"1.{minor}.{patch}" for minor in range(8, 21) for patch in range(5)]}
+    return [StubAPI([paper], latency, "/paper"), StubAPI(github_releases(pages, per_page), latency, "/releases")]
+
+
+def fetch_benchmark(apis: List[StubAPI], revalidate: bool) -> Callable[[int], float]:
+    paper, releases = apis
+    sources = [MINECRAFT._replace(url=paper.url), SKRIPT._replace(url=releases.url)]
+
+    def run(number):
+        elapsed = 0.0
+        for _ in range(number):
+            with tempfile.TemporaryDirectory() as tmp:
+                # ttl=0: a cached entry is always revalidated
+                cache = VersionCache(Path(tmp) / "versions.json", ttl=0)
+                if revalidate:
+                    fetch_all(sources, cache, budget=30)
+                start = time.perf_counter()
+                report = fetch_all(sources, cache, budget=30)
+                elapsed += time.perf_counter() - start
+            if any(result.degraded for result in report.values()):
+                raise RuntimeError("stub server did not answer")
+        return elapsed
+
+    return run
+
+
+def collect(latency: float) -> List[Benchmark]:
+    benchmarks = template_benchmarks()
+    benchmarks.append(Benchmark("render.project", render_benchmark))
+    benchmarks.append(Benchmark("write.project", write_benchmark))
+    if shutil.which("git"):
+        benchmarks.append(Benchmark("git.init_single_pass", git_benchmark(True)))
+        benchmarks.append(Benchmark("git.init_commands", git_benchmark(False)))
+    else:
+        print("skipping git benchmarks: git not found", file=sys.stderr)
+    try:
+        import requests  # noqa: F401
+    except ImportError:
+        print("skipping fetch benchmarks: requests not installed", file=sys.stderr)
+    else:
+        apis = make_stub_apis(latency)
+        benchmarks.append(Benchmark("fetch.cold", fetch_benchmark(apis, revalidate=False)))
+        benchmarks.append(Benchmark("fetch.revalidate", fetch_benchmark(apis, revalidate=True)))
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, rounds: int, min_time: float) -> Dict[str, float]:
+    """Time one call of a benchmark, like timeit: calibrate, then repeat."""
+    number = 1
+    while True:
+        elapsed = benchmark.run(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    samples = [benchmark.run(number) / number for _ in range(rounds)]
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "stdev_ms": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1000,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print the change against a baseline and return the regressed benchmarks."""
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<32} {'-':>12} {result['median_ms']:>12.4f} {'new':>8}")
+            continue
+        before = baseline[name]["median_ms"]
+        change = result["median_ms"] / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32} {before:>12.4f} {result['median_ms']:>12.4f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", default="*", help="only run benchmarks matching this glob")
+    parser.add_argument("--rounds", type=int, default=7, help="samples per benchmark (default: 7)")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="minimum duration of one sample in seconds (default: 0.05)")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="injected stub API latency per request in seconds (default: 0.02)")
+    parser.add_argument("--save", type=Path, metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, metavar="FILE", help="compare the results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown of the median counted as a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    results = {}
+    for benchmark in collect(args.latency):
+        if not fnmatch.fnmatch(benchmark.name, args.filter):
+            continue
+        result = results[benchmark.name] = measure(benchmark, args.rounds, args.min_time)
+        print(f"{benchmark.name:<32} median {result['median_ms']:>10.4f} ms  "
+              f"min {result['min_ms']:>10.4f} ms  (x{result['number']}, {args.rounds} rounds)")
+
+    if args.save:
+        args.save.write_text(json.dumps({
+            "schema": RESULTS_SCHEMA,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency": args.latency,
+            "results": results,
+        }, indent=2) + "\n", encoding="utf-8")
+        print(f"\nresults saved to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("schema") != RESULTS_SCHEMA:
+            sys.exit(f"unsupported baseline schema: {baseline.get('schema')}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nno regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,33 @@
 from pathlib import Path
-import requests
 import json
-from typing import List, Dict
+from typing import List, Dict, Mapping, Optional
 import sys
-from colorama import init, Fore, Style
-import inquirer
-from inquirer import themes
+from colorama import Fore, Style
 import re
-import subprocess
+from versions import (MINECRAFT, SKRIPT, STATUS_DEFAULT, DEFAULT_CACHE_TTL, DEFAULT_FETCH_BUDGET,
+                      VersionCache, fetch_all)
+from compatibility import CompatibilityMatrix, default_matrix
+from tracing import span
+from version_index import VersionIndex
 
-# Initialize colorama for colored output
-init()
+# inquirer, the Git writer and the templates are imported where they are first
+# needed, so creating an AddonCreator stays cheap
 
 class AddonCreator:
-    def __init__(self):
+    # Available implementations
+    available_impls = ["paper", "purpur", "spigot", "leaf"]
+
+    # Available Java versions
+    available_java_versions = ["8", "11", "17", "21"]
+
+    # Available Git branches
+    available_branches = ["main", "master", "dev", "development"]
+
+    # Most versions offered at once by the version picker
+    version_choices = 15
+
+    def __init__(self, refresh_versions: bool = False, offline: bool = False,
+                 cache_ttl: float = DEFAULT_CACHE_TTL, fetch_budget: float = DEFAULT_FETCH_BUDGET):
         self.addon_name = ""
         self.package_name = ""
         self.impl = ""
@@ -24,42 +38,100 @@ class AddonCreator:
         self.git_url = ""
         self.primary_branch = "main"
         self.init_new_repo = False
-        
-        # Available implementations
-        self.available_impls = ["paper", "purpur", "spigot", "leaf"]
-        
-        # Available Java versions
-        self.available_java_versions = ["8", "11", "17", "21"]
-        
-        # Available Git branches
-        self.available_branches = ["main", "master", "dev", "development"]
-        
-        # Load available versions
-        self.mc_versions = self._fetch_minecraft_versions()
-        self.skript_versions = self._fetch_skript_versions()
 
-        # Custom theme for inquirer
-        self.theme = themes.GreenPassion()
+        # Version list cache
+        self.refresh_versions = refresh_versions
+        self.offline = offline
+        self.version_cache = VersionCache(ttl=cache_ttl)
+        self.fetch_budget = fetch_budget
 
-    def _fetch_minecraft_versions(self) -> List[str]:
-        """Load available Minecraft versions from Paper API."""
-        try:
-            response = requests.get("https://api.papermc.io/v2/projects/paper")
-            data = response.json()
-            return [version for version in data["versions"]]
-        except:
-            print(f"{Fore.RED}Error loading Minecraft versions. Using default versions.{Style.RESET_ALL}")
-            return ["1.20.4", "1.20.2", "1.19.4", "1.18.2"]
-
-    def _fetch_skript_versions(self) -> List[str]:
-        """Load available Skript versions from GitHub API."""
-        try:
-            response = requests.get("https://api.github.com/repos/SkriptLang/Skript/releases")
-            data = response.json()
-            return [release["tag_name"].replace("v", "") for release in data]
-        except:
-            print(f"{Fore.RED}Error loading Skript versions. Using default versions.{Style.RESET_ALL}")
-            return ["2.7.3", "2.7.2", "2.7.1"]
+        # Available versions, loaded when a prompt first needs them
+        self._version_report = None
+        self._indexes = {}
+        self._compatibility = None
+
+        # Custom theme for inquirer, created with the first prompt
+        self._theme = None
+
+    @property
+    def version_report(self):
+        """Per-source outcome of loading the version lists."""
+        if self._version_report is None:
+            self._version_report = self._load_versions()
+        return self._version_report
+
+    @property
+    def mc_versions(self) -> List[str]:
+        return self.version_report[MINECRAFT.name].versions
+
+    @property
+    def skript_versions(self) -> List[str]:
+        return self.version_report[SKRIPT.name].versions
+
+    @property
+    def skript_prereleases(self) -> set:
+        return set(self.version_report[SKRIPT.name].prereleases)
+
+    @property
+    def mc_index(self) -> VersionIndex:
+        if "mc" not in self._indexes:
+            self._indexes["mc"] = VersionIndex(self.mc_versions)
+        return self._indexes["mc"]
+
+    @property
+    def skript_index(self) -> VersionIndex:
+        if "skript" not in self._indexes:
+            self._indexes["skript"] = VersionIndex(self.skript_versions, self.skript_prereleases)
+        return self._indexes["skript"]
+
+    @property
+    def compatibility(self) -> CompatibilityMatrix:
+        """Compatibility matrix, precomputed for every known Minecraft version."""
+        if self._compatibility is None:
+            self._compatibility = default_matrix()
+            self._compatibility.precompute(self.mc_versions)
+        return self._compatibility
+
+    def compatible_skript_index(self, mc_version: str, java_version: str) -> VersionIndex:
+        """Index of the Skript versions that work with the chosen Minecraft and Java versions.
+
+        Built once per distinct set of supported Skript lines, which few
+        Minecraft versions differ in.
+        """
+        matrix = self.compatibility
+        key = ("skript", matrix.for_minecraft(mc_version).skript_lines, java_version)
+        if key not in self._indexes:
+            versions = [version for version in self.skript_versions
+                        if matrix.supports_skript(mc_version, version, java_version)]
+            self._indexes[key] = VersionIndex(versions, self.skript_prereleases)
+        return self._indexes[key]
+
+    @property
+    def theme(self):
+        if self._theme is None:
+            from inquirer import themes
+            self._theme = themes.GreenPassion()
+        return self._theme
+
+    def _load_versions(self):
+        """Load Minecraft (Paper API) and Skript (GitHub API) versions concurrently."""
+        with span("load versions", "versions"):
+            report = fetch_all([MINECRAFT, SKRIPT], self.version_cache, refresh=self.refresh_versions,
+                               offline=self.offline, budget=self.fetch_budget)
+        for label, source in (("Minecraft", MINECRAFT), ("Skript", SKRIPT)):
+            result = report[source.name]
+            if not result.degraded or (self.offline and result.status != STATUS_DEFAULT):
+                continue
+            if self.offline:
+                reason = "offline, no cache"
+            elif result.timed_out:
+                reason = f"no answer within {self.fetch_budget:g}s"
+            else:
+                reason = "request failed"
+            fallback = "default" if result.status == STATUS_DEFAULT else "cached"
+            color = Fore.RED if result.status == STATUS_DEFAULT else Fore.YELLOW
+            print(f"{color}Error loading {label} versions ({reason}). Using {fallback} versions.{Style.RESET_ALL}")
+        return report
 
     def _print_header(self):
         """Print program header."""
@@ -68,31 +140,52 @@ class AddonCreator:
 
     def _get_input(self, prompt: str, options: List[str] = None) -> str:
         """Get user input with optional choices."""
-        if options:
-            questions = [
-                inquirer.List('choice',
-                    message=prompt,
-                    choices=options,
-                    carousel=True
-                )
-            ]
-            answers = inquirer.prompt(questions, theme=self.theme)
-            return answers['choice']
-        else:
-            questions = [
-                inquirer.Text('input',
-                    message=prompt
-                )
-            ]
-            answers = inquirer.prompt(questions, theme=self.theme)
-            return answers['input']
-
-    def _validate_package_name(self, package: str) -> bool:
+        import inquirer
+        with span("prompt", "prompt", message=prompt):
+            if options:
+                questions = [
+                    inquirer.List('choice',
+                        message=prompt,
+                        choices=options,
+                        carousel=True
+                    )
+                ]
+                answers = inquirer.prompt(questions, theme=self.theme)
+                return answers['choice']
+            else:
+                questions = [
+                    inquirer.Text('input',
+                        message=prompt
+                    )
+                ]
+                answers = inquirer.prompt(questions, theme=self.theme)
+                return answers['input']
+
+    def _select_version(self, label: str, index: VersionIndex) -> str:
+        """Ask for a version: type a prefix (or nothing), then pick from the matches.
+
+        Only the few best matches are listed, so the list stays short however
+        many versions exist.
+        """
+        while True:
+            query = self._get_input(f"{label} version (type to filter; empty for the newest)").strip()
+            if query in index:
+                return query
+            matches = index.search(query, limit=self.version_choices)
+            if len(matches) == 1:
+                return matches[0]
+            if matches:
+                return self._get_input(f"{label} version", matches)
+            print(f"{Fore.RED}No {label} version matches '{query}'.{Style.RESET_ALL}")
+
+    @staticmethod
+    def _validate_package_name(package: str) -> bool:
         """Validate package name."""
         parts = package.split(".")
         return all(part.isalnum() for part in parts)
 
-    def _validate_addon_name(self, name: str) -> bool:
+    @staticmethod
+    def _validate_addon_name(name: str) -> bool:
         """Validate addon name."""
         return name.isalnum() and name[0].isalpha()
 
@@ -119,58 +212,52 @@ class AddonCreator:
         ]
         return any(re.match(pattern, url) for pattern in patterns)
 
-    def _init_git(self, base_path: Path):
-        """Initialize Git repository."""
+    def _init_git(self, base_path: Path, files: Optional[Mapping[str, bytes]] = None):
+        """Initialize Git repository.
+
+        With the rendered ``files`` the initial commit is written in a single
+        pass; the step-by-step git commands are used otherwise or as fallback.
+        """
+        import shutil
+        import subprocess
+        from gitrepo import FastPathUnavailable, create_repository
+        from templates import Templates
+
+        gitignore = Templates.get_gitignore().encode("utf-8")
+        with span("write", "write", path=".gitignore", bytes=len(gitignore)):
+            (base_path / ".gitignore").write_bytes(gitignore)
+        if files is not None:
+            try:
+                create_repository(base_path, {**files, ".gitignore": gitignore},
+                                  self.primary_branch, self.git_url)
+                return True
+            except (FastPathUnavailable, OSError, subprocess.CalledProcessError):
+                # Start over with the regular commands
+                shutil.rmtree(base_path / ".git", ignore_errors=True)
+        return self._init_git_commands(base_path)
+
+    def _init_git_commands(self, base_path: Path):
+        """Initialize Git repository with one git command per step."""
+        import subprocess
+
+        def git(*args):
+            with span(f"git {args[0]}", "git"):
+                subprocess.run(['git', *args], cwd=base_path, check=True)
+
         try:
             # Initialize Git
-            subprocess.run(['git', 'init'], cwd=base_path, check=True)
+            git('init')
             
             # Set primary branch
-            subprocess.run(['git', 'branch', '-M', self.primary_branch], cwd=base_path, check=True)
+            git('branch', '-M', self.primary_branch)
             
             # Add remote origin
             if self.git_url:
-                subprocess.run(['git', 'remote', 'add', 'origin', self.git_url], cwd=base_path, check=True)
-            
-            # Create .gitignore
-            gitignore_content = """\
-# Gradle
-.gradle/
-build/
-!gradle/wrapper/gradle-wrapper.jar
-
-# IntelliJ IDEA
-.idea/
-*.iml
-*.iws
-*.ipr
-
-# Eclipse
-.classpath
-.project
-.settings/
-
-# VS Code
-.vscode/
-
-# Compiled files
-*.class
-*.jar
-*.war
-*.ear
-
-# Logs
-*.log
-
-# OS specific
-.DS_Store
-Thumbs.db
-"""
-            (base_path / ".gitignore").write_text(gitignore_content)
+                git('remote', 'add', 'origin', self.git_url)
             
             # First commit
-            subprocess.run(['git', 'add', '.'], cwd=base_path, check=True)
-            subprocess.run(['git', 'commit', '-m', 'Initial commit'], cwd=base_path, check=True)
+            git('add', '.')
+            git('commit', '-m', 'Initial commit')
             
             return True
         except subprocess.CalledProcessError as e:
@@ -198,14 +285,22 @@ Thumbs.db
         # Implementation
         self.impl = self._get_input("Implementation", self.available_impls)
 
-        # Java version
-        self.java_version = self._get_input("Java version", self.available_java_versions)
-
         # Minecraft version
-        self.mc_version = self._get_input("Minecraft version", self.mc_versions)
+        self.mc_version = self._select_version("Minecraft", self.mc_index)
+
+        # Java version, only those that can build for the Minecraft version
+        java_versions = self.compatibility.java_choices(self.mc_version, self.available_java_versions)
+        self.java_version = self._get_input("Java version", java_versions or self.available_java_versions)
 
-        # Skript version
-        self.skript_version = self._get_input("Skript version", self.skript_versions)
+        # Skript version, only those supporting the Minecraft and Java versions
+        skript_index = self.compatible_skript_index(self.mc_version, self.java_version)
+        if not len(skript_index):
+            print(f"{Fore.YELLOW}No known Skript version supports Minecraft {self.mc_version} "
+                  f"with Java {self.java_version}; showing all versions.{Style.RESET_ALL}")
+            skript_index = self.skript_index
+        self.skript_version = self._select_version("Skript", skript_index)
+        for warning in self.compatibility.warnings(self.mc_version, self.java_version, self.skript_version):
+            print(f"{Fore.YELLOW}{warning}.{Style.RESET_ALL}")
 
         # Git configuration
         self.use_git = self._get_input("Do you want to initialize Git repository?", ["Yes", "No"]) == "Yes"
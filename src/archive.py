@@ -0,0 +1,91 @@
+import io
+from typing import BinaryIO, Mapping
+
+ARCHIVE_FORMATS = ("zip", "tar.gz")
+
+# Every entry gets the same timestamp so identical projects give identical bytes;
+# 1980-01-01 is the earliest date a zip file can store
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+TAR_MTIME = 315532800
+
+FILE_MODE = 0o644
+EXECUTABLE_MODE = 0o755
+
+# Project files that must stay executable, like the Gradle wrapper script
+EXECUTABLE_PATHS = frozenset({"gradlew"})
+
+
+def archive_format_for(target: str, default: str = "zip") -> str:
+    """Guess the archive format from a file name."""
+    if target.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if target.endswith(".zip"):
+        return "zip"
+    return default
+
+
+def _mode(path: str) -> int:
+    return EXECUTABLE_MODE if path in EXECUTABLE_PATHS else FILE_MODE
+
+
+class _Stream(io.RawIOBase):
+    """Write-only view of an output that hides whether it can seek."""
+
+    def __init__(self, out: BinaryIO):
+        super().__init__()
+        self.out = out
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.out.write(data)
+        return len(data)
+
+
+def write_zip(files: Mapping[str, bytes], out: BinaryIO, root: str = ""):
+    """Stream a rendered project into a reproducible zip archive.
+
+    Works on non-seekable outputs such as pipes and sockets. zipfile lays
+    out entries differently when it can seek back, so every output is
+    written as a stream and a file gets the same bytes as a pipe.
+    """
+    import zipfile
+
+    prefix = f"{root.strip('/')}/" if root else ""
+    with zipfile.ZipFile(_Stream(out), "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in sorted(files):
+            info = zipfile.ZipInfo(prefix + path, date_time=ZIP_DATE_TIME)
+            info.create_system = 3  # Unix, so permissions are stored the same everywhere
+            info.external_attr = (0o100000 | _mode(path)) << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, files[path])
+
+
+def write_tar_gz(files: Mapping[str, bytes], out: BinaryIO, root: str = ""):
+    """Stream a rendered project into a reproducible tar.gz archive."""
+    import gzip
+    import tarfile
+
+    prefix = f"{root.strip('/')}/" if root else ""
+    # tarfile's own gzip stream stamps the current time into the header
+    with gzip.GzipFile(filename="", mode="wb", fileobj=out, mtime=0) as compressed:
+        with tarfile.open(fileobj=compressed, mode="w|", format=tarfile.PAX_FORMAT) as archive:
+            for path in sorted(files):
+                info = tarfile.TarInfo(prefix + path)
+                info.size = len(files[path])
+                info.mtime = TAR_MTIME
+                info.mode = _mode(path)
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                archive.addfile(info, io.BytesIO(files[path]))
+
+
+def write_archive(files: Mapping[str, bytes], out: BinaryIO, archive_format: str = "zip", root: str = ""):
+    """Stream a rendered project into ``out`` as ``zip`` or ``tar.gz``."""
+    if archive_format == "zip":
+        write_zip(files, out, root)
+    elif archive_format == "tar.gz":
+        write_tar_gz(files, out, root)
+    else:
+        raise ValueError(f"Archive format must be one of: {', '.join(ARCHIVE_FORMATS)}")
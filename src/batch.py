@@ -0,0 +1,214 @@
+from pathlib import Path
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from colorama import Fore, Style
+from addon_creator import AddonCreator
+from compatibility import default_matrix
+from gradle_wrapper import with_wrapper
+from project import STRING_FIELDS, AddonConfig, render_project, write_project
+from version_index import VersionIndex
+from versions import MINECRAFT, SKRIPT, FetchResult, version_key
+
+# Config fields a manifest entry may set
+CONFIG_FIELDS = {field.name for field in fields(AddonConfig)}
+CONFIG_DEFAULTS = {field.name: field.default for field in fields(AddonConfig)}
+
+# Fields naming a version; left empty, version resolution would pick one
+VERSION_FIELDS = ("java_version", "mc_version", "skript_version")
+
+# Default versions and version indexes shared by every job of a worker
+# process, set by _init_worker()
+_shared_versions = {}
+_shared_indexes = {}
+
+
+class JobResult(NamedTuple):
+    name: str
+    path: str
+    ok: bool
+    elapsed: float
+    error: Optional[str] = None
+    warnings: Tuple[str, ...] = ()
+
+
+def load_manifest(path: Path) -> List[dict]:
+    """Read a JSON or TOML batch manifest.
+
+    The manifest is either a list of addon entries or a table with an
+    ``addons`` list and optional ``defaults`` applied to every entry.
+    """
+    path = Path(path)
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+    else:
+        data = json.loads(path.read_text(encoding="utf-8"))
+
+    if isinstance(data, list):
+        data = {"addons": data}
+    defaults = data.get("defaults", {})
+    addons = data.get("addons")
+    if not isinstance(addons, list):
+        raise ValueError("Manifest must contain an 'addons' list")
+    return [{**defaults, **entry} for entry in addons]
+
+
+def default_versions(results: Dict[str, FetchResult]) -> Dict[str, str]:
+    """Pick the version used by entries that don't set one."""
+    mc_versions = results[MINECRAFT.name].versions or MINECRAFT.defaults
+    skript = results[SKRIPT.name]
+    stable = [version for version in skript.versions if version not in skript.prereleases]
+    return {
+        "mc_version": max(mc_versions, key=version_key),
+        "skript_version": max(stable or skript.versions or SKRIPT.defaults, key=version_key),
+    }
+
+
+def version_indexes(results: Dict[str, FetchResult]) -> Dict[str, VersionIndex]:
+    """Index the fetched version lists by the config field they validate."""
+    skript = results[SKRIPT.name]
+    return {
+        "mc_version": VersionIndex(results[MINECRAFT.name].versions or MINECRAFT.defaults),
+        "skript_version": VersionIndex(skript.versions or SKRIPT.defaults, skript.prereleases),
+    }
+
+
+def check_values(values: dict):
+    """Reject mistyped or empty version values before versions are resolved and fitted."""
+    for name in STRING_FIELDS:
+        if name in values and not isinstance(values[name], str):
+            raise ValueError(f"{name} must be a string")
+    for name in VERSION_FIELDS:
+        if name in values and not values[name].strip():
+            raise ValueError(f"{name} must not be empty")
+
+
+def resolve_versions(values: dict, indexes: Dict[str, VersionIndex]) -> dict:
+    """Replace release lines such as ``"1.20"`` by their newest stable version.
+
+    Versions the index doesn't know are passed through unchanged.
+    """
+    resolved = dict(values)
+    for field, index in indexes.items():
+        if isinstance(resolved.get(field), str):
+            resolved[field] = index.resolve(resolved[field]) or resolved[field]
+    return resolved
+
+
+def fit_versions(values: dict, given: Iterable[str], indexes: Dict[str, VersionIndex]) -> dict:
+    """Choose a Java and Skript version that work with the Minecraft version,
+    unless the caller set them in ``given``.
+
+    Explicitly set combinations are left alone, so validation can reject them.
+    """
+    matrix = default_matrix()
+    values = dict(values)
+    mc_version = values.get("mc_version") or CONFIG_DEFAULTS["mc_version"]
+    java_version = values.get("java_version", CONFIG_DEFAULTS["java_version"])
+    if "java_version" not in given:
+        choices = matrix.java_choices(mc_version, AddonCreator.available_java_versions)
+        if choices and java_version not in choices:
+            java_version = values["java_version"] = choices[0]
+    skript_version = values.get("skript_version", CONFIG_DEFAULTS["skript_version"])
+    if ("skript_version" not in given and "skript_version" in indexes
+            and not matrix.supports_skript(mc_version, skript_version, java_version)):
+        values["skript_version"] = next(
+            (version for version in indexes["skript_version"].stable()
+             if matrix.supports_skript(mc_version, version, java_version)), skript_version)
+    return values
+
+
+def target_dir(output_dir: Path, path: str) -> Path:
+    """Resolve an entry's project directory, which must lie inside ``output_dir``."""
+    root = Path(output_dir).resolve()
+    target = (root / path).resolve()
+    if root not in target.parents:
+        raise ValueError(f"path {path!r} is not inside the output directory {root}")
+    return target
+
+
+def _init_worker(versions: Dict[str, str], indexes: Optional[Dict[str, VersionIndex]] = None):
+    global _shared_versions, _shared_indexes
+    _shared_versions = versions
+    _shared_indexes = indexes or {}
+
+
+def run_job(job: dict) -> JobResult:
+    """Render and write a single manifest entry, never raising."""
+    start = time.perf_counter()
+    entry = dict(job["entry"])
+    name = str(entry.get("addon_name", f"#{job['index']}"))
+    path = str(entry.pop("path", name))
+    target = Path(job["output_dir"]) / path
+    try:
+        target = target_dir(job["output_dir"], path)
+        unknown = set(entry) - CONFIG_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown manifest keys: {', '.join(sorted(unknown))}")
+        check_values(entry)
+        values = resolve_versions({**_shared_versions, **entry}, _shared_indexes)
+        config = AddonConfig(**fit_versions(values, entry, _shared_indexes))
+        warnings = tuple(default_matrix().validate(config))
+        if target.exists() and any(target.iterdir()) and not job["force"]:
+            raise FileExistsError(f"{target} already exists and is not empty")
+        files = render_project(config)
+        if job["wrapper"]:
+            files = with_wrapper(files)
+        write_project(files, target)
+        return JobResult(name, str(target), True, time.perf_counter() - start, warnings=warnings)
+    except Exception as e:
+        return JobResult(name, str(target), False, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+
+def run_batch(entries: List[dict], output_dir: Path, versions: Dict[str, str],
+              workers: Optional[int] = None, force: bool = False,
+              indexes: Optional[Dict[str, VersionIndex]] = None, wrapper: bool = True) -> List[JobResult]:
+    """Scaffold every manifest entry across a process pool.
+
+    Failed jobs are reported in the results without stopping the others.
+    With ``indexes``, versions given as a release line ("1.20") are resolved
+    to the newest stable version of that line. With ``wrapper``, every
+    project gets the cached Gradle wrapper, if there is one.
+    """
+    jobs = [{"index": index, "entry": entry, "output_dir": str(output_dir), "force": force, "wrapper": wrapper}
+            for index, entry in enumerate(entries)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker(versions, indexes)
+        return [run_job(job) for job in jobs]
+
+    # Hand jobs out in chunks so per-task IPC stays small next to the work itself
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(versions, indexes)) as executor:
+        return list(executor.map(run_job, jobs, chunksize=chunksize))
+
+
+def print_report(results: List[JobResult], elapsed: float, verbose: bool = True):
+    """Print per-job timings and a summary."""
+    failed = [result for result in results if not result.ok]
+    if verbose:
+        for result in results:
+            if result.ok:
+                print(f"{Fore.GREEN}[+] {result.name}{Style.RESET_ALL} {result.elapsed * 1000:.1f} ms -> {result.path}")
+    for result in results:
+        for warning in result.warnings:
+            print(f"{Fore.YELLOW}[!] {result.name}: {warning}{Style.RESET_ALL}")
+    for result in failed:
+        print(f"{Fore.RED}[-] {result.name}: {result.error}{Style.RESET_ALL}")
+
+    total = sum(result.elapsed for result in results)
+    print(f"\n{Fore.CYAN}[*] {len(results) - len(failed)}/{len(results)} addons created in {elapsed:.2f}s "
+          f"({total:.2f}s of job time){Style.RESET_ALL}")
+
+
+def write_report(results: List[JobResult], path: Path):
+    """Write the job results as JSON."""
+    Path(path).write_text(json.dumps([result._asdict() for result in results], indent=2), encoding="utf-8")
@@ -0,0 +1,173 @@
+from pathlib import Path
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+from versions import user_cache_dir
+
+# Layout version of compatibility.json; bump when the structure changes
+COMPAT_SCHEMA = 1
+
+# Matrix shipped with the tool
+BUNDLED_MATRIX = Path(__file__).resolve().parent / "compatibility.json"
+
+
+class CompatibilityError(ValueError):
+    """The chosen Minecraft, Java and Skript versions can't build together."""
+
+
+class SkriptLine(NamedTuple):
+    line: str                  # "2.7"
+    minecraft: tuple           # (lowest, highest) supported Minecraft version, inclusive
+    java: int                  # lowest Java version
+
+
+class MinecraftCompat(NamedTuple):
+    min_java: int
+    skript_lines: FrozenSet[str]   # Skript lines known to support this version
+
+
+def _numbers(version: str) -> tuple:
+    core = re.match(r"\d+(\.\d+)*", version)
+    return tuple(int(part) for part in core.group().split(".")) if core else ()
+
+
+def skript_line(version: str) -> str:
+    """Return the release line of a Skript version, e.g. ``2.7.3`` -> ``2.7``."""
+    return ".".join(str(part) for part in _numbers(version)[:2])
+
+
+def cached_matrix_path() -> Path:
+    return user_cache_dir() / "compatibility.json"
+
+
+class CompatibilityMatrix:
+    """Minimum Java and supported Skript lines per Minecraft version.
+
+    The answer for a Minecraft version is worked out once and memoized;
+    precompute() fills the table for a whole version list up front, so the
+    prompts only do dictionary lookups.
+    """
+
+    def __init__(self, data: dict):
+        if data.get("schema") != COMPAT_SCHEMA:
+            raise ValueError(f"Unsupported compatibility matrix schema: {data.get('schema')}")
+        self.updated = str(data.get("updated", ""))
+        try:
+            # Newest first, so the first row at or below a version applies
+            self._java = sorted(((_numbers(row["minecraft"]), int(row["java"])) for row in data["java"]),
+                                reverse=True)
+            self.skript = {row["skript"]: SkriptLine(row["skript"], tuple(_numbers(v) for v in row["minecraft"]),
+                                                     int(row.get("java", 8)))
+                           for row in data["skript"]}
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid compatibility matrix: {e}") from None
+        self._by_minecraft: Dict[str, MinecraftCompat] = {}
+        self._lock = threading.Lock()
+
+    def precompute(self, mc_versions: Iterable[str]):
+        """Fill the lookup table for every given Minecraft version."""
+        for version in mc_versions:
+            self.for_minecraft(version)
+
+    def for_minecraft(self, mc_version: str) -> MinecraftCompat:
+        compat = self._by_minecraft.get(mc_version)
+        if compat is None:
+            numbers = _numbers(mc_version)
+            min_java = next((java for lowest, java in self._java if numbers >= lowest), 8)
+            lines = frozenset(line.line for line in self.skript.values()
+                              if line.minecraft[0] <= numbers <= line.minecraft[1])
+            compat = MinecraftCompat(min_java, lines)
+            with self._lock:
+                self._by_minecraft[mc_version] = compat
+        return compat
+
+    def java_choices(self, mc_version: str, java_versions: Iterable[str]) -> List[str]:
+        """The Java versions that can build for ``mc_version``."""
+        min_java = self.for_minecraft(mc_version).min_java
+        return [java for java in java_versions if int(java) >= min_java]
+
+    def supports_skript(self, mc_version: str, skript_version: str, java_version: Optional[str] = None) -> bool:
+        """Whether a Skript version works with a Minecraft (and Java) version.
+
+        Skript lines missing from the matrix are assumed to be compatible;
+        warnings() flags them.
+        """
+        line = self.skript.get(skript_line(skript_version))
+        if line is None:
+            return True
+        if java_version is not None and int(java_version) < line.java:
+            return False
+        return line.line in self.for_minecraft(mc_version).skript_lines
+
+    def problems(self, mc_version: str, java_version: str, skript_version: str) -> List[str]:
+        """Explain every incompatibility between the three versions."""
+        problems = []
+        min_java = self.for_minecraft(mc_version).min_java
+        if int(java_version) < min_java:
+            problems.append(f"Minecraft {mc_version} needs Java {min_java} or newer (got Java {java_version})")
+        line = self.skript.get(skript_line(skript_version))
+        if line is not None:
+            if line.line not in self.for_minecraft(mc_version).skript_lines:
+                low, high = (".".join(map(str, bound)) for bound in line.minecraft)
+                problems.append(f"Skript {skript_version} supports Minecraft {low} to {high} (got {mc_version})")
+            if int(java_version) < line.java:
+                problems.append(f"Skript {skript_version} needs Java {line.java} or newer (got Java {java_version})")
+        return problems
+
+    def warnings(self, mc_version: str, java_version: str, skript_version: str) -> List[str]:
+        """Name every guess made about the three versions."""
+        if skript_line(skript_version) in self.skript:
+            return []
+        return [f"Skript {skript_version} is not in the compatibility matrix of {self.updated}; assuming it "
+                f"supports Minecraft {mc_version} and Java {java_version}"]
+
+    def validate(self, config) -> List[str]:
+        """Raise CompatibilityError unless an AddonConfig's versions fit together.
+
+        Returns the warnings() of a combination that is only assumed to work.
+        """
+        problems = self.problems(config.mc_version, config.java_version, config.skript_version)
+        if problems:
+            raise CompatibilityError("; ".join(problems))
+        return self.warnings(config.mc_version, config.java_version, config.skript_version)
+
+
+def _read(path: Path) -> Optional[CompatibilityMatrix]:
+    try:
+        return CompatibilityMatrix(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        return None
+
+
+def load_matrix(path: Optional[Path] = None) -> CompatibilityMatrix:
+    """Load the matrix from ``path``, or the newer of the cached and bundled copies."""
+    if path is not None:
+        return CompatibilityMatrix(json.loads(Path(path).read_text(encoding="utf-8")))
+    bundled = _read(BUNDLED_MATRIX)
+    cached = _read(cached_matrix_path())
+    if cached is not None and (bundled is None or cached.updated > bundled.updated):
+        return cached
+    if bundled is None:
+        raise ValueError(f"Compatibility matrix {BUNDLED_MATRIX} is missing or invalid")
+    return bundled
+
+
+@lru_cache(maxsize=1)
+def default_matrix() -> CompatibilityMatrix:
+    """The matrix used by the prompts, batch mode and the HTTP service."""
+    return load_matrix()
+
+
+def store_matrix(data: dict) -> Path:
+    """Validate a matrix and make it the cached copy, which wins when it is newer."""
+    CompatibilityMatrix(data)
+    path = cached_matrix_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    os.replace(str(tmp), str(path))
+    default_matrix.cache_clear()
+    return path
@@ -0,0 +1,298 @@
+from pathlib import Path
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from project import content_hash
+from templates import Templates
+from update import ADDED, CONFLICT, OBSOLETE, UNCHANGED, UPDATED, FileUpdate, read_manifest
+
+# Generated element files and their content hashes, kept next to the generator manifest
+ELEMENTS_STATE_PATH = ".addon-elements.json"
+ELEMENTS_STATE_SCHEMA = 1
+
+ELEMENT_KINDS = ("effect", "condition", "expression")
+
+# Specs smaller than this are rendered in-process; a pool only pays off for big ones
+PARALLEL_THRESHOLD = 500
+
+# Java classes of common Skript types; plurals ("players") use the same class
+SKRIPT_TYPES = {
+    "object": "Object",
+    "string": "String",
+    "text": "String",
+    "number": "Number",
+    "integer": "Long",
+    "boolean": "Boolean",
+    "player": "org.bukkit.entity.Player",
+    "offlineplayer": "org.bukkit.OfflinePlayer",
+    "commandsender": "org.bukkit.command.CommandSender",
+    "entity": "org.bukkit.entity.Entity",
+    "livingentity": "org.bukkit.entity.LivingEntity",
+    "location": "org.bukkit.Location",
+    "world": "org.bukkit.World",
+    "block": "org.bukkit.block.Block",
+    "item": "org.bukkit.inventory.ItemStack",
+    "itemstack": "org.bukkit.inventory.ItemStack",
+    "itemtype": "ch.njol.skript.aliases.ItemType",
+    "inventory": "org.bukkit.inventory.Inventory",
+    "vector": "org.bukkit.util.Vector",
+    "timespan": "ch.njol.skript.util.Timespan",
+}
+
+# %type% placeholders of a Skript pattern; flags (-*~) and time states (@-1) are ignored
+PLACEHOLDER = re.compile(r"%[-*~]*([^%@]+?)(?:@-?\d+)?%")
+CLASS_NAME = re.compile(r"[A-Z][A-Za-z0-9_]*")
+CLASS_PREFIX = re.compile(r"^(Eff|Cond|Expr)(?=[A-Z])")
+
+
+class ElementSpec(NamedTuple):
+    kind: str
+    class_name: str
+    patterns: Tuple[str, ...]
+    negated_patterns: Tuple[str, ...]   # conditions only
+    expressions: Tuple[Tuple[str, str], ...]   # (field name, Java type) of every field
+    layouts: Tuple[Tuple[str, ...], ...]       # fields set from exprs, per pattern (negated ones last)
+    return_type: str                    # expressions only: Java type
+    single: bool
+    name: str
+    description: Tuple[str, ...]
+    examples: Tuple[str, ...]
+    since: str
+
+
+def java_type(skript_type: str, types: Dict[str, str]) -> Tuple[str, bool]:
+    """Java class of a Skript type, and whether the type is plural."""
+    alternatives = [name.strip().lower().replace(" ", "") for name in skript_type.split("/")]
+    resolved = []
+    for name in alternatives:
+        for singular, plural in ((name, False), (name[:-3] + "y", True), (name[:-1], True)):
+            if singular in types:
+                resolved.append((types[singular], plural))
+                break
+        else:
+            raise ValueError(f"Unknown Skript type {skript_type!r}; map it to a Java class under 'types'")
+    classes = {java for java, _ in resolved}
+    return (classes.pop() if len(classes) == 1 else "Object"), any(plural for _, plural in resolved)
+
+
+def _field_name(skript_type: str, taken: set) -> str:
+    words = re.findall(r"[A-Za-z0-9]+", skript_type.split("/")[0])
+    name = (words[0].lower() + "".join(word.capitalize() for word in words[1:])) if words else "expr"
+    if not name[0].isalpha():
+        name = f"expr{name}"
+    candidate, number = name, 2
+    while candidate in taken:
+        candidate, number = f"{name}{number}", number + 1
+    taken.add(candidate)
+    return candidate
+
+
+def _strings(value, what: str) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        return (value,)
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"'{what}' must be a string or a list of strings")
+    return tuple(value)
+
+
+def _title(class_name: str) -> str:
+    """Documentation name from a class name: ``CondInRegion`` -> ``In Region``."""
+    words = re.findall(r"[A-Z]+[a-z0-9_]*", CLASS_PREFIX.sub("", class_name))
+    return " ".join(words) or class_name
+
+
+def _fields(patterns: Tuple[str, ...], types: Dict[str, str]):
+    """Fields of an element and the fields each pattern fills.
+
+    Skript passes the expressions of the matched pattern only, so a
+    placeholder reuses a field of the same type that an earlier pattern
+    declared (and this one hasn't used yet) and otherwise adds a new field.
+    """
+    fields, taken, layouts = [], set(), []
+    for pattern in patterns:
+        layout = []
+        for skript_type in PLACEHOLDER.findall(pattern):
+            key = skript_type.strip().lower()
+            field = next((field for field, field_key, _ in fields if field_key == key and field not in layout), None)
+            if field is None:
+                field = _field_name(skript_type, taken)
+                fields.append((field, key, java_type(skript_type, types)[0]))
+            layout.append(field)
+        layouts.append(tuple(layout))
+    return tuple((field, java) for field, _, java in fields), tuple(layouts)
+
+
+def parse_element(entry: dict, types: Dict[str, str]) -> ElementSpec:
+    """Validate one spec entry and work out its fields from the patterns."""
+    kind = entry.get("kind")
+    if kind not in ELEMENT_KINDS:
+        raise ValueError(f"'kind' must be one of: {', '.join(ELEMENT_KINDS)}")
+    class_name = entry.get("class")
+    if not isinstance(class_name, str) or not CLASS_NAME.fullmatch(class_name):
+        raise ValueError("'class' must be a Java class name starting with an upper-case letter")
+    patterns = _strings(entry.get("patterns", []), "patterns")
+    if not patterns:
+        raise ValueError("at least one pattern is needed")
+    negated = _strings(entry.get("negated_patterns", []), "negated_patterns")
+    if negated and kind != "condition":
+        raise ValueError("only conditions have negated patterns")
+
+    expressions, layouts = _fields(patterns + negated, types)
+    return_type, single = "", True
+    if kind == "expression":
+        if not isinstance(entry.get("return_type"), str):
+            raise ValueError("expressions need a 'return_type' Skript type")
+        return_type, plural = java_type(entry["return_type"], types)
+        single = bool(entry.get("single", not plural))
+
+    name = entry.get("name", _title(class_name))
+    since = entry.get("since", "1.0.0")
+    if not isinstance(name, str) or not isinstance(since, str):
+        raise ValueError("'name' and 'since' must be strings")
+    return ElementSpec(kind, class_name, patterns, negated, expressions, layouts, return_type, single, name,
+                       _strings(entry.get("description", name), "description"),
+                       _strings(entry.get("examples", []), "examples"), since)
+
+
+def load_spec(path: Path) -> List[ElementSpec]:
+    """Read a YAML or JSON element spec.
+
+    The spec is either a list of elements or a table with an ``elements``
+    list, optional ``defaults`` applied to every element and ``types``
+    mapping extra Skript types to Java classes.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML specs need PyYAML (pip install pyyaml); JSON works without it") from None
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    if isinstance(data, list):
+        data = {"elements": data}
+    if not isinstance(data, dict) or not isinstance(data.get("elements"), list):
+        raise ValueError("Spec must contain an 'elements' list")
+    types = {**SKRIPT_TYPES, **{name.lower(): java for name, java in data.get("types", {}).items()}}
+    defaults = data.get("defaults", {})
+
+    specs, seen = [], set()
+    for index, entry in enumerate(data["elements"]):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Element #{index} must be a table")
+        entry = {**defaults, **entry}
+        try:
+            spec = parse_element(entry, types)
+        except ValueError as e:
+            raise ValueError(f"Element #{index} ({entry.get('class', '?')}): {e}") from None
+        if spec.class_name in seen:
+            raise ValueError(f"Element #{index}: class {spec.class_name} is defined twice")
+        seen.add(spec.class_name)
+        specs.append(spec)
+    return specs
+
+
+def _read_state(base: Path) -> Dict[str, str]:
+    try:
+        state = json.loads((base / ELEMENTS_STATE_PATH).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    if state.get("schema") != ELEMENTS_STATE_SCHEMA:
+        raise ValueError(f"Unsupported {ELEMENTS_STATE_PATH} schema: {state.get('schema')}")
+    return state.get("files", {})
+
+
+def _disk_hash(path: Path) -> Optional[str]:
+    try:
+        return content_hash(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def _apply_chunk(job: dict) -> List[Tuple[FileUpdate, Optional[str]]]:
+    """Render and write one chunk of elements, returning each outcome and the hash to record."""
+    base = Path(job["base"])
+    results = []
+    for spec in job["specs"]:
+        path = f"{job['directory']}/{spec.class_name}.java"
+        content = Templates.get_element(job["package_name"], spec, job["timings"]).encode("utf-8")
+        new = content_hash(content)
+        recorded = job["recorded"].get(path)
+        if recorded == new:
+            # Same output as last time: nothing to read or write
+            results.append((FileUpdate(path, UNCHANGED), new))
+            continue
+        current = _disk_hash(base / path)
+        if current == new:
+            results.append((FileUpdate(path, UNCHANGED, "already up to date"), new))
+            continue
+
+        if recorded is None:
+            status, reason = (ADDED, None) if current is None else (CONFLICT, "a file with this name already exists")
+        elif current == recorded:
+            status, reason = UPDATED, None
+        else:
+            status, reason = CONFLICT, "deleted locally" if current is None else "modified locally"
+        if status == CONFLICT and job["force"]:
+            status, reason = (ADDED if current is None else UPDATED), "forced"
+
+        if status == CONFLICT:
+            results.append((FileUpdate(path, status, reason), recorded))
+            continue
+        if not job["dry_run"]:
+            (base / path).write_bytes(content)
+        results.append((FileUpdate(path, status, reason), new))
+    return results
+
+
+def generate_elements(base: Path, specs: List[ElementSpec], package_name: Optional[str] = None,
+                      workers: Optional[int] = None, force: bool = False, dry_run: bool = False) -> List[FileUpdate]:
+    """Write the element classes of a spec into a project.
+
+    Works like the update command: files whose output didn't change are
+    skipped without being read, and files changed by hand are left alone
+    (reported as conflicts) unless ``force`` is set. The package and timing
+    option come from the project's generator manifest when there is one.
+    Big specs are rendered across a process pool.
+    """
+    base = Path(base)
+    timings = False
+    if package_name is None:
+        config = read_manifest(base)["config"]
+        package_name = config["package_name"]
+        timings = config.get("element_timings", False)
+    directory = f"src/main/java/{package_name.replace('.', '/')}/elements"
+    recorded = _read_state(base)
+    if not dry_run:
+        (base / directory).mkdir(parents=True, exist_ok=True)
+
+    def job(chunk):
+        return {"base": str(base), "directory": directory, "package_name": package_name, "timings": timings,
+                "specs": chunk, "recorded": {path: recorded[path] for path in
+                                             (f"{directory}/{spec.class_name}.java" for spec in chunk)
+                                             if path in recorded},
+                "force": force, "dry_run": dry_run}
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(specs) < PARALLEL_THRESHOLD:
+        outcomes = _apply_chunk(job(specs))
+    else:
+        # A few chunks per worker, so the pool stays busy without much IPC
+        size = max(1, -(-len(specs) // (workers * 4)))
+        chunks = [specs[start:start + size] for start in range(0, len(specs), size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = [outcome for chunk in executor.map(_apply_chunk, map(job, chunks)) for outcome in chunk]
+
+    results = [result for result, _ in outcomes]
+    files = {result.path: digest for result, digest in outcomes if digest is not None}
+    for path in sorted(set(recorded) - set(files)):
+        results.append(FileUpdate(path, OBSOLETE, "no longer in the spec"))
+    if not dry_run:
+        state = {"schema": ELEMENTS_STATE_SCHEMA, "files": dict(sorted(files.items()))}
+        (base / ELEMENTS_STATE_PATH).write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+    return results
@@ -0,0 +1,159 @@
+from pathlib import Path
+import hashlib
+import os
+import struct
+import subprocess
+import zlib
+from typing import Dict, Mapping, Optional
+from tracing import span
+
+
+class FastPathUnavailable(Exception):
+    """The repository can't be built without the regular git commands."""
+
+
+def _write_object(git_dir: Path, kind: str, data: bytes) -> bytes:
+    """Store a loose object and return its binary id."""
+    raw = f"{kind} {len(data)}\0".encode() + data
+    object_id = hashlib.sha1(raw).digest()
+    hex_id = object_id.hex()
+    path = git_dir / "objects" / hex_id[:2] / hex_id[2:]
+    if not path.exists():
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(zlib.compress(raw, 1))
+    return object_id
+
+
+def _is_executable(path: Path) -> bool:
+    return os.name != "nt" and os.stat(path).st_mode & 0o111 != 0
+
+
+def _write_tree(git_dir: Path, tree: dict) -> bytes:
+    """Store a (nested) directory mapping {name: (mode, id) | subtree} as tree objects."""
+    entries = []
+    for name, value in tree.items():
+        if isinstance(value, dict):
+            entries.append((name + "/", "40000", name, _write_tree(git_dir, value)))
+        else:
+            entries.append((name, value[0], name, value[1]))
+    # Git orders tree entries as if directory names ended with "/"
+    entries.sort(key=lambda entry: entry[0].encode())
+    data = b"".join(f"{mode} {name}\0".encode() + object_id for _, mode, name, object_id in entries)
+    return _write_object(git_dir, "tree", data)
+
+
+def _write_index(git_dir: Path, base_path: Path, blobs: Dict[str, tuple]):
+    """Write a version 2 index matching the working tree, so it is clean right away."""
+    entries = []
+    for path in sorted(blobs, key=lambda p: p.encode()):
+        mode, object_id = blobs[path]
+        stat = os.stat(base_path / path)
+        name = path.encode()
+        fields = [int(stat.st_ctime), stat.st_ctime_ns % 1_000_000_000,
+                  int(stat.st_mtime), stat.st_mtime_ns % 1_000_000_000,
+                  stat.st_dev, stat.st_ino, int(mode, 8), stat.st_uid, stat.st_gid, stat.st_size]
+        entry = struct.pack(">10I", *(value & 0xFFFFFFFF for value in fields))
+        entry += object_id + struct.pack(">H", min(len(name), 0xFFF)) + name
+        # NUL-terminate and pad every entry to a multiple of eight bytes
+        entry += b"\0" * (8 - len(entry) % 8)
+        entries.append(entry)
+    data = b"DIRC" + struct.pack(">II", 2, len(entries)) + b"".join(entries)
+    (git_dir / "index").write_bytes(data + hashlib.sha1(data).digest())
+
+
+def _identities(base_path: Path) -> Dict[str, str]:
+    """Read author/committer identities and config the way `git commit` would see them."""
+    with span("git var -l", "git"):
+        output = subprocess.run(["git", "var", "-l"], cwd=base_path, check=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout.decode()
+    values = {}
+    for line in output.splitlines():
+        key, _, value = line.partition("=")
+        values[key.lower()] = value
+    # Objects and the index are written with SHA-1 ids
+    if values.get("extensions.objectformat", "sha1").lower() != "sha1":
+        raise FastPathUnavailable("repository doesn't use SHA-1 object ids")
+    if values.get("commit.gpgsign", "").lower() in ("true", "yes", "on", "1"):
+        raise FastPathUnavailable("commit signing is enabled")
+    if values.get("core.hookspath"):
+        raise FastPathUnavailable("commit hooks are configured")
+    for key in ("git_author_ident", "git_committer_ident"):
+        # `git var -l` reports unusable auto-detected identities that `git commit` would reject
+        ident = values.get(key, "")
+        if not ident or ident.startswith("<") or "(none)>" in ident:
+            raise FastPathUnavailable("no git identity configured")
+    return values
+
+
+def _has_hooks(git_dir: Path) -> bool:
+    """Whether `git commit` would run a hook; `git init` only copies disabled *.sample files."""
+    hooks = git_dir / "hooks"
+    return hooks.is_dir() and any(not hook.name.endswith(".sample") for hook in hooks.iterdir())
+
+
+def _ignored(base_path: Path, paths) -> set:
+    """The paths the repository's .gitignore rules exclude, as `git add` would see them."""
+    with span("git check-ignore", "git"):
+        result = subprocess.run(["git", "check-ignore", "--stdin", "-z"], cwd=base_path,
+                                input="\0".join(paths).encode(), stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL)
+    # Exit status 1 means nothing is ignored
+    if result.returncode not in (0, 1):
+        raise subprocess.CalledProcessError(result.returncode, result.args)
+    return set(result.stdout.decode().split("\0")) - {""}
+
+
+def create_repository(base_path: Path, files: Mapping[str, bytes], branch: str,
+                      remote_url: Optional[str] = None, message: str = "Initial commit"):
+    """Create a repository whose first commit holds ``files``, in one pass.
+
+    ``files`` must already be written below ``base_path``. Instead of
+    `git add` and `git commit`, the blobs, trees, commit, branch ref and index
+    are written directly from memory; only `git init`, `git var` and
+    `git check-ignore` are run. Files the .gitignore rules exclude are left
+    out, so the commit has the tree `git add .` would give. Raises
+    FastPathUnavailable (or OSError/CalledProcessError) when the caller should
+    fall back to the regular git commands, e.g. when commit hooks would run.
+    """
+    base_path = Path(base_path)
+    if (base_path / ".git").exists():
+        raise FastPathUnavailable("repository already exists")
+    with span("git init", "git"):
+        subprocess.run(["git", "init", "-q"], cwd=base_path, check=True)
+    git_dir = base_path / ".git"
+    if not (git_dir / "objects").is_dir():
+        raise FastPathUnavailable("unexpected repository layout")
+    identities = _identities(base_path)
+    if _has_hooks(git_dir):
+        raise FastPathUnavailable("commit hooks are installed")
+    ignored = _ignored(base_path, files)
+    files = {path: content for path, content in files.items() if path not in ignored}
+
+    blobs = {}
+    root = {}
+    with span("write objects", "git", files=len(files)):
+        for path, content in files.items():
+            mode = "100755" if _is_executable(base_path / path) else "100644"
+            blobs[path] = (mode, _write_object(git_dir, "blob", content))
+            *directories, name = path.split("/")
+            node = root
+            for directory in directories:
+                node = node.setdefault(directory, {})
+            node[name] = blobs[path]
+
+        tree_id = _write_tree(git_dir, root)
+        commit = (f"tree {tree_id.hex()}\n"
+                  f"author {identities['git_author_ident']}\n"
+                  f"committer {identities['git_committer_ident']}\n\n{message}\n")
+        commit_id = _write_object(git_dir, "commit", commit.encode())
+
+    ref = git_dir / "refs" / "heads" / branch
+    ref.parent.mkdir(parents=True, exist_ok=True)
+    ref.write_text(commit_id.hex() + "\n")
+    (git_dir / "HEAD").write_text(f"ref: refs/heads/{branch}\n")
+    if remote_url:
+        with (git_dir / "config").open("a") as config:
+            config.write(f'[remote "origin"]\n\turl = {remote_url}\n'
+                         f"\tfetch = +refs/heads/*:refs/remotes/origin/*\n")
+    with span("write index", "git"):
+        _write_index(git_dir, base_path, blobs)
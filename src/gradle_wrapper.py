@@ -0,0 +1,212 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import zipfile
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional
+from versions import user_cache_dir
+
+# Gradle version the generated wrapper pins
+GRADLE_VERSION = "8.5"
+
+# Index file layout version; bump when the stored structure changes
+WRAPPER_SCHEMA = 1
+
+# Files that make up a wrapper, relative to the project root
+WRAPPER_FILES = ("gradlew", "gradlew.bat", "gradle/wrapper/gradle-wrapper.jar",
+                 "gradle/wrapper/gradle-wrapper.properties")
+PROPERTIES_PATH = "gradle/wrapper/gradle-wrapper.properties"
+
+# Gradle distributions and their published SHA-256 checksums
+DISTRIBUTIONS = "https://services.gradle.org/distributions"
+
+DISTRIBUTION_URL = re.compile(r"^distributionUrl=.*gradle-(?P<version>[^/]+?)-(?:bin|all)\.zip\s*$", re.MULTILINE)
+DISTRIBUTION_SUM = re.compile(r"^distributionSha256Sum=(?P<sum>\S*)\s*$", re.MULTILINE)
+SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+class WrapperError(ValueError):
+    """A wrapper can't be imported, or the cached copy is damaged."""
+
+
+class WrapperInfo(NamedTuple):
+    gradle_version: str
+    distribution_sha256: str
+    files: Dict[str, str]       # path -> sha256 of the content
+
+
+def wrapper_cache_dir() -> Path:
+    return user_cache_dir() / "gradle-wrapper"
+
+
+def _sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _atomic_write(path: Path, content: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(content)
+    os.replace(str(tmp), str(path))
+
+
+def _object_path(cache: Path, digest: str) -> Path:
+    return cache / "objects" / digest[:2] / digest[2:]
+
+
+def _index_path(cache: Path, gradle_version: str) -> Path:
+    return cache / f"gradle-{gradle_version}.json"
+
+
+def import_wrapper(project: Path, distribution_sha256: str = "", jar_sha256: str = "",
+                   cache: Optional[Path] = None) -> WrapperInfo:
+    """Copy the wrapper of an existing Gradle project into the cache.
+
+    Files are stored by their SHA-256, so importing several Gradle versions
+    keeps one copy of the scripts they share. The distribution checksum is
+    taken from gradle-wrapper.properties unless ``distribution_sha256`` is
+    given, and the jar is checked against ``jar_sha256`` when it is set.
+    """
+    cache = cache or wrapper_cache_dir()
+    missing = [path for path in WRAPPER_FILES if not (project / path).is_file()]
+    if missing:
+        raise WrapperError(f"{project} has no Gradle wrapper (missing {', '.join(missing)})")
+    contents = {path: (project / path).read_bytes() for path in WRAPPER_FILES}
+
+    properties = contents[PROPERTIES_PATH].decode("utf-8")
+    url = DISTRIBUTION_URL.search(properties)
+    if url is None:
+        raise WrapperError(f"No Gradle distributionUrl in {PROPERTIES_PATH}")
+    current = DISTRIBUTION_SUM.search(properties)
+    distribution_sha256 = (distribution_sha256 or (current.group("sum") if current else "")).lower()
+    if not SHA256.fullmatch(distribution_sha256):
+        raise WrapperError("The distribution checksum is missing or malformed; pass the SHA-256 published "
+                           "for the Gradle distribution")
+    line = f"distributionSha256Sum={distribution_sha256}"
+    properties = (DISTRIBUTION_SUM.sub(line, properties) if current
+                  else properties.replace(url.group(), f"{line}\n{url.group()}", 1))
+    contents[PROPERTIES_PATH] = properties.encode("utf-8")
+
+    files = {path: _sha256(content) for path, content in contents.items()}
+    jar = files["gradle/wrapper/gradle-wrapper.jar"]
+    if jar_sha256 and jar != jar_sha256.lower():
+        raise WrapperError(f"gradle-wrapper.jar checksum mismatch: expected {jar_sha256.lower()}, got {jar}")
+
+    for path, digest in files.items():
+        target = _object_path(cache, digest)
+        if not target.exists():
+            _atomic_write(target, contents[path])
+    info = WrapperInfo(url.group("version"), distribution_sha256, files)
+    index = {"schema": WRAPPER_SCHEMA, **info._asdict()}
+    _atomic_write(_index_path(cache, info.gradle_version), (json.dumps(index, indent=2) + "\n").encode("utf-8"))
+    load_wrapper.cache_clear()
+    return info
+
+
+def _published_sha256(session, url: str, timeout: float) -> str:
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    digest = response.text.strip().lower()
+    if not SHA256.fullmatch(digest):
+        raise WrapperError(f"{url} is not a SHA-256 checksum")
+    return digest
+
+
+def download_wrapper(gradle_version: str = GRADLE_VERSION, cache: Optional[Path] = None,
+                     timeout: float = 60) -> WrapperInfo:
+    """Download Gradle, generate its wrapper and cache it.
+
+    The distribution and the generated gradle-wrapper.jar are checked against
+    the checksums Gradle publishes next to them, and the wrapper pins the
+    distribution checksum. Generating the wrapper runs the downloaded Gradle,
+    so Java must be installed.
+    """
+    # Imported here: requests is the slowest import of the tool
+    import requests
+
+    with tempfile.TemporaryDirectory(prefix="gradle-wrapper-") as tmp, requests.Session() as session:
+        tmp = Path(tmp)
+        name = f"gradle-{gradle_version}-bin.zip"
+        distribution_sha256 = _published_sha256(session, f"{DISTRIBUTIONS}/{name}.sha256", timeout)
+        jar_sha256 = _published_sha256(session, f"{DISTRIBUTIONS}/gradle-{gradle_version}-wrapper.jar.sha256", timeout)
+
+        digest = hashlib.sha256()
+        with session.get(f"{DISTRIBUTIONS}/{name}", stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            with (tmp / name).open("wb") as archive:
+                for chunk in response.iter_content(1 << 20):
+                    digest.update(chunk)
+                    archive.write(chunk)
+        if digest.hexdigest() != distribution_sha256:
+            raise WrapperError(f"{name} checksum mismatch: expected {distribution_sha256}, got {digest.hexdigest()}")
+
+        with zipfile.ZipFile(tmp / name) as archive:
+            archive.extractall(tmp)
+        gradle = tmp / f"gradle-{gradle_version}" / "bin" / ("gradle.bat" if sys.platform == "win32" else "gradle")
+        gradle.chmod(0o755)
+        project = tmp / "project"
+        project.mkdir()
+        (project / "settings.gradle.kts").write_text('rootProject.name = "wrapper"\n', encoding="utf-8")
+        try:
+            subprocess.run([str(gradle), "wrapper", "--gradle-version", gradle_version, "--distribution-type", "bin",
+                            "--gradle-distribution-sha256-sum", distribution_sha256, "--no-daemon", "--quiet",
+                            "--gradle-user-home", str(tmp / "home")],
+                           cwd=project, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            raise WrapperError(f"Can't run {gradle}") from None
+        except subprocess.CalledProcessError as e:
+            output = e.stderr.decode(errors="replace").strip()
+            raise WrapperError(f"Generating the wrapper failed (is Java installed?): {output}") from None
+        return import_wrapper(project, distribution_sha256, jar_sha256, cache)
+
+
+def cached_wrappers(cache: Optional[Path] = None) -> Dict[str, WrapperInfo]:
+    """The wrappers in the cache, by Gradle version."""
+    cache = cache or wrapper_cache_dir()
+    wrappers = {}
+    for path in sorted(cache.glob("gradle-*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("schema") == WRAPPER_SCHEMA:
+                wrappers[data["gradle_version"]] = WrapperInfo(data["gradle_version"], data["distribution_sha256"],
+                                                               dict(data["files"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+    return wrappers
+
+
+@lru_cache(maxsize=8)
+def load_wrapper(gradle_version: str = GRADLE_VERSION, cache: Optional[Path] = None) -> Optional[Mapping[str, bytes]]:
+    """Read a cached wrapper as {path: content}, None when it isn't cached.
+
+    Every file is checked against the checksum recorded on import, once per
+    process; projects then share the verified bytes.
+    """
+    cache = cache or wrapper_cache_dir()
+    info = cached_wrappers(cache).get(gradle_version)
+    if info is None:
+        return None
+    files = {}
+    for path, digest in info.files.items():
+        try:
+            content = _object_path(cache, digest).read_bytes()
+        except OSError:
+            raise WrapperError(f"Cached Gradle {gradle_version} wrapper is missing {path}; import it again") from None
+        if _sha256(content) != digest:
+            raise WrapperError(f"Cached Gradle {gradle_version} wrapper file {path} is damaged; import it again")
+        files[path] = content
+    return MappingProxyType(files)
+
+
+def with_wrapper(files: Mapping[str, bytes], gradle_version: str = GRADLE_VERSION) -> Mapping[str, bytes]:
+    """Add the cached wrapper to a rendered project, if the cache has one."""
+    wrapper = load_wrapper(gradle_version)
+    if wrapper is None:
+        return files
+    return MappingProxyType({**files, **wrapper})
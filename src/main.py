@@ -1,76 +1,431 @@
 from pathlib import Path
+import argparse
+import json
+import os
 import sys
+import time
 from colorama import init, Fore, Style
 from addon_creator import AddonCreator
-from templates import Templates
+from archive import ARCHIVE_FORMATS
+from versions import DEFAULT_CACHE_TTL, DEFAULT_FETCH_BUDGET
+from tracing import span
+
+# Everything else is imported by the command that needs it, keeping startup
+# (and the time to the first prompt) short
 
 # Initialize colorama for colored output
 init()
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Create a new Skript addon for Minecraft")
+    fetch = parser.add_mutually_exclusive_group()
+    fetch.add_argument("--refresh-versions", action="store_true",
+                       help="ignore the cache TTL and revalidate the version lists")
+    fetch.add_argument("--offline", action="store_true",
+                       help="never touch the network; use cached or built-in version lists")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_CACHE_TTL, metavar="SECONDS",
+                        help=f"how long cached version lists stay fresh (default: {DEFAULT_CACHE_TTL})")
+    parser.add_argument("--config", type=Path, metavar="FILE",
+                        help="create the addon from a JSON config instead of prompting")
+    parser.add_argument("--output-archive", metavar="TARGET",
+                        help="stream the project into an archive file, '-' for stdout or 'fd:N'")
+    parser.add_argument("--archive-format", choices=ARCHIVE_FORMATS,
+                        help="archive format (default: from the file name, otherwise zip)")
+    parser.add_argument("--fetch-timeout", type=float, default=DEFAULT_FETCH_BUDGET, metavar="SECONDS",
+                        help=f"overall time budget for loading version lists (default: {DEFAULT_FETCH_BUDGET:g})")
+    parser.add_argument("--elements", dest="elements_spec", type=Path, metavar="SPEC",
+                        help="also generate the element classes of a YAML/JSON spec into the new project")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record phase timings as Chrome trace-event JSON and print a summary")
+
+    gradle = parser.add_argument_group("generated gradle.properties")
+    gradle.add_argument("--no-gradle-daemon", dest="gradle_daemon", action="store_false", default=None,
+                        help="disable the Gradle daemon")
+    gradle.add_argument("--no-build-cache", dest="gradle_build_cache", action="store_false", default=None,
+                        help="disable the Gradle build cache")
+    gradle.add_argument("--no-parallel", dest="gradle_parallel", action="store_false", default=None,
+                        help="disable parallel execution")
+    gradle.add_argument("--no-configuration-cache", dest="gradle_configuration_cache", action="store_false",
+                        default=None, help="disable the configuration cache")
+    gradle.add_argument("--gradle-jvm-args", metavar="ARGS",
+                        help="daemon JVM arguments (default: chosen from the Java version)")
+    gradle.add_argument("--build-cache-dir", dest="gradle_build_cache_dir", metavar="DIR",
+                        help="local build cache directory shared between generated projects")
+    gradle.add_argument("--no-wrapper", dest="wrapper", action="store_false",
+                        help="don't copy the cached Gradle wrapper into the project")
+
+    code = parser.add_argument_group("generated code")
+    code.add_argument("--element-index", action="store_true", default=None,
+                      help="register elements from a class list generated at build time instead of scanning the jar")
+    code.add_argument("--component-cache-size", type=int, metavar="N",
+                      help="MiniMessage components cached by ColorUtils, 0 to disable (default: 1024)")
+    code.add_argument("--optimized-effect", action="store_true", default=None,
+                      help="EffExample that parses once and messages players off the main thread or in batches")
+    code.add_argument("--element-timings", action="store_true", default=None,
+                      help="record sampled call counts and times per element, shown by '/<addon> timings'")
+    code.add_argument("--jmh", dest="jmh_benchmarks", action="store_true", default=None,
+                      help="add a JMH source set benchmarking the example elements against mocked players")
+
+    jar = parser.add_argument_group("generated shadow jar")
+    jar.add_argument("--minimize-jar", action="store_true", default=None,
+                     help="leave classes of bundled libraries that nothing uses out of the jar")
+    jar.add_argument("--relocate-dependencies", action="store_true", default=None,
+                     help="relocate bundled libraries under '<package>.libs'")
+    jar.add_argument("--reproducible-jar", action="store_true", default=None,
+                     help="build byte-identical jars: fixed entry order, no file timestamps")
+    jar.add_argument("--jar-report", action="store_true", default=None,
+                     help="add a jarReport task showing the jar size and the logged plugin enable time")
+
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    batch = commands.add_parser("batch", help="scaffold many addons from a JSON/TOML manifest")
+    batch.add_argument("manifest", type=Path, help="manifest listing the addon configs")
+    batch.add_argument("-o", "--output-dir", type=Path, default=Path("."),
+                       help="directory the addons are created in (default: current directory)")
+    batch.add_argument("-j", "--workers", type=int, default=None,
+                       help="number of worker processes (default: CPU count)")
+    batch.add_argument("--force", action="store_true", help="write into existing non-empty directories")
+    batch.add_argument("--report", type=Path, metavar="FILE", help="write per-job results as JSON")
+    batch.add_argument("-q", "--quiet", action="store_true", help="only print failures and the summary")
+
+    elements = commands.add_parser("elements", help="generate element classes from a YAML/JSON spec")
+    elements.add_argument("spec", type=Path, help="spec listing the elements")
+    elements.add_argument("path", type=Path, nargs="?", default=Path("."), help="project directory (default: .)")
+    elements.add_argument("--package", dest="package_name", metavar="PACKAGE",
+                          help="base package, for projects without a generator manifest")
+    elements.add_argument("-j", "--workers", type=int, default=None,
+                          help="number of worker processes for big specs (default: CPU count)")
+    elements.add_argument("-n", "--dry-run", action="store_true", help="only report what would change")
+    elements.add_argument("--force", action="store_true", help="overwrite element files changed by hand")
+
+    update = commands.add_parser("update", help="apply template changes to a generated project")
+    update.add_argument("path", type=Path, nargs="?", default=Path("."), help="project directory (default: .)")
+    update.add_argument("-n", "--dry-run", action="store_true", help="only report what would change")
+
+    compat = commands.add_parser("compat", help="show or replace the Minecraft/Java/Skript compatibility matrix")
+    compat.add_argument("--minecraft", metavar="VERSION", help="only show what works with this Minecraft version")
+    compat.add_argument("--import", dest="import_file", type=Path, metavar="FILE",
+                        help="validate a compatibility.json and cache it; it is used while newer than the bundled one")
+
+    wrapper = commands.add_parser("wrapper", help="show or fill the local Gradle wrapper cache")
+    wrapper.add_argument("--import", dest="import_dir", type=Path, metavar="DIR",
+                         help="cache the wrapper of an existing Gradle project")
+    wrapper.add_argument("--download", action="store_true",
+                         help="download Gradle, verify it against the published checksums and cache its wrapper")
+    wrapper.add_argument("--distribution-sha256", default="", metavar="SUM",
+                         help="SHA-256 of the Gradle distribution, if the imported wrapper doesn't pin one")
+    wrapper.add_argument("--jar-sha256", default="", metavar="SUM",
+                         help="verify gradle-wrapper.jar against this SHA-256 before caching it")
+
+    serve = commands.add_parser("serve", help="run the scaffold HTTP service")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    serve.add_argument("--refresh-interval", type=float, default=15 * 60, metavar="SECONDS",
+                       help="how often version lists are refreshed in the background (default: 900)")
+    args = parser.parse_args(argv)
+    if args.output_archive == "-" and not args.config and not args.command:
+        parser.error("--output-archive - needs --config, the prompts are written to stdout")
+    if args.elements_spec and args.output_archive:
+        parser.error("--elements needs a project directory, not --output-archive")
+    return args
+
+def config_options(args) -> dict:
+    """AddonConfig fields set on the command line."""
+    names = ("gradle_daemon", "gradle_build_cache", "gradle_parallel", "gradle_configuration_cache",
+             "gradle_jvm_args", "gradle_build_cache_dir", "element_index", "component_cache_size", "optimized_effect",
+             "element_timings", "jmh_benchmarks", "minimize_jar", "relocate_dependencies", "reproducible_jar",
+             "jar_report")
+    return {name: getattr(args, name) for name in names if getattr(args, name) is not None}
+
+def load_config(path: Path, overrides: dict = None):
+    """Read an addon config from a JSON file."""
+    from project import AddonConfig
+
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("Config file must contain a JSON object")
+    return AddonConfig(**{**data, **(overrides or {})})
+
+def cached_wrapper():
+    """The cached Gradle wrapper for new projects; None, with a warning, without a usable one."""
+    from gradle_wrapper import GRADLE_VERSION, WrapperError, load_wrapper
+
     try:
-        creator = AddonCreator()
-        creator.get_inputs()
-        
-        # ==== PATHS ====
-        group_path = Path(*creator.package_name.split("."))
-        base = Path(creator.addon_name)
-        src = base / "src" / "main"
-        java = src / "java" / group_path
-        elements = java / "elements"
-        resources = src / "resources"
-
-        for path in [elements, resources]:
-            path.mkdir(parents=True, exist_ok=True)
-
-        # ==== FILES ====
-        templates = Templates()
-        
-        # Write files
-        (resources / "plugin.yml").write_text(
-            templates.get_plugin_yml(creator.addon_name, creator.package_name, creator.mc_version)
-        )
-        (base / "settings.gradle.kts").write_text(
-            templates.get_settings_gradle(creator.addon_name)
-        )
-        (base / "build.gradle.kts").write_text(
-            templates.get_build_gradle(
-                creator.package_name,
-                creator.java_version,
-                creator.impl,
-                creator.mc_version,
-                creator.skript_version
-            )
-        )
-        (java / f"{creator.addon_name}.java").write_text(
-            templates.get_main_class(creator.addon_name, creator.package_name)
-        )
-        (java / "AddonLogger.java").write_text(
-            templates.get_logger_class(creator.package_name)
-        )
-        (java / "ColorUtils.java").write_text(
-            templates.get_color_utils(creator.package_name)
-        )
+        wrapper = load_wrapper()
+    except WrapperError as e:
+        print(f"{Fore.YELLOW}[!] {e}; projects are created without a Gradle wrapper{Style.RESET_ALL}",
+              file=sys.stderr)
+        return None
+    if wrapper is None:
+        print(f"{Fore.YELLOW}[!] No cached Gradle {GRADLE_VERSION} wrapper, projects are created without one "
+              f"(add one with: wrapper --download or wrapper --import DIR){Style.RESET_ALL}", file=sys.stderr)
+    return wrapper
 
-        # Write example elements
-        (elements / "EffExample.java").write_text(
-            templates.get_example_effect(creator.addon_name, creator.package_name)
-        )
-        (elements / "CondExample.java").write_text(
-            templates.get_example_condition(creator.addon_name, creator.package_name)
-        )
-        (elements / "ExprExample.java").write_text(
-            templates.get_example_expression(creator.addon_name, creator.package_name)
+def add_wrapper(files, args):
+    """Add the cached Gradle wrapper to a rendered project unless --no-wrapper is set."""
+    if not args.wrapper or cached_wrapper() is None:
+        return files
+    from gradle_wrapper import with_wrapper
+
+    return with_wrapper(files)
+
+def export_archive(files, target: str, archive_format: str, root: str):
+    """Stream a rendered project into an archive file, stdout or file descriptor."""
+    from archive import archive_format_for, write_archive
+
+    archive_format = archive_format or archive_format_for(target)
+    with span("write archive", "write", target=target, format=archive_format):
+        if target == "-":
+            write_archive(files, sys.stdout.buffer, archive_format, root)
+            sys.stdout.buffer.flush()
+            return
+        out = os.fdopen(int(target[3:]), "wb") if target.startswith("fd:") else open(target, "wb")
+        with out:
+            write_archive(files, out, archive_format, root)
+
+def run_config_command(args):
+    from project import render_project, write_project
+
+    from compatibility import default_matrix
+
+    config = load_config(args.config, config_options(args))
+    for warning in default_matrix().validate(config):
+        print(f"{Fore.YELLOW}[!] {warning}{Style.RESET_ALL}", file=sys.stderr)
+    with span("render project", "phase"):
+        files = add_wrapper(render_project(config), args)
+    if args.output_archive:
+        export_archive(files, args.output_archive, args.archive_format, config.addon_name)
+        print(f"{Fore.GREEN}[+] Addon '{config.addon_name}' archive written to: {args.output_archive}{Style.RESET_ALL}",
+              file=sys.stderr)
+    else:
+        base = Path(config.addon_name)
+        with span("write project", "phase"):
+            write_project(files, base)
+        if args.elements_spec:
+            add_elements(args.elements_spec, base, files)
+        print(f"{Fore.GREEN}[+] Addon '{config.addon_name}' was successfully created in: {base.absolute()}{Style.RESET_ALL}")
+    return 0
+
+def run_batch_command(args):
+    from batch import default_versions, load_manifest, print_report, run_batch, version_indexes, write_report
+    from versions import MINECRAFT, SKRIPT, VersionCache, fetch_all
+
+    start = time.perf_counter()
+    # Command-line Gradle options act as defaults for every entry
+    entries = [{**config_options(args), **entry} for entry in load_manifest(args.manifest)]
+
+    # Version lists are fetched once and shared by every job
+    report = fetch_all([MINECRAFT, SKRIPT], VersionCache(ttl=args.cache_ttl), refresh=args.refresh_versions,
+                       offline=args.offline, budget=args.fetch_timeout)
+    for result in report.values():
+        if result.degraded and not args.offline:
+            print(f"{Fore.YELLOW}[!] Using {result.status} {result.source} versions{Style.RESET_ALL}")
+
+    wrapper = args.wrapper and cached_wrapper() is not None
+
+    results = run_batch(entries, args.output_dir, default_versions(report), workers=args.workers,
+                        force=args.force, indexes=version_indexes(report), wrapper=wrapper)
+    print_report(results, time.perf_counter() - start, verbose=not args.quiet)
+    if args.report:
+        write_report(results, args.report)
+    return 0 if all(result.ok for result in results) else 1
+
+def print_file_updates(results, dry_run: bool) -> int:
+    """Print the files an update touched and a summary; returns the number of conflicts."""
+    from update import ADDED, CONFLICT, OBSOLETE, UNCHANGED, UPDATED
+
+    styles = {
+        UPDATED: (Fore.GREEN, "[+]"),
+        ADDED: (Fore.GREEN, "[+]"),
+        CONFLICT: (Fore.RED, "[-]"),
+        OBSOLETE: (Fore.YELLOW, "[!]"),
+    }
+    for result in results:
+        if result.status == UNCHANGED:
+            continue
+        color, marker = styles[result.status]
+        reason = f" ({result.reason})" if result.reason else ""
+        print(f"{color}{marker} {result.status}: {result.path}{reason}{Style.RESET_ALL}")
+
+    counts = {status: sum(1 for result in results if result.status == status)
+              for status in (UPDATED, ADDED, UNCHANGED, CONFLICT, OBSOLETE)}
+    prefix = "Would apply" if dry_run else "Applied"
+    print(f"\n{Fore.CYAN}[*] {prefix}: {counts[UPDATED]} updated, {counts[ADDED]} added, "
+          f"{counts[UNCHANGED]} unchanged, {counts[CONFLICT]} conflicts, {counts[OBSOLETE]} obsolete{Style.RESET_ALL}")
+    return counts[CONFLICT]
+
+def run_update_command(args):
+    from update import update_project
+
+    results = update_project(args.path, dry_run=args.dry_run)
+    return 1 if print_file_updates(results, args.dry_run) else 0
+
+def run_elements_command(args):
+    from elements import generate_elements, load_spec
+
+    start = time.perf_counter()
+    specs = load_spec(args.spec)
+    results = generate_elements(args.path, specs, args.package_name, workers=args.workers,
+                                force=args.force, dry_run=args.dry_run)
+    conflicts = print_file_updates(results, args.dry_run)
+    print(f"{Fore.CYAN}[*] {len(specs)} elements in {time.perf_counter() - start:.2f}s{Style.RESET_ALL}")
+    return 1 if conflicts else 0
+
+def add_elements(spec: Path, base: Path, files):
+    """Generate the elements of a spec into a project that was just created.
+
+    Returns the project files including the new ones, for the initial commit.
+    """
+    from elements import ELEMENTS_STATE_PATH, generate_elements, load_spec
+
+    with span("generate elements", "phase"):
+        results = generate_elements(base, load_spec(spec))
+    print(f"{Fore.GREEN}[+] {len(results)} elements generated from: {spec}{Style.RESET_ALL}")
+    added = [result.path for result in results] + [ELEMENTS_STATE_PATH]
+    return {**files, **{path: (base / path).read_bytes() for path in added}}
+
+def run_compat_command(args):
+    from compatibility import default_matrix, store_matrix
+
+    if args.import_file:
+        path = store_matrix(json.loads(args.import_file.read_text(encoding="utf-8")))
+        print(f"{Fore.GREEN}[+] Compatibility matrix cached in: {path}{Style.RESET_ALL}")
+    matrix = default_matrix()
+    print(f"{Fore.CYAN}[*] Compatibility matrix of {matrix.updated}{Style.RESET_ALL}")
+    if args.minecraft:
+        compat = matrix.for_minecraft(args.minecraft)
+        lines = ", ".join(sorted(compat.skript_lines, key=lambda line: tuple(map(int, line.split("."))))) or "none known"
+        print(f"Minecraft {args.minecraft}: Java {compat.min_java}+, Skript {lines}")
+        return 0
+    for line in matrix.skript.values():
+        low, high = (".".join(map(str, bound)) for bound in line.minecraft)
+        print(f"Skript {line.line}: Minecraft {low} to {high}, Java {line.java}+")
+    return 0
+
+def run_wrapper_command(args):
+    from gradle_wrapper import GRADLE_VERSION, cached_wrappers, download_wrapper, import_wrapper
+
+    if args.download:
+        print(f"{Fore.CYAN}[*] Downloading Gradle {GRADLE_VERSION}...{Style.RESET_ALL}")
+        download_wrapper()
+        print(f"{Fore.GREEN}[+] Gradle {GRADLE_VERSION} wrapper cached{Style.RESET_ALL}")
+    if args.import_dir:
+        info = import_wrapper(args.import_dir, args.distribution_sha256, args.jar_sha256)
+        print(f"{Fore.GREEN}[+] Gradle {info.gradle_version} wrapper cached{Style.RESET_ALL}")
+        if info.gradle_version != GRADLE_VERSION:
+            print(f"{Fore.YELLOW}[!] Generated projects pin Gradle {GRADLE_VERSION}, "
+                  f"this wrapper won't be used{Style.RESET_ALL}")
+    wrappers = cached_wrappers()
+    if not wrappers:
+        print(f"{Fore.YELLOW}[!] No cached Gradle wrappers{Style.RESET_ALL}")
+    for version, info in wrappers.items():
+        pinned = " (used for new projects)" if version == GRADLE_VERSION else ""
+        print(f"Gradle {version}: distribution sha256 {info.distribution_sha256}{pinned}")
+    return 0
+
+def run_serve_command(args):
+    import asyncio
+    from server import serve
+
+    def ready(server):
+        for sock in server.sockets:
+            host, port = sock.getsockname()[:2]
+            print(f"{Fore.GREEN}[+] Serving on http://{host}:{port}{Style.RESET_ALL}", flush=True)
+
+    # Checked once, so a damaged cache means archives without a wrapper rather than failed requests
+    wrapper = args.wrapper and cached_wrapper() is not None
+    asyncio.run(serve(args.host, args.port, offline=args.offline, cache_ttl=args.cache_ttl,
+                      budget=args.fetch_timeout, refresh_interval=args.refresh_interval, wrapper=wrapper,
+                      ready=ready))
+    return 0
+
+def start_trace():
+    """Enable tracing, including a span around every template render."""
+    import tracing
+    from templates import Templates
+
+    tracer = tracing.enable()
+    tracing.trace_methods(Templates, [name for name in vars(Templates) if name.startswith("get_")], "template")
+    return tracer
+
+def finish_trace(path: str):
+    """Stop tracing, write the trace file and print the summary table."""
+    import tracing
+
+    tracer = tracing.disable()
+    tracing.write_trace(tracer, path)
+    # stderr, so the table never ends up in an archive streamed to stdout
+    print(f"\n{Fore.CYAN}[*] Trace written to: {path}{Style.RESET_ALL}", file=sys.stderr)
+    print(tracing.format_summary(tracer), file=sys.stderr)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.trace:
+        return run(args)
+    start_trace()
+    try:
+        run(args)
+    finally:
+        finish_trace(args.trace)
+
+def run(args):
+    if args.command == "serve":
+        try:
+            sys.exit(run_serve_command(args))
+        except KeyboardInterrupt:
+            sys.exit(0)
+    if args.command in ("batch", "update", "elements", "compat", "wrapper") or args.config:
+        commands = {"batch": run_batch_command, "update": run_update_command, "elements": run_elements_command,
+                    "compat": run_compat_command, "wrapper": run_wrapper_command}
+        try:
+            sys.exit(commands.get(args.command, run_config_command)(args))
+        except KeyboardInterrupt:
+            print(f"\n{Fore.RED}[-] Operation was interrupted by user.{Style.RESET_ALL}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"\n{Fore.RED}[-] An error occurred: {str(e)}{Style.RESET_ALL}")
+            sys.exit(1)
+
+    try:
+        creator = AddonCreator(
+            refresh_versions=args.refresh_versions,
+            offline=args.offline,
+            cache_ttl=args.cache_ttl,
+            fetch_budget=args.fetch_timeout
         )
+        with span("prompts", "phase"):
+            creator.get_inputs()
 
-        # Write README.md
-        (base / "README.md").write_text(
-            templates.get_readme(creator.addon_name)
+        from project import AddonConfig, render_project, write_project
+        config = AddonConfig(
+            addon_name=creator.addon_name,
+            package_name=creator.package_name,
+            impl=creator.impl,
+            java_version=creator.java_version,
+            mc_version=creator.mc_version,
+            skript_version=creator.skript_version,
+            **config_options(args)
         )
+        base = Path(creator.addon_name)
+        if args.output_archive:
+            with span("render project", "phase"):
+                files = add_wrapper(render_project(config), args)
+            export_archive(files, args.output_archive, args.archive_format, config.addon_name)
+            print(f"\n{Fore.GREEN}[+] Addon '{config.addon_name}' archive written to: {args.output_archive}{Style.RESET_ALL}")
+            if creator.use_git:
+                print(f"{Fore.YELLOW}[!] Git repository was not initialized for archive output{Style.RESET_ALL}")
+            return
+        with span("render project", "phase"):
+            files = add_wrapper(render_project(config), args)
+        with span("write project", "phase"):
+            write_project(files, base)
+        if args.elements_spec:
+            files = add_elements(args.elements_spec, base, files)
 
         # Initialize Git
         if creator.use_git:
-            if creator._init_git(base):
+            with span("init git", "phase"):
+                initialized = creator._init_git(base, files)
+            if initialized:
                 print(f"\n{Fore.GREEN}[+] Git repository successfully initialized{Style.RESET_ALL}")
                 print(f"- Primary branch: {creator.primary_branch}")
                 if creator.git_url:
@@ -87,7 +442,7 @@ def main():
         print(f"\n{Fore.GREEN}[+] Addon '{creator.addon_name}' was successfully created in: {base.absolute()}{Style.RESET_ALL}")
         print(f"\n{Fore.YELLOW}[!] Next steps:{Style.RESET_ALL}")
         print("1. Open the project in your IDE")
-        print("2. Run 'gradle build' to build the addon")
+        print(f"2. Run '{'./gradlew' if 'gradlew' in files else 'gradle'} build' to build the addon")
         print("3. Find the built addon in the 'build/libs' directory")
         if creator.use_git:
             print(f"\n{Fore.CYAN}[*] Git commands:{Style.RESET_ALL}")
@@ -0,0 +1,228 @@
+from pathlib import Path
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+from addon_creator import AddonCreator
+from archive import EXECUTABLE_MODE, EXECUTABLE_PATHS
+from templates import COMPONENT_CACHE_SIZE, TEMPLATE_VERSIONS, Templates, uses_paper_api
+from tracing import span
+
+# Boolean AddonConfig fields that switch gradle.properties settings
+GRADLE_SWITCHES = ("gradle_daemon", "gradle_build_cache", "gradle_parallel", "gradle_configuration_cache")
+
+# Boolean AddonConfig fields that switch optional generated code
+CODE_SWITCHES = ("element_index", "optimized_effect", "element_timings", "jmh_benchmarks")
+
+# Boolean AddonConfig fields that switch shadow jar settings
+JAR_SWITCHES = ("minimize_jar", "relocate_dependencies", "reproducible_jar", "jar_report")
+
+# AddonConfig fields that must be strings
+STRING_FIELDS = ("addon_name", "package_name", "impl", "java_version", "mc_version", "skript_version",
+                 "gradle_jvm_args", "gradle_build_cache_dir")
+
+# Generator manifest written into every project, used by the update command
+MANIFEST_PATH = ".addon-creator.json"
+MANIFEST_SCHEMA = 1
+
+
+@dataclass(frozen=True)
+class AddonConfig:
+    """Everything needed to render an addon project, validated on creation."""
+    addon_name: str
+    package_name: str
+    impl: str = "paper"
+    java_version: str = "17"
+    mc_version: str = "1.20.4"
+    skript_version: str = "2.7.3"
+    # gradle.properties switches; empty JVM args are chosen from the Java version
+    gradle_daemon: bool = True
+    gradle_build_cache: bool = True
+    gradle_parallel: bool = True
+    gradle_configuration_cache: bool = True
+    gradle_jvm_args: str = ""
+    # Local build cache directory shared by several projects, if set
+    gradle_build_cache_dir: str = ""
+    # Register elements from a class list generated at build time instead of
+    # scanning the jar on enable
+    element_index: bool = False
+    # Parsed components cached by the generated ColorUtils; 0 disables the cache
+    component_cache_size: int = COMPONENT_CACHE_SIZE
+    # EffExample that parses once and fans out through Paper's audiences
+    # (off the main thread) or in batches across ticks elsewhere
+    optimized_effect: bool = False
+    # Sampled call counts and times per element, "/<addon> timings" and a
+    # periodic log summary; nothing of it is generated when off
+    element_timings: bool = False
+    # "jmh" source set with a JMH benchmark per example element, run against
+    # mocked Bukkit objects by ./gradlew jmh
+    jmh_benchmarks: bool = False
+    # Shadow jar: drop unused library classes, relocate bundled libraries under
+    # the addon's package, build byte-identical jars, and add a jarReport task
+    # (jar size and the enable time the plugin logs)
+    minimize_jar: bool = False
+    relocate_dependencies: bool = False
+    reproducible_jar: bool = False
+    jar_report: bool = False
+
+    def __post_init__(self):
+        for name in STRING_FIELDS:
+            if not isinstance(getattr(self, name), str):
+                raise ValueError(f"{name} must be a string")
+        if not AddonCreator._validate_addon_name(self.addon_name):
+            raise ValueError("Addon name must contain only letters and numbers and start with a letter.")
+        if not AddonCreator._validate_package_name(self.package_name):
+            raise ValueError("Package name must be in format com.example.myaddon")
+        if self.impl not in AddonCreator.available_impls:
+            raise ValueError(f"Implementation must be one of: {', '.join(AddonCreator.available_impls)}")
+        if self.java_version not in AddonCreator.available_java_versions:
+            raise ValueError(f"Java version must be one of: {', '.join(AddonCreator.available_java_versions)}")
+        if not self.mc_version or not self.skript_version:
+            raise ValueError("Minecraft and Skript versions must be set")
+        for name in GRADLE_SWITCHES + CODE_SWITCHES + JAR_SWITCHES:
+            if not isinstance(getattr(self, name), bool):
+                raise ValueError(f"{name} must be true or false")
+        if type(self.component_cache_size) is not int or self.component_cache_size < 0:
+            raise ValueError("component_cache_size must be a whole number, 0 or more")
+        if "\n" in self.gradle_jvm_args or "\n" in self.gradle_build_cache_dir:
+            raise ValueError("Gradle options must not contain line breaks")
+
+
+def render_templates(config: AddonConfig) -> Dict[str, Tuple[str, str]]:
+    """Render every template, returning {path: (template id, text)}."""
+    group_path = config.package_name.replace(".", "/")
+    java = f"src/main/java/{group_path}"
+    elements = f"{java}/elements"
+    resources = "src/main/resources"
+    test_java = f"src/test/java/{group_path}"
+    jmh_java = f"src/jmh/java/{group_path}"
+    paper_api = config.optimized_effect and uses_paper_api(config.impl, config.mc_version)
+    if paper_api:
+        effect_id, render_effect = "example_effect_audience", Templates.get_example_effect_audience
+        broadcaster_id, render_broadcaster = "broadcaster_audience", Templates.get_broadcaster_audience
+    elif config.optimized_effect:
+        effect_id, render_effect = "example_effect_batched", Templates.get_example_effect_batched
+        broadcaster_id, render_broadcaster = "broadcaster_batched", Templates.get_broadcaster_batched
+    else:
+        effect_id, render_effect = "example_effect", Templates.get_example_effect
+        broadcaster_id, render_broadcaster = "broadcaster", Templates.get_broadcaster
+    timings = config.element_timings
+
+    files = {
+        f"{resources}/plugin.yml": ("plugin_yml", Templates.get_plugin_yml(
+            config.addon_name, config.package_name, config.mc_version, timings)),
+        "settings.gradle.kts": ("settings_gradle", Templates.get_settings_gradle(
+            config.addon_name, config.gradle_build_cache_dir)),
+        "gradle.properties": ("gradle_properties", Templates.get_gradle_properties(
+            config.java_version,
+            config.gradle_daemon,
+            config.gradle_build_cache,
+            config.gradle_parallel,
+            config.gradle_configuration_cache,
+            config.gradle_jvm_args
+        )),
+        "build.gradle.kts": ("build_gradle", Templates.get_build_gradle(
+            config.package_name,
+            config.java_version,
+            config.impl,
+            config.mc_version,
+            config.skript_version,
+            config.element_index,
+            paper_api,
+            config.optimized_effect,
+            config.jmh_benchmarks,
+            config.minimize_jar,
+            config.relocate_dependencies,
+            config.reproducible_jar,
+            config.jar_report
+        )),
+        f"{java}/{config.addon_name}.java": ("main_class", Templates.get_main_class(
+            config.addon_name, config.package_name, config.element_index, timings, config.jar_report)),
+        f"{java}/AddonLogger.java": ("logger_class", Templates.get_logger_class(config.package_name)),
+        f"{java}/ColorUtils.java": ("color_utils", Templates.get_color_utils(
+            config.package_name, config.component_cache_size)),
+        f"{java}/Broadcaster.java": (broadcaster_id, render_broadcaster(config.package_name)),
+        f"{java}/PlayerUtils.java": ("player_utils", Templates.get_player_utils(config.package_name)),
+        f"{elements}/EffExample.java": (effect_id, render_effect(config.addon_name, config.package_name, timings)),
+        f"{elements}/CondExample.java": ("example_condition", Templates.get_example_condition(
+            config.addon_name, config.package_name, timings)),
+        f"{elements}/ExprExample.java": ("example_expression", Templates.get_example_expression(
+            config.addon_name, config.package_name, timings)),
+        f"{test_java}/ColorUtilsBenchmark.java": ("color_utils_benchmark",
+                                                  Templates.get_color_utils_benchmark(config.package_name)),
+        "README.md": ("readme", Templates.get_readme(config.addon_name)),
+    }
+    if timings:
+        files[f"{java}/timings/ElementTimings.java"] = ("element_timings", Templates.get_element_timings(config.package_name))
+        files[f"{java}/timings/TimedEffect.java"] = ("timed_effect", Templates.get_timed_effect(config.package_name))
+        files[f"{java}/timings/TimedCondition.java"] = ("timed_condition", Templates.get_timed_condition(config.package_name))
+        files[f"{java}/timings/TimedPropertyExpression.java"] = (
+            "timed_property_expression", Templates.get_timed_property_expression(config.package_name))
+        files[f"{java}/timings/TimedExpression.java"] = ("timed_expression", Templates.get_timed_expression(config.package_name))
+    if config.optimized_effect:
+        files[f"{test_java}/elements/EffExampleBenchmark.java"] = (
+            "example_effect_benchmark", Templates.get_example_effect_benchmark(config.package_name, paper_api))
+    if config.jmh_benchmarks:
+        files[f"{jmh_java}/elements/BukkitMocks.java"] = ("jmh_mocks", Templates.get_jmh_mocks(config.package_name))
+        files[f"{jmh_java}/elements/EffExampleJmh.java"] = (
+            "example_effect_jmh", Templates.get_example_effect_jmh(config.package_name, config.optimized_effect,
+                                                                   paper_api))
+        files[f"{jmh_java}/elements/CondExampleJmh.java"] = (
+            "example_condition_jmh", Templates.get_example_condition_jmh(config.package_name))
+        files[f"{jmh_java}/elements/ExprExampleJmh.java"] = (
+            "example_expression_jmh", Templates.get_example_expression_jmh(config.package_name))
+    return files
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def build_manifest(config: AddonConfig, files: Dict[str, Tuple[str, bytes]]) -> bytes:
+    """Describe which template produced each file and what it looked like."""
+    manifest = {
+        "schema": MANIFEST_SCHEMA,
+        "config": asdict(config),
+        "files": {
+            path: {
+                "template": template_id,
+                "template_version": TEMPLATE_VERSIONS[template_id],
+                "sha256": content_hash(content),
+            }
+            for path, (template_id, content) in sorted(files.items())
+        },
+    }
+    return dump_manifest(manifest)
+
+
+def dump_manifest(manifest: dict) -> bytes:
+    """Serialize a manifest the same way every time."""
+    return (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8")
+
+
+@lru_cache(maxsize=256)
+def render_project(config: AddonConfig) -> Mapping[str, bytes]:
+    """Render a whole addon project in memory.
+
+    Returns a read-only mapping of POSIX paths, relative to the project root,
+    to file contents, including the generator manifest. Rendering needs no
+    TTY, network or disk access, and results are cached per config.
+    """
+    files = {path: (template_id, text.encode("utf-8"))
+             for path, (template_id, text) in render_templates(config).items()}
+    rendered = {path: content for path, (_, content) in files.items()}
+    rendered[MANIFEST_PATH] = build_manifest(config, files)
+    return MappingProxyType(rendered)
+
+
+def write_project(files: Mapping[str, bytes], base: Path):
+    """Write a rendered project below ``base``."""
+    for directory in sorted({str(Path(path).parent) for path in files}):
+        (base / directory).mkdir(parents=True, exist_ok=True)
+    for path, content in files.items():
+        with span("write", "write", path=path, bytes=len(content)):
+            (base / path).write_bytes(content)
+        if path in EXECUTABLE_PATHS:
+            (base / path).chmod(EXECUTABLE_MODE)
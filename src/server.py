@@ -0,0 +1,225 @@
+import asyncio
+import io
+import json
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from archive import ARCHIVE_FORMATS, write_archive
+from batch import CONFIG_FIELDS, check_values, default_versions, fit_versions, resolve_versions, version_indexes
+from compatibility import default_matrix
+from gradle_wrapper import with_wrapper
+from project import AddonConfig, render_project
+from versions import MINECRAFT, SKRIPT, DEFAULT_CACHE_TTL, DEFAULT_FETCH_BUDGET, VersionCache, fetch_all
+
+# How often the in-memory version lists are refreshed (seconds)
+DEFAULT_REFRESH_INTERVAL = 15 * 60
+
+# Largest accepted request body (bytes)
+MAX_BODY_SIZE = 64 * 1024
+
+CONTENT_TYPES = {"zip": "application/zip", "tar.gz": "application/gzip"}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class VersionStore:
+    """Version lists kept warm in memory and refreshed in the background."""
+
+    def __init__(self, cache: VersionCache, offline: bool = False, budget: float = DEFAULT_FETCH_BUDGET):
+        self.cache = cache
+        self.offline = offline
+        self.budget = budget
+        # (fetch results, default versions, version indexes), replaced as a whole
+        # so requests never see parts of two refreshes
+        self.versions = ({}, {}, {})
+        self.updated_at = 0.0
+
+    def refresh(self, force: bool = False):
+        """Reload the version lists; blocking, meant to run in an executor."""
+        results = fetch_all([MINECRAFT, SKRIPT], self.cache, refresh=force,
+                            offline=self.offline, budget=self.budget)
+        default_matrix().precompute(results[MINECRAFT.name].versions)
+        self.versions = (results, default_versions(results), version_indexes(results))
+        self.updated_at = time.time()
+
+    async def refresh_forever(self, interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.refresh, True)
+            except Exception:
+                # Keep serving the previous lists
+                pass
+
+    def as_json(self) -> dict:
+        return {
+            name: {"versions": result.versions, "prereleases": list(result.prereleases), "status": result.status}
+            for name, result in self.versions[0].items()
+        }
+
+
+@lru_cache(maxsize=1024)
+def render_archive(config: AddonConfig, archive_format: str, wrapper: bool = True) -> bytes:
+    """Render a project into archive bytes, memoized per config and format.
+
+    With ``wrapper``, the cached Gradle wrapper is included when there is one.
+    """
+    files = render_project(config)
+    if wrapper:
+        files = with_wrapper(files)
+    out = io.BytesIO()
+    write_archive(files, out, archive_format, config.addon_name)
+    return out.getvalue()
+
+
+class ScaffoldServer:
+    """Minimal asyncio HTTP/1.1 server returning project archives for JSON configs.
+
+    Routes:
+        GET  /health    liveness probe
+        GET  /versions  the warm version lists
+        POST /addon     body: AddonConfig JSON, ``?format=zip|tar.gz``; returns the archive
+    """
+
+    def __init__(self, store: VersionStore, wrapper: bool = True):
+        self.store = store
+        self.wrapper = wrapper
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                keep_alive = await self._respond(head, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            self._send(writer, 400, *self._error("Malformed request line"), keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        try:
+            if "chunked" in headers.get("transfer-encoding", ""):
+                raise HTTPError(411, "Chunked bodies are not supported")
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                raise HTTPError(400, "Invalid Content-Length")
+            if length > MAX_BODY_SIZE:
+                raise HTTPError(413, f"Body larger than {MAX_BODY_SIZE} bytes")
+            body = await reader.readexactly(length) if length else b""
+            status, content_type, payload, extra = await self.route(method, target, body)
+        except HTTPError as e:
+            status, content_type, payload, extra = e.status, *self._error(str(e)), {}
+        except Exception as e:
+            status, content_type, payload, extra = 500, *self._error(f"{type(e).__name__}: {e}"), {}
+        self._send(writer, status, content_type, payload, keep_alive, extra)
+        return keep_alive
+
+    async def route(self, method: str, target: str, body: bytes) -> Tuple[int, str, bytes, Dict[str, str]]:
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, "text/plain", b"ok", {}
+        if url.path == "/versions":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return 200, "application/json", json.dumps(self.store.as_json()).encode(), {}
+        if url.path == "/addon":
+            if method != "POST":
+                raise HTTPError(405, "Use POST")
+            archive_format = parse_qs(url.query).get("format", ["zip"])[0]
+            if archive_format not in ARCHIVE_FORMATS:
+                raise HTTPError(400, f"format must be one of: {', '.join(ARCHIVE_FORMATS)}")
+            config, warnings = self._parse_config(body)
+            filename = f"{config.addon_name}.{archive_format}"
+            # Rendering and compressing would stall every other connection on the loop
+            archive = await asyncio.get_running_loop().run_in_executor(
+                None, render_archive, config, archive_format, self.wrapper)
+            extra = {"Content-Disposition": f'attachment; filename="{filename}"'}
+            if warnings:
+                extra["X-Compatibility-Warning"] = "; ".join(warnings)
+            return 200, CONTENT_TYPES[archive_format], archive, extra
+        raise HTTPError(404, f"No route for {url.path}")
+
+    def _parse_config(self, body: bytes) -> Tuple[AddonConfig, List[str]]:
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Config must be a JSON object")
+        unknown = set(data) - CONFIG_FIELDS
+        if unknown:
+            raise HTTPError(400, f"Unknown config keys: {', '.join(sorted(unknown))}")
+        _, defaults, indexes = self.store.versions
+        try:
+            check_values(data)
+            values = resolve_versions({**defaults, **data}, indexes)
+            config = AddonConfig(**fit_versions(values, data, indexes))
+            return config, default_matrix().validate(config)
+        except (TypeError, ValueError) as e:
+            raise HTTPError(400, str(e))
+
+    @staticmethod
+    def _error(message: str) -> Tuple[str, bytes]:
+        return "application/json", json.dumps({"error": message}).encode()
+
+    @staticmethod
+    def _send(writer: asyncio.StreamWriter, status: int, content_type: str, payload: bytes,
+              keep_alive: bool, extra: Optional[Dict[str, str]] = None):
+        headers = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        headers += [f"{name}: {value}" for name, value in (extra or {}).items()]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, offline: bool = False,
+                cache_ttl: float = DEFAULT_CACHE_TTL, budget: float = DEFAULT_FETCH_BUDGET,
+                refresh_interval: float = DEFAULT_REFRESH_INTERVAL, wrapper: bool = True, ready=None):
+    """Run the scaffold service until cancelled.
+
+    Without ``wrapper``, archives never include the cached Gradle wrapper.
+    """
+    store = VersionStore(VersionCache(ttl=cache_ttl), offline=offline, budget=budget)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, store.refresh)
+
+    server = await asyncio.start_server(ScaffoldServer(store, wrapper).handle, host, port)
+    refresher = asyncio.ensure_future(store.refresh_forever(refresh_interval))
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        refresher.cancel()
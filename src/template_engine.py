@@ -0,0 +1,129 @@
+from pathlib import Path
+import keyword
+import os
+import re
+import sys
+import threading
+from typing import Callable, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+# Placeholders are the only syntax: {{ name }}. Everything else, including the
+# braces of Java and Gradle code, is copied verbatim.
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+TEMPLATE_SUFFIX = ".tmpl"
+
+# Templates shipped with the tool
+PACKAGE_TEMPLATE_DIR = Path(__file__).resolve().parent / "template_files"
+
+
+class CompiledTemplate(NamedTuple):
+    id: str
+    path: Path
+    variables: FrozenSet[str]
+    render: Callable[..., str]
+
+
+def user_config_dir() -> Path:
+    """Return the per-user configuration directory of the tool."""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or str(Path.home() / "AppData" / "Roaming")
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Application Support")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    return Path(base) / "skript-addon-creator"
+
+
+def default_search_path() -> List[Path]:
+    """Override directories first (``SKRIPT_ADDON_CREATOR_TEMPLATES``, then the
+    user config dir), the bundled templates last."""
+    dirs = [Path(entry) for entry in os.environ.get("SKRIPT_ADDON_CREATOR_TEMPLATES", "").split(os.pathsep) if entry]
+    dirs.append(user_config_dir() / "templates")
+    dirs.append(PACKAGE_TEMPLATE_DIR)
+    return dirs
+
+
+def compile_template(source: str, name: str = "<template>") -> Tuple[Callable[..., str], FrozenSet[str]]:
+    """Compile template text into a render function taking the variables as keywords.
+
+    The template is turned once into a Python function returning an f-string,
+    so rendering does no parsing and costs the same as hand-written code.
+    """
+    pieces = []
+    variables = set()
+    position = 0
+    for match in PLACEHOLDER.finditer(source):
+        variable = match.group(1)
+        if keyword.iskeyword(variable) or variable.startswith("_"):
+            raise ValueError(f"{name}: invalid variable name {variable!r}")
+        pieces.append(source[position:match.start()].replace("{", "{{").replace("}", "}}"))
+        pieces.append(f"{{{variable}}}")
+        variables.add(variable)
+        position = match.end()
+    pieces.append(source[position:].replace("{", "{{").replace("}", "}}"))
+
+    # Unknown keywords are accepted and ignored, like with str.format()
+    parameters = "".join(f"{variable}, " for variable in sorted(variables))
+    signature = f"*, {parameters}**_" if variables else "**_"
+    code = f"def render({signature}):\n    return f{''.join(pieces)!r}\n"
+    namespace = {}
+    exec(compile(code, name, "exec"), namespace)
+    return namespace["render"], frozenset(variables)
+
+
+class TemplateRegistry:
+    """Finds, compiles and caches templates by id.
+
+    A template ``<id>.tmpl`` is looked up in the search path in order, so user
+    directories override the bundled files. Each template is read and compiled
+    the first time it is used and kept for the lifetime of the registry.
+    """
+
+    def __init__(self, search_path: Optional[Iterable[Path]] = None):
+        self.search_path = [Path(path) for path in search_path] if search_path is not None else default_search_path()
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def find(self, template_id: str) -> Path:
+        """Return the file a template id resolves to."""
+        for directory in self.search_path:
+            path = directory / f"{template_id}{TEMPLATE_SUFFIX}"
+            if path.is_file():
+                return path
+        raise KeyError(f"Template not found: {template_id}")
+
+    def get(self, template_id: str) -> CompiledTemplate:
+        """Return the compiled template, loading it on first use."""
+        template = self._compiled.get(template_id)
+        if template is None:
+            with self._lock:
+                template = self._compiled.get(template_id)
+                if template is None:
+                    path = self.find(template_id)
+                    # newline="" keeps the file's line endings byte for byte
+                    with open(path, encoding="utf-8", newline="") as file:
+                        render, variables = compile_template(file.read(), str(path))
+                    template = CompiledTemplate(template_id, path, variables, render)
+                    self._compiled[template_id] = template
+        return template
+
+    def variables(self, template_id: str) -> FrozenSet[str]:
+        """Return the names of the variables a template needs."""
+        return self.get(template_id).variables
+
+    def available(self) -> List[str]:
+        """List every template id found in the search path."""
+        ids = set()
+        for directory in self.search_path:
+            if directory.is_dir():
+                ids.update(path.name[:-len(TEMPLATE_SUFFIX)] for path in directory.glob(f"*{TEMPLATE_SUFFIX}"))
+        return sorted(ids)
+
+    def render(self, template_id: str, **values: str) -> str:
+        """Render a template, substituting its placeholders."""
+        template = self.get(template_id)
+        try:
+            return template.render(**values)
+        except TypeError:
+            missing = sorted(template.variables - set(values))
+            raise ValueError(f"Template {template_id} needs variables: {', '.join(missing)}") from None
@@ -1,407 +1,426 @@
+from functools import lru_cache
+from template_engine import TemplateRegistry
+from versions import version_key
+
+# Bump a template's version whenever its output changes; fragments (the
+# templates missing here) count as part of the template that includes them
+TEMPLATE_VERSIONS = {
+    "plugin_yml": 1,
+    "settings_gradle": 2,
+    "build_gradle": 5,
+    "main_class": 2,
+    "logger_class": 1,
+    "color_utils": 2,
+    "color_utils_benchmark": 1,
+    "example_effect": 2,
+    "example_effect_batched": 2,
+    "example_effect_audience": 2,
+    "example_effect_benchmark": 2,
+    "broadcaster": 1,
+    "broadcaster_batched": 2,
+    "broadcaster_audience": 3,
+    "player_utils": 1,
+    "example_effect_jmh": 2,
+    "example_condition_jmh": 2,
+    "example_expression_jmh": 2,
+    "jmh_mocks": 2,
+    "example_condition": 2,
+    "example_expression": 2,
+    "readme": 1,
+    "gitignore": 2,
+    "gradle_properties": 1,
+    "element_timings": 1,
+    "timed_effect": 1,
+    "timed_condition": 1,
+    "timed_property_expression": 1,
+    "timed_expression": 1,
+    "element_effect": 2,
+    "element_condition": 2,
+    "element_expression": 2,
+}
+
+# Gradle daemon JVM arguments per Java version; the parallel collector is the
+# fastest for batch-style work such as builds
+GRADLE_JVM_ARGS = {
+    "8": "-Xmx1g -XX:MaxMetaspaceSize=384m -XX:+UseParallelGC -Dfile.encoding=UTF-8",
+    "11": "-Xmx2g -XX:MaxMetaspaceSize=512m -XX:+UseParallelGC -Dfile.encoding=UTF-8",
+    "17": "-Xmx2g -XX:MaxMetaspaceSize=512m -XX:+UseParallelGC -Dfile.encoding=UTF-8",
+    "21": "-Xmx2g -XX:MaxMetaspaceSize=512m -XX:+UseParallelGC -Dfile.encoding=UTF-8",
+}
+
+# Implementations built on Paper; paper-api (with adventure audiences) is
+# published as io.papermc.paper:paper-api from Minecraft 1.17 on
+PAPER_IMPLS = ("paper", "purpur", "leaf")
+PAPER_API_SINCE = (1, 17)
+PAPER_REPOSITORY = "https://repo.papermc.io/repository/maven-public/"
+
+# JMH Gradle plugin added by the jmh option
+JMH_PLUGIN_VERSION = "0.7.2"
+
+# How EffExampleJmh sends through each Broadcaster variant; its at most 32
+# players are sent to on the calling thread by all of them
+JMH_BROADCASTS = {
+    "loop": "Broadcaster.broadcast(MESSAGE, targets)",
+    "batched": "Broadcaster.sendBatch(MESSAGE, targets, 0)",
+    "audience": "Broadcaster.delivery(MESSAGE, targets).run()",
+}
+
+# Parsed MiniMessage components kept by the generated ColorUtils
+COMPONENT_CACHE_SIZE = 1024
+
+
+# Rendered outputs remembered per template method
+RENDER_CACHE_SIZE = 256
+
+
+def uses_paper_api(impl: str, mc_version: str) -> bool:
+    """Whether a project for this implementation can build against paper-api."""
+    return impl in PAPER_IMPLS and version_key(mc_version)[0] >= PAPER_API_SINCE
+
+
+def server_api(mc_version: str, paper_api: bool = False) -> str:
+    """Maven coordinates of the server API a project compiles against."""
+    if paper_api:
+        return f"io.papermc.paper:paper-api:{mc_version}-R0.1-SNAPSHOT"
+    return f"org.spigotmc:spigot-api:{mc_version}-R0.1-SNAPSHOT"
+
+
+# Timed base class generated for each element base class, see _element()
+TIMED_BASES = {"SimplePropertyExpression": "TimedPropertyExpression", "SimpleExpression": "TimedExpression"}
+
+# Imports of the spec-generated elements, by kind
+ELEMENT_IMPORTS = {
+    "effect": ("ch.njol.skript.lang.Effect",),
+    "condition": ("ch.njol.skript.lang.Condition",),
+    "expression": ("ch.njol.skript.lang.ExpressionType", "ch.njol.skript.lang.util.SimpleExpression"),
+}
+ELEMENT_BASES = {"effect": "Effect", "condition": "Condition", "expression": "SimpleExpression"}
+COMMON_ELEMENT_IMPORTS = (
+    "ch.njol.skript.Skript", "ch.njol.skript.doc.Description", "ch.njol.skript.doc.Examples",
+    "ch.njol.skript.doc.Name", "ch.njol.skript.doc.Since", "ch.njol.skript.lang.Expression",
+    "ch.njol.skript.lang.SkriptParser", "ch.njol.util.Kleenean", "org.bukkit.event.Event",
+    "org.jetbrains.annotations.NotNull",
+)
+
+
+def _java_string(text: str) -> str:
+    """Quote text as a Java string literal."""
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+    return f'"{escaped}"'
+
+
+def _java_strings(values) -> str:
+    """A single string literal, or an array initializer for several."""
+    if len(values) == 1:
+        return _java_string(values[0])
+    return "{" + ", ".join(_java_string(value) for value in values) + "}"
+
+
+def _element(package_name: str, base_class: str, timings: bool) -> dict:
+    """Base class and entry method suffix of an example element.
+
+    Timed elements extend the generated Timed* class of their base, which
+    times the entry method and calls the element's ``*Timed`` implementation.
+    """
+    if timings:
+        timed_base = TIMED_BASES.get(base_class, f"Timed{base_class}")
+        return {"base_class": f"{package_name}.timings.{timed_base}", "timed": "Timed"}
+    return {"base_class": base_class, "timed": ""}
+
+
+def _template(template_id: str):
+    """Return the compiled render function of a template."""
+    return Templates.registry.get(template_id).render
+
+
 class Templates:
+    # Templates are read from template_files/ (or an override directory) and
+    # compiled on first use
+    registry = TemplateRegistry()
+
     @staticmethod
-    def get_plugin_yml(addon_name: str, package_name: str, mc_version: str) -> str:
-        return f"""name: {addon_name}
-version: 1.0.0
-main: {package_name}.{addon_name}
-api-version: {mc_version}
-depend: [Skript]"""
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_plugin_yml(addon_name: str, package_name: str, mc_version: str, timings: bool = False) -> str:
+        commands = ""
+        if timings:
+            command = addon_name.lower()
+            commands = (f"\ncommands:\n  {command}:\n    description: {addon_name} commands\n"
+                        f"    usage: /{command} timings [reset]\n    permission: {command}.timings")
+        return _template("plugin_yml")(addon_name=addon_name, package_name=package_name,
+                                       mc_version=mc_version, commands=commands)
 
     @staticmethod
-    def get_settings_gradle(addon_name: str) -> str:
-        return f"""rootProject.name = "{addon_name}" """
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_settings_gradle(addon_name: str, build_cache_dir: str = "") -> str:
+        build_cache = ""
+        if build_cache_dir:
+            path = build_cache_dir.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$")
+            # A local build cache shared with other projects on this machine
+            build_cache = f'\n\nbuildCache {{\n    local {{\n        directory = file("{path}")\n    }}\n}}\n'
+        return _template("settings_gradle")(addon_name=addon_name, build_cache=build_cache)
 
     @staticmethod
-    def get_build_gradle(package_name: str, java_version: str, impl: str, mc_version: str, skript_version: str) -> str:
-        return f"""plugins {{
-    id 'java'
-    id 'com.github.johnrengelman.shadow' version '8.1.1'
-}}
-
-group = '{package_name}'
-version = '1.0.0'
-
-java {{
-    toolchain {{
-        languageVersion = JavaLanguageVersion.of({java_version})
-    }}
-}}
-
-repositories {{
-    mavenCentral()
-    maven {{ url = 'https://hub.spigotmc.org/nexus/content/repositories/snapshots/' }}
-    maven {{ url = 'https://repo.skriptlang.org/releases' }}
-}}
-
-dependencies {{
-    compileOnly 'org.spigotmc:spigot-api:{mc_version}-R0.1-SNAPSHOT'
-    compileOnly 'ch.njol:skript:{skript_version}'
-}}
-
-tasks.withType(JavaCompile) {{
-    options.encoding = 'UTF-8'
-}}
-
-shadowJar {{
-    archiveBaseName.set(project.name)
-    archiveClassifier.set('')
-    archiveVersion.set(project.version)
-}}
-
-build {{
-    dependsOn shadowJar
-}}
-
-// Release task
-task release(type: Exec) {{
-    dependsOn shadowJar
-    
-    def version = project.findProperty('version') ?: '1.0.0'
-    def description = project.findProperty('description') ?: 'Release ' + version
-    def prerelease = project.findProperty('prerelease') ?: 'false'
-    
-    def token = System.getenv('GITHUB_TOKEN')
-    def repo = System.getenv('GITHUB_REPOSITORY')
-    
-    if (!token || !repo) {{
-        throw new GradleException('GITHUB_TOKEN and GITHUB_REPOSITORY environment variables must be set')
-    }}
-    
-    def releaseData = [
-        tag_name: version,
-        name: version,
-        body: new File(description).text,
-        draft: false,
-        prerelease: prerelease == 'true'
-    ]
-    
-    def releaseJson = groovy.json.JsonOutput.toJson(releaseData)
-    
-    def createRelease = "curl -X POST -H 'Authorization: token $token' -H 'Content-Type: application/json' -d '$releaseJson' https://api.github.com/repos/$repo/releases"
-    def releaseId = exec {{
-        commandLine 'bash', '-c', "$createRelease | jq -r '.id'"
-    }}.standardOutput.asText.trim()
-    
-    def jarFile = "build/libs/$project.name-$version.jar"
-    def uploadUrl = "https://uploads.github.com/repos/$repo/releases/$releaseId/assets?name=$project.name-$version.jar"
-    
-    exec {{
-        commandLine 'bash', '-c', "curl -X POST -H 'Authorization: token $token' -H 'Content-Type: application/java-archive' --data-binary @$jarFile $uploadUrl"
-    }}
-}}"""
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_build_gradle(package_name: str, java_version: str, impl: str, mc_version: str, skript_version: str,
+                         element_index: bool = False, paper_api: bool = False, effect_benchmark: bool = False,
+                         jmh: bool = False, minimize: bool = False, relocate: bool = False,
+                         reproducible: bool = False, jar_report: bool = False) -> str:
+        api = server_api(mc_version, paper_api)
+        index_task = benchmark_task = jmh_plugin = jmh_source_set = report_task = ""
+        if element_index:
+            index_task = _template("build_gradle_element_index")(package_name=package_name,
+                                                                 package_path=package_name.replace(".", "/"))
+        if effect_benchmark:
+            benchmark_task = _template("build_gradle_effect_benchmark")(package_name=package_name, server_api=api)
+        if jmh:
+            jmh_plugin = f'\n    id("me.champeau.jmh") version "{JMH_PLUGIN_VERSION}"'
+            jmh_source_set = _template("build_gradle_jmh")(server_api=api)
+        if jar_report:
+            report_task = _template("build_gradle_jar_report")()
+        # shadowJar settings, in the order they appear in the block
+        shadow_options = "".join(_template(f"build_gradle_{option}")(package_name=package_name)
+                                 for option, enabled in (("minimize", minimize), ("relocation", relocate),
+                                                         ("reproducible", reproducible)) if enabled)
+        return _template("build_gradle")(package_name=package_name, java_version=java_version, impl=impl,
+                                         mc_version=mc_version, skript_version=skript_version, server_api=api,
+                                         paper_repository=f'\n    maven("{PAPER_REPOSITORY}")' if paper_api else "",
+                                         element_index=index_task, effect_benchmark=benchmark_task,
+                                         jmh_plugin=jmh_plugin, jmh=jmh_source_set, shadow_options=shadow_options,
+                                         jar_report=report_task)
 
     @staticmethod
-    def get_main_class(addon_name: str, package_name: str) -> str:
-        return f"""package {package_name};
-
-import ch.njol.skript.Skript;
-import ch.njol.skript.SkriptAddon;
-import org.bukkit.plugin.java.JavaPlugin;
-
-public class {addon_name} extends JavaPlugin {{
-    private static {addon_name} instance;
-    private SkriptAddon addon;
-
-    @Override
-    public void onEnable() {{
-        instance = this;
-        
-        try {{
-            addon = Skript.registerAddon(this);
-            addon.loadClasses("{package_name}.elements");
-            getLogger().info("Addon has been enabled!");
-        }} catch (Exception e) {{
-            getLogger().error("Error loading addon: " + e.getMessage());
-            getServer().getPluginManager().disablePlugin(this);
-        }}
-    }}
-
-    @Override
-    public void onDisable() {{
-        getLogger().info("Addon has been disabled!");
-    }}
-
-    public static {addon_name} getInstance() {{
-        return instance;
-    }}
-
-    public SkriptAddon getAddonInstance() {{
-        return addon;
-    }}
-}}"""
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_main_class(addon_name: str, package_name: str, element_index: bool = False, timings: bool = False,
+                       enable_time: bool = False) -> str:
+        if element_index:
+            # Classes listed at build time by the generateElementIndex task
+            load_elements = ("for (String name : ElementIndex.CLASSES) {\n"
+                             "                Class.forName(name, true, getClassLoader());\n"
+                             "            }")
+            element_source = "build-time index"
+        else:
+            load_elements = f'addon.loadClasses("{package_name}.elements");'
+            element_source = "classpath scan"
+        enable_timings = ""
+        if timings:
+            enable_timings = (f"\n            {package_name}.timings.ElementTimings.enable(this, "
+                              f"\"{addon_name.lower()}\");")
+        enable_clock, enabled_message = "", 'getLogger().info("Addon has been enabled!");'
+        if enable_time:
+            # Read back from the server log by the jarReport task
+            enable_clock = "\n        long enableStart = System.nanoTime();"
+            enabled_message = ('getLogger().info(String.format("Addon has been enabled in %.2f ms", '
+                               '(System.nanoTime() - enableStart) / 1e6));')
+        return _template("main_class")(addon_name=addon_name, package_name=package_name,
+                                       load_elements=load_elements, element_source=element_source,
+                                       timings=enable_timings, enable_clock=enable_clock,
+                                       enabled_message=enabled_message)
 
     @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
     def get_logger_class(package_name: str) -> str:
-        return f"""package {package_name};
+        return _template("logger_class")(package_name=package_name, package_leaf=package_name.split(".")[-1])
 
-import org.bukkit.ChatColor;
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_color_utils(package_name: str, cache_size: int = COMPONENT_CACHE_SIZE) -> str:
+        return _template("color_utils")(package_name=package_name, cache_size=cache_size)
 
-public class AddonLogger {{
-    public static void info(String message) {{
-        log(LogLevel.INFO, message);
-    }}
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_color_utils_benchmark(package_name: str) -> str:
+        return _template("color_utils_benchmark")(package_name=package_name)
 
-    public static void warning(String message) {{
-        log(LogLevel.WARNING, message);
-    }}
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_effect(addon_name: str, package_name: str, timings: bool = False) -> str:
+        return _template("example_effect")(addon_name=addon_name, package_name=package_name,
+                                           **_element(package_name, "Effect", timings))
 
-    public static void error(String message) {{
-        log(LogLevel.ERROR, message);
-    }}
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_effect_batched(addon_name: str, package_name: str, timings: bool = False) -> str:
+        return _template("example_effect_batched")(addon_name=addon_name, package_name=package_name,
+                                                   **_element(package_name, "Effect", timings))
 
-    private static void log(LogLevel level, String message) {{
-        String prefix = ChatColor.GRAY + "[" + level.getColor() + level.name() + ChatColor.GRAY + "] " + ChatColor.RESET;
-        {package_name}.{package_name.split(".")[-1]}.getInstance().getLogger().info(prefix + message);
-    }}
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_effect_audience(addon_name: str, package_name: str, timings: bool = False) -> str:
+        return _template("example_effect_audience")(addon_name=addon_name, package_name=package_name,
+                                                    **_element(package_name, "Effect", timings))
 
-    private enum LogLevel {{
-        INFO(ChatColor.GREEN),
-        WARNING(ChatColor.YELLOW),
-        ERROR(ChatColor.RED);
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_broadcaster(package_name: str) -> str:
+        return _template("broadcaster")(package_name=package_name)
 
-        private final ChatColor color;
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_broadcaster_batched(package_name: str) -> str:
+        return _template("broadcaster_batched")(package_name=package_name)
 
-        LogLevel(ChatColor color) {{
-            this.color = color;
-        }}
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_broadcaster_audience(package_name: str) -> str:
+        return _template("broadcaster_audience")(package_name=package_name)
 
-        public ChatColor getColor() {{
-            return color;
-        }}
-    }}
-}}"""
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_effect_benchmark(package_name: str, paper_api: bool = False) -> str:
+        strategy = "audience" if paper_api else "batched"
+        optimized = _template(f"example_effect_benchmark_{strategy}")()
+        return _template("example_effect_benchmark")(package_name=package_name, strategy=strategy,
+                                                     optimized=optimized)
 
     @staticmethod
-    def get_color_utils(package_name: str) -> str:
-        return f"""package {package_name};
-
-import net.kyori.adventure.text.Component;
-import net.kyori.adventure.text.minimessage.MiniMessage;
-
-public class ColorUtils {{
-    private static final MiniMessage miniMessage = MiniMessage.miniMessage();
-
-    // Predefined colors
-    public static final String PRIMARY = "<#3498db>";
-    public static final String SECONDARY = "<#2ecc71>";
-    public static final String ACCENT = "<#e74c3c>";
-    public static final String WARNING = "<#f1c40f>";
-    public static final String ERROR = "<#e74c3c>";
-    public static final String SUCCESS = "<#2ecc71>";
-    public static final String INFO = "<#95a5a6>";
-
-    // Message templates
-    public static final String SUCCESS_TEMPLATE = "<green>[+] {{message}}</green>";
-    public static final String ERROR_TEMPLATE = "<red>[-] {{message}}</red>";
-    public static final String WARNING_TEMPLATE = "<yellow>[!] {{message}}</yellow>";
-    public static final String INFO_TEMPLATE = "<gray>[*] {{message}}</gray>";
-
-    public static Component parse(String message) {{
-        return miniMessage.deserialize(message);
-    }}
-
-    public static String format(String template, String message) {{
-        return template.replace("{{message}}", message);
-    }}
-}}"""
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_jmh_mocks(package_name: str) -> str:
+        return _template("jmh_mocks")(package_name=package_name)
 
     @staticmethod
-    def get_example_effect(addon_name: str, package_name: str) -> str:
-        return f"""package {package_name}.elements;
-
-import ch.njol.skript.Skript;
-import ch.njol.skript.doc.Description;
-import ch.njol.skript.doc.Examples;
-import ch.njol.skript.doc.Name;
-import ch.njol.skript.doc.Since;
-import ch.njol.skript.lang.Effect;
-import ch.njol.skript.lang.Expression;
-import ch.njol.skript.lang.SkriptParser;
-import ch.njol.util.Kleenean;
-import org.bukkit.entity.Player;
-import org.bukkit.event.Event;
-import org.jetbrains.annotations.NotNull;
-
-@Name("Send Message")
-@Description("Sends a message to a player")
-@Examples({{
-    "send \"Hello!\" to player",
-    "send \"Welcome %player%!\" to all players"
-}})
-@Since("1.0.0")
-public class EffExample extends Effect {{
-    static {{
-        Skript.registerEffect(EffExample.class,
-            "send %string% to %players%"
-        );
-    }}
-
-    private Expression<String> message;
-    private Expression<Player> players;
-
-    @Override
-    protected void execute(@NotNull Event e) {{
-        String msg = message.getSingle(e);
-        if (msg == null) return;
-
-        for (Player player : players.getArray(e)) {{
-            player.sendMessage(msg);
-        }}
-    }}
-
-    @Override
-    public @NotNull String toString(Event e, boolean debug) {{
-        return "send " + message.toString(e, debug) + " to " + players.toString(e, debug);
-    }}
-
-    @Override
-    public boolean init(Expression<?>[] exprs, int matchedPattern, @NotNull Kleenean isDelayed, @NotNull SkriptParser.ParseResult parseResult) {{
-        message = (Expression<String>) exprs[0];
-        players = (Expression<Player>) exprs[1];
-        return true;
-    }}
-}}"""
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_effect_jmh(package_name: str, optimized: bool = False, paper_api: bool = False) -> str:
+        strategy = ("audience" if paper_api else "batched") if optimized else "loop"
+        return _template("example_effect_jmh")(package_name=package_name, broadcast=JMH_BROADCASTS[strategy])
 
     @staticmethod
-    def get_example_condition(addon_name: str, package_name: str) -> str:
-        return f"""package {package_name}.elements;
-
-import ch.njol.skript.Skript;
-import ch.njol.skript.doc.Description;
-import ch.njol.skript.doc.Examples;
-import ch.njol.skript.doc.Name;
-import ch.njol.skript.doc.Since;
-import ch.njol.skript.lang.Condition;
-import ch.njol.skript.lang.Expression;
-import ch.njol.skript.lang.SkriptParser;
-import ch.njol.util.Kleenean;
-import org.bukkit.entity.Player;
-import org.bukkit.event.Event;
-import org.jetbrains.annotations.NotNull;
-
-@Name("Has Permission")
-@Description("Checks if a player has a specific permission")
-@Examples({{
-    "if player has permission \"myaddon.use\":",
-    "    send \"You have permission!\" to player"
-}})
-@Since("1.0.0")
-public class CondExample extends Condition {{
-    static {{
-        Skript.registerCondition(CondExample.class,
-            "%players% (has|have) permission %string%",
-            "%players% (doesn't|does not|do not|don't) have permission %string%"
-        );
-    }}
-
-    private Expression<Player> players;
-    private Expression<String> permission;
-    private boolean isNegated;
-
-    @Override
-    public boolean check(@NotNull Event e) {{
-        String perm = permission.getSingle(e);
-        if (perm == null) return false;
-
-        boolean hasPermission = true;
-        for (Player player : players.getArray(e)) {{
-            if (!player.hasPermission(perm)) {{
-                hasPermission = false;
-                break;
-            }}
-        }}
-
-        return isNegated != hasPermission;
-    }}
-
-    @Override
-    public @NotNull String toString(Event e, boolean debug) {{
-        return players.toString(e, debug) + (isNegated ? " doesn't have" : " has") + " permission " + permission.toString(e, debug);
-    }}
-
-    @Override
-    public boolean init(Expression<?>[] exprs, int matchedPattern, @NotNull Kleenean isDelayed, @NotNull SkriptParser.ParseResult parseResult) {{
-        players = (Expression<Player>) exprs[0];
-        permission = (Expression<String>) exprs[1];
-        isNegated = matchedPattern == 1;
-        return true;
-    }}
-}}"""
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_condition_jmh(package_name: str) -> str:
+        return _template("example_condition_jmh")(package_name=package_name)
 
     @staticmethod
-    def get_example_expression(addon_name: str, package_name: str) -> str:
-        return f"""package {package_name}.elements;
-
-import ch.njol.skript.Skript;
-import ch.njol.skript.doc.Description;
-import ch.njol.skript.doc.Examples;
-import ch.njol.skript.doc.Name;
-import ch.njol.skript.doc.Since;
-import ch.njol.skript.expressions.base.SimplePropertyExpression;
-import ch.njol.skript.lang.Expression;
-import ch.njol.skript.lang.SkriptParser;
-import ch.njol.util.Kleenean;
-import org.bukkit.entity.Player;
-import org.bukkit.event.Event;
-import org.jetbrains.annotations.NotNull;
-
-@Name("Player Name")
-@Description("Returns the name of a player")
-@Examples({{
-    "set {{addon_name}} to player's name",
-    "send \"Your name is %player's name%\" to player"
-}})
-@Since("1.0.0")
-public class ExprExample extends SimplePropertyExpression<Player, String> {{
-    static {{
-        register(ExprExample.class, String.class, "name", "players");
-    }}
-
-    @Override
-    public String convert(Player player) {{
-        return player.getName();
-    }}
-
-    @Override
-    public @NotNull Class<? extends String> getReturnType() {{
-        return String.class;
-    }}
-
-    @Override
-    protected @NotNull String getPropertyName() {{
-        return "name";
-    }}
-}}"""
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_expression_jmh(package_name: str) -> str:
+        return _template("example_expression_jmh")(package_name=package_name)
 
     @staticmethod
-    def get_readme(addon_name: str) -> str:
-        return f"""# {addon_name}
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_player_utils(package_name: str) -> str:
+        return _template("player_utils")(package_name=package_name)
 
-A Skript addon for Minecraft.
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_condition(addon_name: str, package_name: str, timings: bool = False) -> str:
+        return _template("example_condition")(addon_name=addon_name, package_name=package_name,
+                                              **_element(package_name, "Condition", timings))
 
-## Building
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_example_expression(addon_name: str, package_name: str, timings: bool = False) -> str:
+        return _template("example_expression")(addon_name=addon_name, package_name=package_name,
+                                               **_element(package_name, "SimplePropertyExpression", timings))
 
-To build the addon, run:
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_element(package_name: str, spec, timings: bool = False) -> str:
+        """Render an element described by an elements.ElementSpec."""
+        imports = set(COMMON_ELEMENT_IMPORTS) | {java_type for _, java_type in spec.expressions if "." in java_type}
+        if "." in spec.return_type:
+            imports.add(spec.return_type)
+        if not spec.examples:
+            imports.discard("ch.njol.skript.doc.Examples")
+        if not timings:
+            imports.update(ELEMENT_IMPORTS[spec.kind])
+        elif spec.kind == "expression":
+            imports.add("ch.njol.skript.lang.ExpressionType")
+
+        def simple(java_type):
+            return java_type.rsplit(".", 1)[-1]
+
+        types = dict(spec.expressions)
+        fields = "".join(f"    private Expression<{simple(java_type)}> {field};\n"
+                         for field, java_type in spec.expressions)
+
+        def assign(layout, indent):
+            return "".join(f"{indent}{field} = (Expression<{simple(types[field])}>) exprs[{index}];\n"
+                           for index, field in enumerate(layout))
+
+        if len(set(spec.layouts)) == 1:
+            init = assign(spec.layouts[0], " " * 8)
+        else:
+            # Each pattern passes its own expressions; group the patterns that fill the same fields
+            cases = {}
+            for index, layout in enumerate(spec.layouts):
+                if layout:
+                    cases.setdefault(layout, []).append(index)
+            init = "        switch (matchedPattern) {\n" + "".join(
+                "".join(f"            case {index}:\n" for index in indexes)
+                + assign(layout, " " * 16) + "                break;\n"
+                for layout, indexes in cases.items()) + "        }\n"
+        if spec.negated_patterns:
+            init += f"        setNegated(matchedPattern >= {len(spec.patterns)});\n"
+
+        # Fields only some patterns fill are null for the others
+        to_string, text = [], spec.name.lower()
+        for field, _ in spec.expressions:
+            if all(field in layout for layout in spec.layouts):
+                to_string += [_java_string(text + " "), f"{field}.toString(e, debug)"]
+            else:
+                if text:
+                    to_string.append(_java_string(text))
+                to_string.append(f'({field} == null ? "" : " " + {field}.toString(e, debug))')
+            text = ""
+        if text or not to_string:
+            to_string.append(_java_string(text))
+
+        patterns = spec.patterns + spec.negated_patterns
+        return _template(f"element_{spec.kind}")(
+            package_name=package_name,
+            imports="\n".join(f"import {name};" for name in sorted(imports)),
+            class_name=spec.class_name,
+            name=_java_string(spec.name),
+            description=_java_strings(spec.description),
+            examples=f"@Examples({_java_strings(spec.examples)})\n" if spec.examples else "",
+            since=_java_string(spec.since),
+            patterns=",\n".join(f"            {_java_string(pattern)}" for pattern in patterns),
+            fields=f"{fields}\n" if fields else "",
+            init=init,
+            to_string=" + ".join(to_string),
+            return_type=simple(spec.return_type),
+            single=str(spec.single).lower(),
+            expression_type="COMBINED" if spec.expressions else "SIMPLE",
+            **_element(package_name, ELEMENT_BASES[spec.kind], timings))
 
-```bash
-./gradlew build
-```
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_timed_expression(package_name: str) -> str:
+        return _template("timed_expression")(package_name=package_name)
 
-The built addon will be in the `build/libs` directory.
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_element_timings(package_name: str) -> str:
+        return _template("element_timings")(package_name=package_name)
 
-## Creating a Release
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_timed_effect(package_name: str) -> str:
+        return _template("timed_effect")(package_name=package_name)
 
-1. Set the following environment variables:
-   - `GITHUB_TOKEN`: Your GitHub personal access token
-   - `GITHUB_REPOSITORY`: The repository name (e.g. "username/repo")
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_timed_condition(package_name: str) -> str:
+        return _template("timed_condition")(package_name=package_name)
 
-2. Create a release description file (e.g. `2.8.2.md`)
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_timed_property_expression(package_name: str) -> str:
+        return _template("timed_property_expression")(package_name=package_name)
 
-3. Run the release command:
-   ```bash
-   ./gradlew release -Pversion="2.8.2-pre" -Pdescription="2.8.2.md" -Pprerelease=true
-   ```
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_readme(addon_name: str) -> str:
+        return _template("readme")(addon_name=addon_name)
 
-## License
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_gradle_properties(java_version: str, daemon: bool = True, build_cache: bool = True,
+                              parallel: bool = True, configuration_cache: bool = True, jvm_args: str = "") -> str:
+        return _template("gradle_properties")(
+            jvm_args=jvm_args or GRADLE_JVM_ARGS.get(java_version, GRADLE_JVM_ARGS["17"]),
+            daemon=str(daemon).lower(), build_cache=str(build_cache).lower(),
+            parallel=str(parallel).lower(), configuration_cache=str(configuration_cache).lower())
 
-This project is licensed under the MIT License.""" 
\ No newline at end of file
+    @staticmethod
+    @lru_cache(maxsize=RENDER_CACHE_SIZE)
+    def get_gitignore() -> str:
+        return _template("gitignore")()
@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Spans are recorded only while a Tracer is active. Disabled, span() returns a
+# shared no-op object and nothing is wrapped, so untraced runs pay one global
+# lookup per span site at most.
+_tracer = None
+
+
+class SpanStats(NamedTuple):
+    category: str
+    name: str
+    count: int
+    total: float   # milliseconds, including nested spans
+    max: float     # milliseconds
+
+
+class Span:
+    """A timed region, recorded as a complete ("X") trace event on exit."""
+
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def set(self, **args):
+        """Attach extra arguments, e.g. a result known only at the end."""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add(self, end)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """Collects spans from every thread in Chrome trace-event format."""
+
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.events = []
+        self.threads = {}
+        self._patches = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span, end: int):
+        thread = threading.current_thread()
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (span.start - self.origin) / 1000,
+            "dur": (end - span.start) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if span.args:
+            event["args"] = span.args
+        with self._lock:
+            self.events.append(event)
+            self.threads[thread.ident] = thread.name
+
+    def trace_events(self) -> dict:
+        """Return the trace as a JSON object loadable by chrome://tracing and Perfetto."""
+        with self._lock:
+            metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                        for tid, name in self.threads.items()]
+            events = sorted(self.events, key=lambda event: event["ts"])
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> List[SpanStats]:
+        """Aggregate the spans by category and name, slowest total first."""
+        totals: Dict[tuple, list] = {}
+        with self._lock:
+            for event in self.events:
+                stats = totals.setdefault((event["cat"], event["name"]), [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += event["dur"] / 1000
+                stats[2] = max(stats[2], event["dur"] / 1000)
+        return sorted((SpanStats(category, name, *stats) for (category, name), stats in totals.items()),
+                      key=lambda stats: -stats.total)
+
+
+def enable() -> Tracer:
+    """Start recording spans."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop recording, undo trace_methods() and return the finished tracer."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        for owner, name, original in reversed(tracer._patches):
+            setattr(owner, name, original)
+        tracer._patches.clear()
+    return tracer
+
+
+def span(name: str, category: str = "", **args):
+    """Time a ``with`` block; a no-op unless tracing is enabled."""
+    if _tracer is None:
+        return NO_SPAN
+    return Span(_tracer, name, category, args)
+
+
+def trace_methods(owner: type, names: Iterable[str], category: str):
+    """Wrap static methods of ``owner`` in spans until tracing is disabled.
+
+    The methods are only replaced while tracing, so hot paths such as the
+    template renderers carry no extra cost otherwise.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return
+    for name in names:
+        original = owner.__dict__[name]
+        function = getattr(owner, name)
+        label = f"{owner.__name__}.{name}"
+
+        def traced(*args, _function=function, _label=label, **kwargs):
+            with Span(tracer, _label, category, {}):
+                return _function(*args, **kwargs)
+
+        traced.__wrapped__ = function
+        setattr(owner, name, staticmethod(traced))
+        tracer._patches.append((owner, name, original))
+
+
+def write_trace(tracer: Tracer, path: str):
+    """Write the trace-event JSON file."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(tracer.trace_events(), file)
+
+
+def format_summary(tracer: Tracer) -> str:
+    """Render the per-span totals as a text table."""
+    rows = tracer.summary()
+    width = max([len(f"{stats.category}: {stats.name}") for stats in rows] + [4])
+    lines = [f"{'span':<{width}}  {'count':>5}  {'total ms':>10}  {'mean ms':>9}  {'max ms':>9}"]
+    for stats in rows:
+        label = f"{stats.category}: {stats.name}" if stats.category else stats.name
+        lines.append(f"{label:<{width}}  {stats.count:>5}  {stats.total:>10.2f}  "
+                     f"{stats.total / stats.count:>9.3f}  {stats.max:>9.2f}")
+    return "\n".join(lines)
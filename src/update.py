@@ -0,0 +1,101 @@
+from pathlib import Path
+import json
+from typing import List, NamedTuple, Optional
+from project import MANIFEST_PATH, MANIFEST_SCHEMA, AddonConfig, content_hash, dump_manifest, render_project
+
+# Per-file outcomes of update_project()
+UPDATED = "updated"        # template output changed, file untouched by the user: rewritten
+ADDED = "added"            # new template file created
+UNCHANGED = "unchanged"    # template output identical, file left alone
+CONFLICT = "conflict"      # template output changed but the file was modified or removed locally
+OBSOLETE = "obsolete"      # no longer generated; left in place
+
+
+class FileUpdate(NamedTuple):
+    path: str
+    status: str
+    reason: Optional[str] = None
+
+
+def read_manifest(base: Path) -> dict:
+    """Load the generator manifest of an existing project."""
+    path = Path(base) / MANIFEST_PATH
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ValueError(f"{path} not found; the project was not created by this version of the generator")
+    if manifest.get("schema") != MANIFEST_SCHEMA:
+        raise ValueError(f"Unsupported manifest schema: {manifest.get('schema')}")
+    return manifest
+
+
+def _disk_hash(path: Path) -> Optional[str]:
+    try:
+        return content_hash(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def update_project(base: Path, dry_run: bool = False) -> List[FileUpdate]:
+    """Re-render a project from its manifest and apply template changes.
+
+    A file is rewritten only when its template output changed and the file
+    on disk still matches what was generated last time. Files whose output
+    did not change are never opened for writing, so their mtime stays put.
+    """
+    base = Path(base)
+    manifest = read_manifest(base)
+    config = AddonConfig(**manifest["config"])
+    files = render_project(config)
+    new_manifest = json.loads(files[MANIFEST_PATH])
+    recorded = manifest.get("files", {})
+
+    results = []
+    entries = {}
+    for path in sorted(new_manifest["files"]):
+        content = files[path]
+        new_entry = new_manifest["files"][path]
+        old_entry = recorded.get(path)
+        current = _disk_hash(base / path)
+
+        if old_entry and old_entry["sha256"] == new_entry["sha256"]:
+            results.append(FileUpdate(path, UNCHANGED))
+            entries[path] = new_entry
+            continue
+        if current == new_entry["sha256"]:
+            results.append(FileUpdate(path, UNCHANGED, "already up to date"))
+            entries[path] = new_entry
+            continue
+
+        if old_entry is None:
+            if current is None:
+                status, reason = ADDED, None
+            else:
+                status, reason = CONFLICT, "a file with this name already exists"
+        elif current == old_entry["sha256"]:
+            status, reason = UPDATED, None
+        elif current is None:
+            status, reason = CONFLICT, "deleted locally"
+        else:
+            status, reason = CONFLICT, "modified locally"
+
+        if status == CONFLICT:
+            # Keep the old entry so the file stays in conflict until resolved
+            if old_entry:
+                entries[path] = old_entry
+        else:
+            entries[path] = new_entry
+            if not dry_run:
+                (base / path).parent.mkdir(parents=True, exist_ok=True)
+                (base / path).write_bytes(content)
+        results.append(FileUpdate(path, status, reason))
+
+    for path in sorted(set(recorded) - set(new_manifest["files"])):
+        results.append(FileUpdate(path, OBSOLETE, "no longer generated"))
+
+    new_manifest["files"] = entries
+    manifest_bytes = dump_manifest(new_manifest)
+    manifest_path = base / MANIFEST_PATH
+    if not dry_run and manifest_path.read_bytes() != manifest_bytes:
+        manifest_path.write_bytes(manifest_bytes)
+    return results
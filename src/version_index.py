@@ -0,0 +1,111 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from versions import version_key
+
+# Plain release numbers; anything else (-pre1, -rc2, 24w14a, ...) is a prerelease or snapshot
+STABLE_VERSION = re.compile(r"\d+(\.\d+)*")
+
+# Characters ignored by compact matching, so "1204" finds 1.20.4
+SEPARATORS = re.compile(r"[.\-_+]")
+
+
+def _compact(text: str) -> str:
+    return SEPARATORS.sub("", text.lower())
+
+
+class VersionIndex:
+    """Version list indexed for type-ahead lookups.
+
+    Every prefix of every version (as written and with separators removed) is
+    mapped to the matching versions, newest first, when the index is built.
+    Prefix searches and "latest stable for 1.20" lookups are then dictionary
+    hits whose cost does not grow with the list; only fuzzy matching falls
+    back to a scan, and only when no prefix matches.
+    """
+
+    def __init__(self, versions: Iterable[str], prereleases: Iterable[str] = ()):
+        prereleases = set(prereleases)
+        self.versions: Tuple[str, ...] = tuple(sorted(set(versions), key=version_key, reverse=True))
+        self._known = frozenset(self.versions)
+        self.prereleases = frozenset(version for version in self.versions
+                                     if version in prereleases or not STABLE_VERSION.fullmatch(version))
+        # prefix -> versions, newest first; stable and prerelease matches kept apart
+        self._stable: Dict[str, List[str]] = {}
+        self._unstable: Dict[str, List[str]] = {}
+        self._latest: Dict[Tuple[str, bool], str] = {}
+
+        for version in self.versions:
+            stable = version not in self.prereleases
+            table = self._stable if stable else self._unstable
+            keys = {version.lower()[:end] for end in range(len(version) + 1)}
+            compact = _compact(version)
+            keys.update(compact[:end] for end in range(len(compact) + 1))
+            for key in keys:
+                table.setdefault(key, []).append(version)
+
+            # "1", "1.20", "1.20.4" -> newest version in that line
+            core = re.match(r"[\d.]+", version)
+            parts = core.group().strip(".").split(".") if core else []
+            for end in range(len(parts) + 1):
+                line = ".".join(parts[:end])
+                self._latest.setdefault((line, False), version)
+                if stable:
+                    self._latest.setdefault((line, True), version)
+
+    def __contains__(self, version: str) -> bool:
+        return version in self._known
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def is_prerelease(self, version: str) -> bool:
+        return version in self.prereleases
+
+    def stable(self) -> List[str]:
+        """All stable versions, newest first."""
+        return [version for version in self.versions if version not in self.prereleases]
+
+    def search(self, query: str, limit: int = 15, prereleases: bool = True) -> List[str]:
+        """Versions matching ``query``, newest stable ones first.
+
+        ``query`` matches a version prefix, with or without separators
+        ("1.20", "120"); when nothing matches, its characters are matched as
+        a subsequence ("1.2.4" finds 1.20.4). Prereleases follow the stable
+        matches unless ``prereleases`` is false.
+        """
+        query = query.strip().lower()
+        tables = [self._stable, self._unstable] if prereleases else [self._stable]
+        matches = []
+        for key in dict.fromkeys((query, _compact(query))):
+            for table in tables:
+                matches.extend(version for version in table.get(key, ())[:limit] if version not in matches)
+        if matches:
+            stable = [version for version in matches if version not in self.prereleases]
+            return (stable + [version for version in matches if version in self.prereleases])[:limit]
+
+        pattern = _compact(query)
+        for want_stable in (True, False) if prereleases else (True,):
+            for version in self.versions:
+                if (version not in self.prereleases) == want_stable and _is_subsequence(pattern, _compact(version)):
+                    matches.append(version)
+                    if len(matches) == limit:
+                        return matches
+        return matches
+
+    def latest(self, line: str = "", stable: bool = True) -> Optional[str]:
+        """Newest version of a release line, e.g. ``latest("1.20")`` -> ``"1.20.6"``."""
+        return self._latest.get((line.strip().strip("."), stable))
+
+    def resolve(self, spec: str) -> Optional[str]:
+        """Resolve a release line to its newest stable version ("1.20" -> "1.20.6").
+
+        A full version resolves to itself, a prerelease only when asked for
+        by name; None if the index knows neither.
+        """
+        spec = spec.strip()
+        return self.latest(spec) or (spec if spec in self else self.latest(spec, stable=False))
+
+
+def _is_subsequence(pattern: str, text: str) -> bool:
+    characters = iter(text)
+    return all(character in characters for character in pattern)
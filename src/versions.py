@@ -0,0 +1,328 @@
+from pathlib import Path
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+from tracing import span
+
+# Cache file layout version; bump when the stored structure changes
+CACHE_SCHEMA = 2
+
+# Default time-to-live of cached version lists (seconds)
+DEFAULT_CACHE_TTL = 6 * 60 * 60
+
+# Default overall latency budget for loading all version lists (seconds)
+DEFAULT_FETCH_BUDGET = 5.0
+
+# Maximum number of result pages downloaded in parallel for one source
+PAGE_WORKERS = 8
+
+# Fetch outcomes reported by fetch_versions()
+STATUS_CACHED = "cached"            # served from a fresh cache entry, no network
+STATUS_NOT_MODIFIED = "not-modified"  # expired entry revalidated with a 304
+STATUS_FETCHED = "fetched"          # full download
+STATUS_STALE = "stale"              # network failed or offline, expired cache used
+STATUS_DEFAULT = "default"          # nothing usable, built-in defaults used
+
+
+class VersionSource(NamedTuple):
+    name: str
+    url: str
+    # Turns the list of downloaded pages into an ordered {version: prerelease} map
+    parse: Callable[[List[object]], Dict[str, bool]]
+    defaults: List[str]
+    params: Optional[Dict[str, str]] = None
+    paginate: bool = False
+
+
+class FetchResult(NamedTuple):
+    source: str
+    versions: List[str]
+    status: str
+    elapsed: float = 0.0
+    timed_out: bool = False
+    prereleases: Tuple[str, ...] = ()
+
+    @property
+    def degraded(self) -> bool:
+        """Whether the list may be out of date."""
+        return self.status in (STATUS_STALE, STATUS_DEFAULT)
+
+
+def version_key(version: str) -> tuple:
+    """Sort key ordering versions by semver precedence (prereleases before releases)."""
+    core, _, pre = version.partition("-")
+    numeric = re.match(r"[\d.]+", core)
+    numbers = tuple(int(part) for part in re.findall(r"\d+", numeric.group())) if numeric else ()
+    if not pre:
+        return numbers, 1, ()
+    # Compare prerelease identifiers numerically where possible ("beta10" > "beta9")
+    parts = tuple((0, int(part)) if part.isdigit() else (1, part)
+                  for part in re.findall(r"\d+|[A-Za-z]+", pre))
+    return numbers, 0, parts
+
+
+def _parse_paper_versions(pages) -> Dict[str, bool]:
+    return {version: False for version in pages[0]["versions"]}
+
+
+def _parse_skript_releases(pages) -> Dict[str, bool]:
+    releases = {}
+    for page in pages:
+        for release in page:
+            version = release["tag_name"].replace("v", "")
+            releases.setdefault(version, bool(release.get("prerelease")))
+    return {version: releases[version]
+            for version in sorted(releases, key=version_key, reverse=True)}
+
+
+MINECRAFT = VersionSource(
+    "minecraft",
+    "https://api.papermc.io/v2/projects/paper",
+    _parse_paper_versions,
+    ["1.20.4", "1.20.2", "1.19.4", "1.18.2"],
+)
+
+SKRIPT = VersionSource(
+    "skript",
+    "https://api.github.com/repos/SkriptLang/Skript/releases",
+    _parse_skript_releases,
+    ["2.7.3", "2.7.2", "2.7.1"],
+    params={"per_page": "100"},
+    paginate=True,
+)
+
+
+def user_cache_dir() -> Path:
+    """Return the per-user cache directory of the tool."""
+    override = os.environ.get("SKRIPT_ADDON_CREATOR_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "skript-addon-creator"
+
+
+class VersionCache:
+    """Versioned on-disk cache of version lists and their HTTP validators."""
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = DEFAULT_CACHE_TTL):
+        self.path = Path(path) if path else user_cache_dir() / "versions.json"
+        self.ttl = ttl
+        self._entries = None
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, dict]:
+        """Read the cache file, ignoring missing, corrupt or outdated files."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = {}
+                try:
+                    data = json.loads(self.path.read_text(encoding="utf-8"))
+                    if data.get("schema") == CACHE_SCHEMA and isinstance(data.get("sources"), dict):
+                        self._entries = data["sources"]
+                except (OSError, ValueError, AttributeError):
+                    pass
+            return self._entries
+
+    def get(self, source: str) -> Optional[dict]:
+        """Return the cached entry of a source, if any."""
+        entry = self._load().get(source)
+        if isinstance(entry, dict) and isinstance(entry.get("versions"), list):
+            return entry
+        return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Check whether an entry is still within the TTL."""
+        fetched_at = entry.get("fetched_at")
+        return isinstance(fetched_at, (int, float)) and time.time() - fetched_at < self.ttl
+
+    def store(self, source: str, versions: List[str], etag: Optional[str] = None,
+              last_modified: Optional[str] = None, prereleases: Tuple[str, ...] = ()):
+        """Store a freshly downloaded version list."""
+        with self._lock:
+            self._load()[source] = {
+                "versions": versions,
+                "prereleases": list(prereleases),
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+            }
+            self.save()
+
+    def touch(self, source: str):
+        """Restart the TTL of an entry confirmed unchanged by the server."""
+        with self._lock:
+            entry = self.get(source)
+            if entry:
+                entry["fetched_at"] = time.time()
+                self.save()
+
+    def save(self):
+        """Atomically write the cache file."""
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps({"schema": CACHE_SCHEMA, "sources": self._load()}), encoding="utf-8")
+                os.replace(str(tmp), str(self.path))
+            except OSError:
+                # A read-only cache must never break addon creation
+                pass
+
+
+def _from_cache(source: VersionSource, entry: dict, status: str) -> FetchResult:
+    prereleases = entry.get("prereleases")
+    return FetchResult(source.name, entry["versions"], status,
+                       prereleases=tuple(prereleases) if isinstance(prereleases, list) else ())
+
+
+def _fallback(source: VersionSource, cache: VersionCache) -> FetchResult:
+    """Return the best list available without waiting for the network."""
+    try:
+        entry = cache.get(source.name)
+        if entry:
+            return _from_cache(source, entry, STATUS_STALE)
+    except Exception:
+        # A damaged cache must never break addon creation
+        pass
+    return FetchResult(source.name, list(source.defaults), STATUS_DEFAULT)
+
+
+def _page_url(url: str, page: int) -> str:
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query["page"] = [str(page)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
+
+def fetch_remaining_pages(session, first, timeout: float, workers: int = PAGE_WORKERS) -> List[object]:
+    """Download every page after ``first`` by following its ``Link`` header.
+
+    When the server announces the last page, pages 2..last are requested in
+    parallel (at most ``workers`` at a time) over the shared keep-alive
+    session; otherwise the ``next`` links are walked one by one.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    links = first.links
+    if "last" in links:
+        last_url = links["last"]["url"]
+        last_page = int(parse_qs(urlparse(last_url).query).get("page", ["1"])[0])
+
+        def get_page(page):
+            with span(f"GET page {page}", "http", url=last_url):
+                response = session.get(_page_url(last_url, page), timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+
+        pages = list(range(2, last_page + 1))
+        if not pages:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pages)))) as executor:
+            return list(executor.map(get_page, pages))
+
+    pages = []
+    while "next" in links:
+        with span("GET next page", "http", url=links["next"]["url"]):
+            response = session.get(links["next"]["url"], timeout=timeout)
+        response.raise_for_status()
+        pages.append(response.json())
+        links = response.links
+    return pages
+
+
+def fetch_versions(source: VersionSource, cache: VersionCache, refresh: bool = False,
+                   offline: bool = False, timeout: float = 10) -> FetchResult:
+    """Load the version list of a source, going to the network only when needed.
+
+    The result status is one of the STATUS_* outcomes.
+    """
+    try:
+        entry = cache.get(source.name)
+        if entry and (offline or (not refresh and cache.is_fresh(entry))):
+            return _from_cache(source, entry, STATUS_CACHED if cache.is_fresh(entry) else STATUS_STALE)
+    except Exception:
+        entry = None
+    if offline:
+        return FetchResult(source.name, list(source.defaults), STATUS_DEFAULT)
+
+    headers = {}
+    if entry:
+        if isinstance(entry.get("etag"), str):
+            headers["If-None-Match"] = entry["etag"]
+        if isinstance(entry.get("last_modified"), str):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        # Imported here: requests is the slowest import of the tool and only needed on a cache miss
+        import requests
+
+        with requests.Session() as session:
+            with span("GET first page", "http", url=source.url):
+                response = session.get(source.url, headers=headers, params=source.params, timeout=timeout)
+            if response.status_code == 304 and entry:
+                # For paginated sources the first page changes whenever anything new is published
+                cache.touch(source.name)
+                return _from_cache(source, entry, STATUS_NOT_MODIFIED)
+            response.raise_for_status()
+            pages = [response.json()]
+            if source.paginate:
+                pages += fetch_remaining_pages(session, response, timeout)
+        releases = source.parse(pages)
+        versions = list(releases)
+        prereleases = tuple(version for version, prerelease in releases.items() if prerelease)
+        cache.store(source.name, versions, response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"), prereleases)
+        return FetchResult(source.name, versions, STATUS_FETCHED, prereleases=prereleases)
+    except Exception:
+        return _fallback(source, cache)
+
+
+def fetch_all(sources: List[VersionSource], cache: VersionCache, refresh: bool = False,
+              offline: bool = False, budget: float = DEFAULT_FETCH_BUDGET) -> Dict[str, FetchResult]:
+    """Load several version lists concurrently within one overall latency budget.
+
+    Every source falls back on its own to the cached copy or the built-in
+    defaults when it misses the deadline, so the call never takes much longer
+    than ``budget`` seconds. Fetches run on daemon threads: one that finishes
+    late still updates the cache while the process runs, but never keeps it
+    from exiting.
+    """
+    start = time.monotonic()
+    deadline = start + budget
+    finished = {}
+
+    def timed(source):
+        try:
+            with span(f"fetch {source.name}", "versions") as fetch:
+                result = fetch_versions(source, cache, refresh, offline, timeout=budget)
+                fetch.set(status=result.status, count=len(result.versions))
+            finished[source.name] = result._replace(elapsed=time.monotonic() - start)
+        except Exception:
+            pass
+
+    threads = {source.name: threading.Thread(target=timed, args=(source,), name=f"fetch {source.name}",
+                                             daemon=True)
+               for source in sources}
+    for thread in threads.values():
+        thread.start()
+    for thread in threads.values():
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    results = {}
+    for source in sources:
+        result = finished.get(source.name)
+        if result is None:
+            result = _fallback(source, cache)._replace(elapsed=time.monotonic() - start,
+                                                       timed_out=threads[source.name].is_alive())
+        results[source.name] = result
+    return results
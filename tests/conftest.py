@@ -0,0 +1,5 @@
+from pathlib import Path
+import sys
+
+# The tool is a set of flat modules in src/, imported by plain name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
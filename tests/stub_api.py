@@ -0,0 +1,72 @@
+"""Local stand-in for the Paper and GitHub version APIs, shared by the tests and benchmarks."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def github_releases(pages: int, per_page: int = 100) -> list:
+    """``pages`` pages of GitHub-shaped releases, every fifth one a prerelease."""
+    return [[{"tag_name": f"{major}.{minor}.{page}", "prerelease": minor % 5 == 0}
+             for major in range(per_page // 10) for minor in range(10)]
+            for page in range(1, pages + 1)]
+
+
+class StubAPI:
+    """Serves ``pages`` of JSON on a free local port, each after ``latency`` seconds.
+
+    Pages are picked by the ``page`` query parameter and linked with GitHub's
+    ``Link`` header (``next`` and ``last``). Every response carries ``etag``
+    and a matching If-None-Match gets a 304; any other ``status`` is sent
+    with an empty body. Requests are logged as (path, headers) in ``requests``.
+    """
+
+    def __init__(self, pages=None, latency: float = 0.0, path: str = "/versions"):
+        self.pages = pages if pages is not None else [{"versions": ["1.20.4", "1.20.2"]}]
+        self.latency = latency
+        self.etag = '"v1"'
+        self.status = 200
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real APIs; headers and body go out in one write,
+            # so a response doesn't wait for a delayed ACK
+            protocol_version = "HTTP/1.1"
+            wbufsize = -1
+
+            def do_GET(self):
+                stub.requests.append((self.path, dict(self.headers)))
+                time.sleep(stub.latency)
+                if stub.status != 200:
+                    return self.send(stub.status)
+                if self.headers.get("If-None-Match") == stub.etag:
+                    return self.send(304)
+                page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+                links = [f'<{stub.url}?page={page + 1}>; rel="next"'] if page < len(stub.pages) else []
+                if len(stub.pages) > 1:
+                    links.append(f'<{stub.url}?page={len(stub.pages)}>; rel="last"')
+                headers = {"ETag": stub.etag, "Content-Type": "application/json"}
+                if links:
+                    headers["Link"] = ", ".join(links)
+                self.send(200, json.dumps(stub.pages[page - 1]).encode(), headers)
+
+            def send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}{path}"
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,103 @@
+from pathlib import Path
+import hashlib
+import io
+import subprocess
+import sys
+import tarfile
+import zipfile
+import pytest
+from archive import ARCHIVE_FORMATS, archive_format_for, write_archive
+from project import AddonConfig, render_project
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+FILES = {"src/Main.java": b"class Main {}\n", "gradlew": b"#!/bin/sh\n", "README.md": b"# Test\n"}
+
+# Renders a project and prints the archive's digest, in a fresh interpreter
+DIGEST_SCRIPT = """
+import hashlib, io, sys
+sys.path.insert(0, {src!r})
+from archive import write_archive
+from project import AddonConfig, render_project
+files = render_project(AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon"))
+out = io.BytesIO()
+write_archive(files, out, {archive_format!r}, "TestAddon")
+print(hashlib.sha256(out.getvalue()).hexdigest())
+"""
+
+
+class Pipe(io.RawIOBase):
+    """A write-only stream that can't seek or tell, like a socket or stdout pipe."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.data += data
+        return len(data)
+
+
+def archive(files, archive_format, root=""):
+    out = io.BytesIO()
+    write_archive(files, out, archive_format, root)
+    return out.getvalue()
+
+
+def digest_in_new_process(archive_format):
+    script = DIGEST_SCRIPT.format(src=str(SRC), archive_format=archive_format)
+    return subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+
+
+@pytest.mark.parametrize("archive_format", ARCHIVE_FORMATS)
+def test_archives_are_byte_identical_across_runs(archive_format):
+    first = digest_in_new_process(archive_format)
+    second = digest_in_new_process(archive_format)
+
+    assert first == second
+    files = render_project(AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon"))
+    assert hashlib.sha256(archive(files, archive_format, "TestAddon")).hexdigest() == first.strip()
+
+
+@pytest.mark.parametrize("archive_format", ARCHIVE_FORMATS)
+def test_entry_order_doesnt_depend_on_the_mapping(archive_format):
+    assert archive(FILES, archive_format) == archive(dict(reversed(list(FILES.items()))), archive_format)
+
+
+def test_zip_entries_and_modes():
+    with zipfile.ZipFile(io.BytesIO(archive(FILES, "zip", "TestAddon/"))) as zipped:
+        infos = {info.filename: info for info in zipped.infolist()}
+        assert list(infos) == ["TestAddon/README.md", "TestAddon/gradlew", "TestAddon/src/Main.java"]
+        assert zipped.read("TestAddon/src/Main.java") == FILES["src/Main.java"]
+    assert infos["TestAddon/gradlew"].external_attr >> 16 == 0o100755
+    assert infos["TestAddon/README.md"].external_attr >> 16 == 0o100644
+    assert {info.date_time for info in infos.values()} == {(1980, 1, 1, 0, 0, 0)}
+
+
+def test_tar_entries_and_modes():
+    with tarfile.open(fileobj=io.BytesIO(archive(FILES, "tar.gz")), mode="r:gz") as tarred:
+        members = {member.name: member for member in tarred.getmembers()}
+        assert list(members) == ["README.md", "gradlew", "src/Main.java"]
+        assert tarred.extractfile("src/Main.java").read() == FILES["src/Main.java"]
+    assert members["gradlew"].mode == 0o755
+    assert members["README.md"].mode == 0o644
+    assert {(member.uid, member.uname) for member in members.values()} == {(0, "")}
+
+
+@pytest.mark.parametrize("archive_format", ARCHIVE_FORMATS)
+def test_archives_stream_to_unseekable_outputs(archive_format):
+    out = Pipe()
+    write_archive(FILES, out, archive_format)
+
+    assert bytes(out.data) == archive(FILES, archive_format)
+
+
+def test_format_detection_and_unknown_formats():
+    assert archive_format_for("addon.tgz") == "tar.gz"
+    assert archive_format_for("addon.tar.gz") == "tar.gz"
+    assert archive_format_for("addon.zip") == "zip"
+    assert archive_format_for("-", default="tar.gz") == "tar.gz"
+    with pytest.raises(ValueError, match="Archive format must be one of"):
+        write_archive(FILES, io.BytesIO(), "rar")
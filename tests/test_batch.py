@@ -0,0 +1,67 @@
+import pytest
+from batch import run_batch
+
+VERSIONS = {"mc_version": "1.20.4", "skript_version": "2.8.0"}
+
+
+def entry(**values):
+    return {"addon_name": "TestAddon", "package_name": "com.example.testaddon", **values}
+
+
+def test_entries_are_written_below_the_output_dir(tmp_path):
+    results = run_batch([entry(), entry(addon_name="Other", path="nested/other")], tmp_path / "out", VERSIONS,
+                        workers=1, wrapper=False)
+
+    assert [result.ok for result in results] == [True, True]
+    assert (tmp_path / "out" / "TestAddon" / "build.gradle.kts").is_file()
+    assert (tmp_path / "out" / "nested" / "other" / "build.gradle.kts").is_file()
+
+
+@pytest.mark.parametrize("path", ["../escaped", "nested/../../escaped", "/tmp/escaped", "."])
+def test_paths_outside_the_output_dir_are_rejected(tmp_path, path):
+    if path.startswith("/"):
+        path = str(tmp_path / "escaped")
+    results = run_batch([entry(path=path), entry(addon_name="Other")], tmp_path / "out", VERSIONS,
+                        workers=1, wrapper=False)
+
+    assert not results[0].ok
+    assert "is not inside the output directory" in results[0].error
+    assert not (tmp_path / "escaped").exists()
+    # Other entries still run
+    assert results[1].ok
+
+
+def test_failed_entries_are_reported_per_entry(tmp_path):
+    results = run_batch([entry(unknown=1), entry(addon_name="1Bad"), entry()], tmp_path, VERSIONS,
+                        workers=1, wrapper=False)
+
+    assert [result.ok for result in results] == [False, False, True]
+    assert "Unknown manifest keys: unknown" in results[0].error
+    assert results[1].error.startswith("ValueError")
+
+
+def test_process_pool_gives_the_same_results(tmp_path):
+    entries = [entry(addon_name=f"Addon{index}", path=f"addon{index}") for index in range(3)] + [entry(path="..")]
+    results = run_batch(entries, tmp_path / "out", VERSIONS, workers=2, wrapper=False)
+
+    assert [result.ok for result in results] == [True, True, True, False]
+    assert [result.name for result in results] == ["Addon0", "Addon1", "Addon2", "TestAddon"]
+
+
+@pytest.mark.parametrize("values, message", [({"mc_version": ""}, "mc_version must not be empty"),
+                                             ({"mc_version": 1.2}, "mc_version must be a string")])
+def test_empty_or_mistyped_versions_are_rejected(tmp_path, values, message):
+    result, = run_batch([entry(**values)], tmp_path, VERSIONS, workers=1, wrapper=False)
+
+    assert not result.ok
+    assert result.error == f"ValueError: {message}"
+
+
+def test_unknown_skript_lines_are_built_with_a_warning(tmp_path):
+    results = run_batch([entry(skript_version="2.99.0"), entry(addon_name="Other")], tmp_path, VERSIONS,
+                        workers=1, wrapper=False)
+
+    assert [result.ok for result in results] == [True, True]
+    assert len(results[0].warnings) == 1
+    assert "Skript 2.99.0 is not in the compatibility matrix" in results[0].warnings[0]
+    assert results[1].warnings == ()
@@ -0,0 +1,88 @@
+import pytest
+from compatibility import (COMPAT_SCHEMA, CompatibilityError, CompatibilityMatrix, default_matrix, load_matrix,
+                           skript_line, store_matrix)
+from project import AddonConfig
+
+MATRIX = {
+    "schema": COMPAT_SCHEMA,
+    "updated": "2025-01-15",
+    "java": [{"minecraft": "1.20.5", "java": 21}, {"minecraft": "1.18", "java": 17}, {"minecraft": "1.0", "java": 8}],
+    "skript": [
+        {"skript": "2.9", "minecraft": ["1.19.4", "1.21.1"], "java": 17},
+        {"skript": "2.7", "minecraft": ["1.13.2", "1.20.4"], "java": 11},
+    ],
+}
+
+
+@pytest.fixture
+def matrix():
+    return CompatibilityMatrix(MATRIX)
+
+
+def config(**versions):
+    return AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", **versions)
+
+
+def test_skript_line():
+    assert skript_line("2.7.3") == "2.7"
+    assert skript_line("2.9.0-beta1") == "2.9"
+
+
+def test_minimum_java_and_skript_lines_per_minecraft_version(matrix):
+    assert matrix.for_minecraft("1.20.6") == (21, frozenset({"2.9"}))
+    assert matrix.for_minecraft("1.20.4") == (17, frozenset({"2.9", "2.7"}))
+    assert matrix.for_minecraft("1.12.2") == (8, frozenset())
+    assert matrix.java_choices("1.20.6", ["8", "17", "21"]) == ["21"]
+
+
+def test_supports_skript(matrix):
+    assert matrix.supports_skript("1.20.4", "2.7.3", "17")
+    assert not matrix.supports_skript("1.20.6", "2.7.3")
+    assert not matrix.supports_skript("1.20.4", "2.9.0", "11")
+
+
+def test_problems_name_every_incompatibility(matrix):
+    assert matrix.problems("1.20.6", "17", "2.7.3") == [
+        "Minecraft 1.20.6 needs Java 21 or newer (got Java 17)",
+        "Skript 2.7.3 supports Minecraft 1.13.2 to 1.20.4 (got 1.20.6)",
+    ]
+    with pytest.raises(CompatibilityError, match="needs Java 21"):
+        matrix.validate(config(mc_version="1.20.6", java_version="17", skript_version="2.9.0"))
+
+
+def test_known_combinations_have_no_warnings(matrix):
+    assert matrix.warnings("1.20.4", "17", "2.7.3") == []
+    assert matrix.validate(config(mc_version="1.20.4", java_version="17", skript_version="2.7.3")) == []
+
+
+def test_skript_lines_missing_from_the_matrix_are_a_flagged_fallback(matrix):
+    # Let through, since the matrix may just be older than the release...
+    assert matrix.supports_skript("1.20.4", "2.11.0", "17")
+    assert matrix.problems("1.20.4", "17", "2.11.0") == []
+    # ...but never silently
+    warnings = matrix.validate(config(mc_version="1.20.4", java_version="17", skript_version="2.11.0"))
+    assert warnings == ["Skript 2.11.0 is not in the compatibility matrix of 2025-01-15; "
+                        "assuming it supports Minecraft 1.20.4 and Java 17"]
+
+
+@pytest.mark.parametrize("data", [
+    {**MATRIX, "schema": COMPAT_SCHEMA + 1},
+    {**MATRIX, "java": [{"minecraft": "1.18"}]},
+    {**MATRIX, "skript": None},
+])
+def test_invalid_matrices_are_rejected(data):
+    with pytest.raises(ValueError):
+        CompatibilityMatrix(data)
+
+
+def test_newer_cached_matrix_wins(tmp_path, monkeypatch):
+    monkeypatch.setenv("SKRIPT_ADDON_CREATOR_CACHE_DIR", str(tmp_path))
+    default_matrix.cache_clear()
+    bundled = load_matrix()
+    try:
+        store_matrix({**MATRIX, "updated": "1999-01-01"})
+        assert default_matrix().updated == bundled.updated
+        store_matrix({**MATRIX, "updated": "9999-01-01"})
+        assert default_matrix().updated == "9999-01-01"
+    finally:
+        default_matrix.cache_clear()
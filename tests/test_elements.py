@@ -0,0 +1,148 @@
+import json
+import pytest
+import elements
+from elements import ELEMENTS_STATE_PATH, SKRIPT_TYPES, generate_elements, load_spec, parse_element
+from project import AddonConfig, render_project, write_project
+from templates import Templates
+from update import ADDED, CONFLICT, OBSOLETE, UNCHANGED, UPDATED
+
+PACKAGE = "com.example.testaddon"
+DIRECTORY = "src/main/java/com/example/testaddon/elements"
+
+HEAL = {"kind": "effect", "class": "EffHeal", "patterns": ["heal %players% by %number%"],
+        "examples": ["heal all players by 5"]}
+IN_REGION = {"kind": "condition", "class": "CondInRegion",
+             "patterns": ["%players% (is|are) in %world%", "%player% is at %location% in %world%"],
+             "negated_patterns": ["%players% (isn't|aren't) in %world%"]}
+
+
+def write_spec(path, entries, **extra):
+    path.write_text(json.dumps({"elements": entries, **extra}), encoding="utf-8")
+    return path
+
+
+def statuses(results):
+    return {result.path.rsplit("/", 1)[-1]: result.status for result in results}
+
+
+def test_spec_fields_types_and_defaults(tmp_path):
+    spec = load_spec(write_spec(tmp_path / "spec.json", [
+        {"kind": "expression", "class": "ExprRegionNames", "patterns": ["[the] region names of %players%"],
+         "return_type": "regions"},
+        HEAL,
+    ], defaults={"since": "1.2.0"}, types={"Region": "com.example.regions.Region"}))
+
+    names, heal = spec
+    assert names.expressions == (("players", "org.bukkit.entity.Player"),)
+    assert names.return_type == "com.example.regions.Region" and not names.single
+    assert names.name == "Region Names" and names.since == "1.2.0"
+    assert heal.expressions == (("players", "org.bukkit.entity.Player"), ("number", "Number"))
+    assert heal.examples == ("heal all players by 5",)
+
+
+@pytest.mark.parametrize("entry, message", [
+    ({"kind": "function", "class": "Fn", "patterns": ["x"]}, "'kind'"),
+    ({"kind": "effect", "class": "effHeal", "patterns": ["x"]}, "'class'"),
+    ({"kind": "effect", "class": "EffHeal"}, "pattern"),
+    ({"kind": "effect", "class": "EffHeal", "patterns": ["x"], "negated_patterns": ["y"]}, "negated"),
+    ({"kind": "effect", "class": "EffHeal", "patterns": ["heal %region%"]}, "Unknown Skript type"),
+    ({"kind": "expression", "class": "ExprX", "patterns": ["x"]}, "return_type"),
+])
+def test_invalid_spec_entries_are_reported(tmp_path, entry, message):
+    with pytest.raises(ValueError, match=message):
+        load_spec(write_spec(tmp_path / "spec.json", [entry]))
+
+
+def test_duplicate_classes_are_reported(tmp_path):
+    with pytest.raises(ValueError, match="defined twice"):
+        load_spec(write_spec(tmp_path / "spec.json", [HEAL, HEAL]))
+
+
+def test_every_pattern_fills_its_own_fields():
+    spec = parse_element(IN_REGION, SKRIPT_TYPES)
+    assert [field for field, _ in spec.expressions] == ["players", "world", "player", "location"]
+    assert spec.layouts == (("players", "world"), ("player", "location", "world"), ("players", "world"))
+
+    java = Templates.get_element(PACKAGE, spec)
+    assert ("            case 0:\n            case 2:\n"
+            "                players = (Expression<Player>) exprs[0];\n"
+            "                world = (Expression<World>) exprs[1];\n"
+            "                break;\n"
+            "            case 1:\n"
+            "                player = (Expression<Player>) exprs[0];\n"
+            "                location = (Expression<Location>) exprs[1];\n"
+            "                world = (Expression<World>) exprs[2];\n") in java
+    assert "setNegated(matchedPattern >= 2);" in java
+    # Fields that some patterns leave unset must not be dereferenced blindly
+    assert '(location == null ? "" : " " + location.toString(e, debug))' in java
+    assert '" " + world.toString(e, debug)' in java
+
+
+def test_to_string_survives_names_that_look_like_java():
+    spec = parse_element({**HEAL, "name": "Heal) + (by"}, SKRIPT_TYPES)
+    java = Templates.get_element(PACKAGE, spec)
+    assert 'return "heal) + (by " + players.toString(e, debug) + " " + number.toString(e, debug);' in java
+
+
+def test_documentation_annotations_and_todo():
+    with_examples = Templates.get_element(PACKAGE, parse_element(HEAL, SKRIPT_TYPES))
+    assert '@Examples("heal all players by 5")' in with_examples
+    assert "import ch.njol.skript.doc.Examples;" in with_examples
+    assert with_examples.count("TODO") == 1
+
+    without = Templates.get_element(PACKAGE, parse_element({**HEAL, "examples": []}, SKRIPT_TYPES))
+    assert "Examples" not in without
+
+
+def test_state_file_tracks_added_unchanged_conflicts_and_obsolete(tmp_path):
+    specs = [parse_element(entry, SKRIPT_TYPES) for entry in (HEAL, IN_REGION)]
+    assert statuses(generate_elements(tmp_path, specs, PACKAGE)) == {
+        "EffHeal.java": ADDED, "CondInRegion.java": ADDED}
+    state = json.loads((tmp_path / ELEMENTS_STATE_PATH).read_text(encoding="utf-8"))
+    assert sorted(state["files"]) == [f"{DIRECTORY}/CondInRegion.java", f"{DIRECTORY}/EffHeal.java"]
+
+    assert set(statuses(generate_elements(tmp_path, specs, PACKAGE)).values()) == {UNCHANGED}
+
+    edited = tmp_path / DIRECTORY / "EffHeal.java"
+    edited.write_text("// my implementation\n", encoding="utf-8")
+    changed = [parse_element({**HEAL, "since": "2.0.0"}, SKRIPT_TYPES)]
+    assert statuses(generate_elements(tmp_path, changed, PACKAGE)) == {
+        "EffHeal.java": CONFLICT, "CondInRegion.java": OBSOLETE}
+    assert edited.read_text(encoding="utf-8") == "// my implementation\n"
+
+    assert statuses(generate_elements(tmp_path, changed, PACKAGE, force=True))["EffHeal.java"] == UPDATED
+    assert '@Since("2.0.0")' in edited.read_text(encoding="utf-8")
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    results = generate_elements(tmp_path, [parse_element(HEAL, SKRIPT_TYPES)], PACKAGE, dry_run=True)
+    assert statuses(results) == {"EffHeal.java": ADDED}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_process_pool_matches_in_process_output(tmp_path, monkeypatch):
+    specs = [parse_element({**HEAL, "class": f"EffHeal{number}"}, SKRIPT_TYPES) for number in range(20)]
+    generate_elements(tmp_path / "serial", specs, PACKAGE, workers=1)
+    monkeypatch.setattr(elements, "PARALLEL_THRESHOLD", 1)
+    results = generate_elements(tmp_path / "pool", specs, PACKAGE, workers=2)
+
+    assert [result.path for result in results] == [f"{DIRECTORY}/{spec.class_name}.java" for spec in specs]
+    assert {result.status for result in results} == {ADDED}
+    for name in ("serial", "pool"):
+        assert len(list((tmp_path / name / DIRECTORY).iterdir())) == 20
+    for spec in specs:
+        path = f"{DIRECTORY}/{spec.class_name}.java"
+        assert (tmp_path / "pool" / path).read_bytes() == (tmp_path / "serial" / path).read_bytes()
+    assert ((tmp_path / "pool" / ELEMENTS_STATE_PATH).read_bytes()
+            == (tmp_path / "serial" / ELEMENTS_STATE_PATH).read_bytes())
+
+
+def test_elements_of_a_timed_project_are_timed(tmp_path):
+    config = AddonConfig(addon_name="TestAddon", package_name=PACKAGE, element_timings=True)
+    write_project(render_project(config), tmp_path)
+    generate_elements(tmp_path, [parse_element(HEAL, SKRIPT_TYPES)])
+
+    java = (tmp_path / DIRECTORY / "EffHeal.java").read_text(encoding="utf-8")
+    assert f"extends {PACKAGE}.timings.TimedEffect" in java
+    assert "protected void executeTimed(" in java
+    assert "import ch.njol.skript.lang.Effect;" not in java
@@ -0,0 +1,111 @@
+import subprocess
+import pytest
+from addon_creator import AddonCreator
+from gitrepo import FastPathUnavailable, create_repository
+from project import AddonConfig, render_project, write_project
+from templates import Templates
+
+
+@pytest.fixture(autouse=True)
+def git_env(tmp_path, monkeypatch):
+    """Isolate git from the user's configuration and give it an identity."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.delenv("GIT_DEFAULT_HASH", raising=False)
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "test@example.com")
+
+
+def git(base, *args) -> str:
+    return subprocess.run(["git", *args], cwd=base, check=True, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE).stdout.decode()
+
+
+def project_files():
+    return render_project(AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon"))
+
+
+def test_repository_is_valid_and_clean(tmp_path):
+    base = tmp_path / "addon"
+    files = dict(project_files())
+    files["gradlew"] = b"#!/bin/sh\n"
+    write_project(files, base)
+
+    create_repository(base, files, "main", "https://example.com/addon.git")
+
+    git(base, "fsck", "--strict", "--no-dangling")
+    assert git(base, "status", "--porcelain") == ""
+    assert git(base, "rev-parse", "--abbrev-ref", "HEAD").strip() == "main"
+    assert git(base, "log", "--format=%an %s").strip() == "Test Initial commit"
+    assert sorted(git(base, "ls-files").split()) == sorted(files)
+    assert git(base, "ls-files", "-s", "gradlew").startswith("100755")
+    assert git(base, "remote", "get-url", "origin").strip() == "https://example.com/addon.git"
+
+
+def test_sha256_repository_is_left_to_git(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_DEFAULT_HASH", "sha256")
+    base = tmp_path / "addon"
+    files = project_files()
+    write_project(files, base)
+
+    with pytest.raises(FastPathUnavailable):
+        create_repository(base, files, "main")
+
+
+def test_init_git_falls_back_for_sha256_repositories(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_DEFAULT_HASH", "sha256")
+    base = tmp_path / "addon"
+    files = project_files()
+    write_project(files, base)
+
+    assert AddonCreator()._init_git(base, files)
+
+    assert git(base, "rev-parse", "--show-object-format").strip() == "sha256"
+    git(base, "fsck", "--strict", "--no-dangling")
+    assert git(base, "status", "--porcelain") == ""
+
+
+def test_gitignore_keeps_the_wrapper_jar(tmp_path):
+    (tmp_path / ".gitignore").write_text(Templates.get_gitignore())
+    git(tmp_path, "init", "-q")
+
+    def ignored(path):
+        return subprocess.run(["git", "check-ignore", "-q", path], cwd=tmp_path).returncode == 0
+
+    assert not ignored("gradle/wrapper/gradle-wrapper.jar")
+    assert ignored("libs/other.jar")
+    assert ignored("build/libs/TestAddon.jar")
+
+
+def test_both_init_paths_commit_the_same_tree(tmp_path):
+    files = dict(project_files())
+    files["gradle/wrapper/gradle-wrapper.jar"] = b"wrapper jar"
+    files["libs/other.jar"] = b"ignored jar"
+    files["build/output.txt"] = b"ignored build output"
+    trees = []
+    for single_pass in (True, False):
+        base = tmp_path / f"addon-{single_pass}"
+        write_project(files, base)
+
+        assert AddonCreator()._init_git(base, files if single_pass else None)
+
+        git(base, "fsck", "--strict", "--no-dangling")
+        assert git(base, "status", "--porcelain") == ""
+        trees.append(git(base, "rev-parse", "HEAD^{tree}"))
+    assert trees[0] == trees[1]
+    assert "gradle/wrapper/gradle-wrapper.jar" in git(base, "ls-files")
+
+
+def test_repository_with_commit_hooks_is_left_to_git(tmp_path, monkeypatch):
+    hooks = tmp_path / "hooks"
+    hooks.mkdir()
+    monkeypatch.setenv("GIT_CONFIG_COUNT", "1")
+    monkeypatch.setenv("GIT_CONFIG_KEY_0", "core.hooksPath")
+    monkeypatch.setenv("GIT_CONFIG_VALUE_0", str(hooks))
+    base = tmp_path / "addon"
+    files = project_files()
+    write_project(files, base)
+
+    with pytest.raises(FastPathUnavailable, match="hooks"):
+        create_repository(base, files, "main")
@@ -0,0 +1,109 @@
+import hashlib
+import io
+import sys
+import threading
+import zipfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import gradle_wrapper
+from gradle_wrapper import WrapperError, download_wrapper, load_wrapper
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="the fake Gradle is a shell script")
+
+# Stands in for bin/gradle: writes the files `gradle wrapper` would
+FAKE_GRADLE = """#!/bin/sh
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --gradle-version) version="$2"; shift ;;
+        --gradle-distribution-sha256-sum) sum="$2"; shift ;;
+    esac
+    shift
+done
+mkdir -p gradle/wrapper
+printf '#!/bin/sh\\n' > gradlew
+printf '@echo off\\r\\n' > gradlew.bat
+printf 'wrapper jar' > gradle/wrapper/gradle-wrapper.jar
+printf 'distributionSha256Sum=%s\\ndistributionUrl=https\\\\://services.gradle.org/distributions/gradle-%s-bin.zip\\n' \\
+    "$sum" "$version" > gradle/wrapper/gradle-wrapper.properties
+"""
+
+
+def sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture
+def distributions(tmp_path, monkeypatch):
+    """A local copy of services.gradle.org serving a fake Gradle 8.5."""
+    root = tmp_path / "distributions"
+    root.mkdir()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("gradle-8.5/bin/gradle", FAKE_GRADLE)
+    distribution = buffer.getvalue()
+    (root / "gradle-8.5-bin.zip").write_bytes(distribution)
+    (root / "gradle-8.5-bin.zip.sha256").write_text(sha256(distribution))
+    (root / "gradle-8.5-wrapper.jar.sha256").write_text(sha256(b"wrapper jar"))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=str(root)))
+    server.RequestHandlerClass.log_message = lambda *args: None
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setattr(gradle_wrapper, "DISTRIBUTIONS", f"http://127.0.0.1:{server.server_port}")
+    yield root
+    server.shutdown()
+    server.server_close()
+
+
+def test_downloaded_wrapper_is_verified_and_cached(tmp_path, distributions):
+    cache = tmp_path / "cache"
+
+    info = download_wrapper("8.5", cache=cache)
+
+    distribution_sha256 = (distributions / "gradle-8.5-bin.zip.sha256").read_text()
+    assert info.gradle_version == "8.5"
+    assert info.distribution_sha256 == distribution_sha256
+    files = load_wrapper("8.5", cache)
+    assert files["gradle/wrapper/gradle-wrapper.jar"] == b"wrapper jar"
+    assert f"distributionSha256Sum={distribution_sha256}" in files["gradle/wrapper/gradle-wrapper.properties"].decode()
+
+
+def test_distribution_with_the_wrong_checksum_is_rejected(tmp_path, distributions):
+    (distributions / "gradle-8.5-bin.zip.sha256").write_text("0" * 64)
+
+    with pytest.raises(WrapperError, match="checksum mismatch"):
+        download_wrapper("8.5", cache=tmp_path / "cache")
+    assert not (tmp_path / "cache").exists()
+
+
+def test_wrapper_jar_with_the_wrong_checksum_is_rejected(tmp_path, distributions):
+    (distributions / "gradle-8.5-wrapper.jar.sha256").write_text("0" * 64)
+
+    with pytest.raises(WrapperError, match="gradle-wrapper.jar checksum mismatch"):
+        download_wrapper("8.5", cache=tmp_path / "cache")
+
+
+def test_damaged_cache_is_detected(tmp_path, distributions):
+    cache = tmp_path / "cache"
+    info = download_wrapper("8.5", cache=cache)
+    digest = info.files["gradlew"]
+    (cache / "objects" / digest[:2] / digest[2:]).write_bytes(b"tampered")
+    load_wrapper.cache_clear()
+
+    with pytest.raises(WrapperError, match="damaged"):
+        load_wrapper("8.5", cache)
+
+
+def test_damaged_cache_leaves_projects_without_a_wrapper(tmp_path, distributions, monkeypatch, capsys):
+    import main
+
+    cache = tmp_path / "cache"
+    info = download_wrapper("8.5", cache=cache / "gradle-wrapper")
+    digest = info.files["gradlew"]
+    (cache / "gradle-wrapper" / "objects" / digest[:2] / digest[2:]).write_bytes(b"tampered")
+    monkeypatch.setenv("SKRIPT_ADDON_CREATOR_CACHE_DIR", str(cache))
+    load_wrapper.cache_clear()
+
+    assert main.cached_wrapper() is None
+    assert "without a Gradle wrapper" in capsys.readouterr().err
@@ -0,0 +1,162 @@
+import pytest
+from project import MANIFEST_PATH, AddonConfig, render_project
+
+
+def test_render_project_is_cached_and_includes_manifest():
+    config = AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon")
+    files = render_project(config)
+    assert render_project(config) is files
+    assert MANIFEST_PATH in files
+    assert "src/main/java/com/example/testaddon/TestAddon.java" in files
+
+
+@pytest.mark.parametrize("field", ["addon_name", "package_name", "impl", "java_version", "mc_version",
+                                   "skript_version", "gradle_jvm_args", "gradle_build_cache_dir"])
+def test_non_string_fields_are_rejected(field):
+    values = {"addon_name": "TestAddon", "package_name": "com.example.testaddon", field: 5}
+    with pytest.raises(ValueError, match=f"{field} must be a string"):
+        AddonConfig(**values)
+
+
+def test_invalid_addon_name_is_rejected():
+    with pytest.raises(ValueError):
+        AddonConfig(addon_name="1Addon", package_name="com.example.testaddon")
+
+
+@pytest.mark.parametrize("impl", ["paper", "spigot"])
+def test_effect_benchmark_does_not_load_the_effect(impl):
+    config = AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", impl=impl,
+                         optimized_effect=True)
+    files = render_project(config)
+    benchmark = files["src/test/java/com/example/testaddon/elements/EffExampleBenchmark.java"].decode()
+    broadcaster = files["src/main/java/com/example/testaddon/Broadcaster.java"].decode()
+    assert "EffExample." not in benchmark and "Broadcaster." in benchmark
+    assert "ch.njol.skript" not in broadcaster
+
+
+@pytest.mark.parametrize("impl, optimized", [("paper", False), ("paper", True), ("spigot", True)])
+def test_jmh_benchmarks_do_not_load_elements(impl, optimized):
+    config = AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", impl=impl,
+                         optimized_effect=optimized, jmh_benchmarks=True)
+    files = render_project(config)
+    benchmarks = [content.decode() for path, content in files.items() if path.startswith("src/jmh/")]
+    assert len(benchmarks) == 4
+    for benchmark in benchmarks:
+        assert "ch.njol.skript" not in benchmark
+        assert "new EffExample" not in benchmark and "new CondExample" not in benchmark
+        assert "new ExprExample" not in benchmark
+
+
+@pytest.mark.parametrize("impl, optimized", [("paper", False), ("paper", True), ("spigot", True)])
+def test_broadcasters_format_messages_like_send_message(impl, optimized):
+    config = AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", impl=impl,
+                         optimized_effect=optimized)
+    broadcaster = render_project(config)["src/main/java/com/example/testaddon/Broadcaster.java"].decode()
+    # The plain and batched variants hand the raw string to Player.sendMessage, which
+    # applies § color codes; the audience variant must parse it the same way
+    assert "ColorUtils" not in broadcaster and "MiniMessage" not in broadcaster
+    if "Audience" in broadcaster:
+        assert "LegacyComponentSerializer.legacySection().deserialize(msg)" in broadcaster
+    else:
+        assert "sendMessage(msg)" in broadcaster
+
+
+@pytest.mark.parametrize("cache_size", [1024, 0, 50])
+def test_color_utils_cache_size(cache_size):
+    config = AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", component_cache_size=cache_size)
+    files = render_project(config)
+    color_utils = files["src/main/java/com/example/testaddon/ColorUtils.java"].decode()
+    assert f"public static final int CACHE_SIZE = {cache_size};" in color_utils
+    assert "if (CACHE_SIZE <= 0) {" in color_utils
+    assert "src/test/java/com/example/testaddon/ColorUtilsBenchmark.java" in files
+    build = files["build.gradle.kts"].decode()
+    assert 'tasks.register<JavaExec>("benchmarkColorUtils")' in build
+    assert 'mainClass.set("com.example.testaddon.ColorUtilsBenchmark")' in build
+    assert 'testImplementation("net.kyori:adventure-text-minimessage:' in build
+
+
+@pytest.mark.parametrize("cache_size", [-1, 1.5, "64", True])
+def test_invalid_color_utils_cache_sizes_are_rejected(cache_size):
+    with pytest.raises(ValueError, match="component_cache_size"):
+        AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", component_cache_size=cache_size)
+
+
+TIMINGS = [f"src/main/java/com/example/testaddon/timings/{name}.java" for name in
+           ("ElementTimings", "TimedEffect", "TimedCondition", "TimedPropertyExpression", "TimedExpression")]
+
+
+@pytest.mark.parametrize("impl, optimized", [("paper", False), ("paper", True), ("spigot", True)])
+def test_element_timings(impl, optimized):
+    config = AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", impl=impl,
+                         optimized_effect=optimized, element_timings=True)
+    files = render_project(config)
+    assert all(path in files for path in TIMINGS)
+    elements = "src/main/java/com/example/testaddon/elements"
+    effect = files[f"{elements}/EffExample.java"].decode()
+    assert "extends com.example.testaddon.timings.TimedEffect" in effect
+    assert "protected void executeTimed(" in effect
+    assert "extends com.example.testaddon.timings.TimedCondition" in files[f"{elements}/CondExample.java"].decode()
+    assert ("extends com.example.testaddon.timings.TimedPropertyExpression"
+            in files[f"{elements}/ExprExample.java"].decode())
+    main_class = files["src/main/java/com/example/testaddon/TestAddon.java"].decode()
+    assert 'com.example.testaddon.timings.ElementTimings.enable(this, "testaddon");' in main_class
+    plugin_yml = files["src/main/resources/plugin.yml"].decode()
+    assert "commands:\n  testaddon:\n" in plugin_yml and "usage: /testaddon timings [reset]" in plugin_yml
+
+
+def test_element_timings_are_off_by_default():
+    files = render_project(AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon"))
+    assert not any("/timings/" in path for path in files)
+    assert "timings" not in files["src/main/java/com/example/testaddon/TestAddon.java"].decode()
+    assert "commands:" not in files["src/main/resources/plugin.yml"].decode()
+    assert "Timed" not in files["src/main/java/com/example/testaddon/elements/EffExample.java"].decode()
+
+
+SHADOW_OPTIONS = {
+    "minimize_jar": ["minimize()"],
+    "relocate_dependencies": ["isEnableRelocation = true", 'relocationPrefix = "com.example.testaddon.libs"'],
+    "reproducible_jar": ["isPreserveFileTimestamps = false", "isReproducibleFileOrder = true"],
+}
+
+
+def shadow_jar_block(build):
+    start = build.index("tasks.shadowJar {")
+    return build[start:build.index("\n}\n", start)]
+
+
+@pytest.mark.parametrize("enabled", [(), ("minimize_jar",), ("relocate_dependencies",), ("reproducible_jar",),
+                                     tuple(SHADOW_OPTIONS)])
+def test_shadow_jar_options(enabled):
+    config = AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon",
+                         **{name: True for name in enabled})
+    build = render_project(config)["build.gradle.kts"].decode()
+    block = shadow_jar_block(build)
+    for name, lines in SHADOW_OPTIONS.items():
+        for line in lines:
+            assert (line in block) == (name in enabled)
+            # Only ever inside the shadowJar block
+            assert build.count(line) == (name in enabled)
+
+
+def test_jar_report():
+    plain = render_project(AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon"))
+    assert "JarReport" not in plain["build.gradle.kts"].decode()
+    assert "enableStart" not in plain["src/main/java/com/example/testaddon/TestAddon.java"].decode()
+
+    files = render_project(AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon",
+                                       jar_report=True))
+    build = files["build.gradle.kts"].decode()
+    assert "abstract class JarReport : DefaultTask()" in build
+    assert 'tasks.register<JarReport>("jarReport")' in build
+    assert "jar.set(tasks.shadowJar.flatMap { it.archiveFile })" in build
+    # The task reads the enable time back from the server log
+    main_class = files["src/main/java/com/example/testaddon/TestAddon.java"].decode()
+    assert "long enableStart = System.nanoTime();" in main_class
+    assert "Addon has been enabled in %.2f ms" in main_class
+    assert "Addon has been enabled in ([0-9.,]+) ms" in build
+
+
+@pytest.mark.parametrize("field", ["minimize_jar", "relocate_dependencies", "reproducible_jar", "jar_report"])
+def test_non_boolean_jar_switches_are_rejected(field):
+    with pytest.raises(ValueError, match=f"{field} must be true or false"):
+        AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon", **{field: "yes"})
@@ -0,0 +1,119 @@
+import asyncio
+import io
+import json
+import time
+import zipfile
+import pytest
+import server
+from server import HTTPError, ScaffoldServer, VersionStore
+from versions import VersionCache
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("SKRIPT_ADDON_CREATOR_CACHE_DIR", str(tmp_path / "cache"))
+    store = VersionStore(VersionCache(), offline=True)
+    store.refresh()
+    return store
+
+
+def route(store, method, target, body=None, wrapper=False):
+    payload = json.dumps(body).encode() if body is not None else b""
+    return asyncio.run(ScaffoldServer(store, wrapper).route(method, target, payload))
+
+
+def error(store, method, target, body=None):
+    with pytest.raises(HTTPError) as raised:
+        route(store, method, target, body)
+    return raised.value.status, str(raised.value)
+
+
+def test_addon_route_returns_the_archive(store):
+    status, content_type, payload, headers = route(
+        store, "POST", "/addon?format=zip", {"addon_name": "TestAddon", "package_name": "com.example.testaddon"})
+
+    assert (status, content_type) == (200, "application/zip")
+    assert headers["Content-Disposition"] == 'attachment; filename="TestAddon.zip"'
+    names = zipfile.ZipFile(io.BytesIO(payload)).namelist()
+    assert "TestAddon/build.gradle.kts" in names
+    assert not any("gradle-wrapper" in name for name in names)
+    assert "X-Compatibility-Warning" not in headers
+
+
+def test_unknown_skript_lines_are_flagged(store):
+    _, _, _, headers = route(store, "POST", "/addon", {
+        "addon_name": "TestAddon", "package_name": "com.example.testaddon", "skript_version": "2.99.0"})
+
+    assert headers["X-Compatibility-Warning"].startswith("Skript 2.99.0 is not in the compatibility matrix")
+
+
+def test_versions_route_reports_the_store(store):
+    status, _, payload, _ = route(store, "GET", "/versions")
+
+    assert status == 200
+    assert set(json.loads(payload)) == set(store.versions[0])
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"addon_name": "TestAddon", "package_name": "com.example.testaddon", "mc_version": 5},
+     "mc_version must be a string"),
+    ({"addon_name": "TestAddon", "package_name": "com.example.testaddon", "mc_version": ""},
+     "mc_version must not be empty"),
+    ({"addon_name": "TestAddon", "package_name": "com.example.testaddon", "color": "red"},
+     "Unknown config keys: color"),
+    ([1, 2], "Config must be a JSON object"),
+    ({"addon_name": "1Bad", "package_name": "com.example.testaddon"}, "Addon name must"),
+])
+def test_invalid_configs_are_rejected(store, body, message):
+    status, text = error(store, "POST", "/addon", body)
+
+    assert status == 400
+    assert text.startswith(message)
+
+
+def test_unknown_routes_and_methods(store):
+    assert error(store, "GET", "/nothing")[0] == 404
+    assert error(store, "GET", "/addon")[0] == 405
+    assert error(store, "POST", "/addon?format=rar", {})[0] == 400
+
+
+def test_rendering_doesnt_block_other_connections(store, monkeypatch):
+    def slow_render(config, archive_format, wrapper=True):
+        time.sleep(0.5)
+        return b"archive"
+
+    monkeypatch.setattr(server, "render_archive", slow_render)
+
+    async def request(port, head, body=b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head.encode() + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return time.perf_counter(), response
+
+    async def main():
+        service = await asyncio.start_server(ScaffoldServer(store, False).handle, "127.0.0.1", 0)
+        port = service.sockets[0].getsockname()[1]
+        body = json.dumps({"addon_name": "TestAddon", "package_name": "com.example.testaddon"}).encode()
+        addon = asyncio.ensure_future(request(
+            port, f"POST /addon HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n", body))
+        await asyncio.sleep(0.05)
+        health = await request(port, "GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+        done = await addon
+        service.close()
+        await service.wait_closed()
+        return health, done
+
+    (health_at, health), (addon_at, addon) = asyncio.run(main())
+    assert health.startswith(b"HTTP/1.1 200") and addon.startswith(b"HTTP/1.1 200")
+    assert health_at < addon_at
+
+
+def test_refresh_swaps_all_versions_at_once(store):
+    before = store.versions
+    store.refresh()
+
+    assert store.versions is not before
+    results, defaults, indexes = store.versions
+    assert set(defaults) == set(indexes) == {"mc_version", "skript_version"}
@@ -0,0 +1,110 @@
+"""Startup-time regression checks for the CLI entry point.
+
+Runs ``python -X importtime`` on everything that happens before the first
+prompt (importing main, creating an AddonCreator, importing inquirer for the
+prompt) and fails when that import time exceeds the budget, or when the tool
+imports a module that must stay lazy (requests, archive formats, process
+pools, ...) at startup. The budget can be changed with STARTUP_BUDGET_MS. For
+a breakdown of the slowest imports, run:
+
+    python tests/test_startup.py --budget-ms 250
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Import time allowed before the first prompt; inquirer is most of it
+BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 250))
+
+# Cold starts per check; the fastest one counts
+RUNS = 3
+
+# Modules only specific commands or cache misses may import
+LAZY_MODULES = ["requests", "urllib3", "concurrent.futures", "zipfile", "tarfile", "multiprocessing",
+                "dataclasses", "batch", "server", "project", "gitrepo", "elements"]
+
+# inquirer pulls in asyncio and subprocess through blessed, so those are only
+# checked up to the point the first prompt imports it
+STARTUP = f"""
+import sys
+preloaded = set(sys.modules)
+sys.path.insert(0, {str(SRC)!r})
+import main
+creator = main.AddonCreator()
+eager = sorted(name for name in {LAZY_MODULES + ["asyncio", "subprocess"]!r}
+               if name in sys.modules and name not in preloaded)
+import inquirer
+creator.theme
+import json
+print(json.dumps(eager))
+"""
+
+# Imported by the interpreter itself (site may load sitecustomize and .pth
+# hooks) before the tool runs
+INTERPRETER_MODULES = ("site",)
+
+
+def measure():
+    """Run one cold start; return (import time in us, per-module cumulative us, eager lazy modules)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        cumulative = int(cumulative)
+        module = name.strip()
+        modules[module] = cumulative
+        # Top-level imports are not indented
+        if not name[1:].startswith(" ") and module not in INTERPRETER_MODULES:
+            total += cumulative
+    return total, modules, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def fastest(runs: int = RUNS):
+    return min((measure() for _ in range(runs)), key=lambda run: run[0])
+
+
+def test_lazy_modules_are_not_imported_at_startup():
+    _, _, eager = measure()
+    assert eager == []
+
+
+def test_time_to_first_prompt_is_within_budget():
+    total, modules, _ = fastest()
+    slowest = sorted(modules.items(), key=lambda item: -item[1])[:5]
+    assert total / 1000 <= BUDGET_MS, f"{total / 1000:.1f} ms to the first prompt, slowest: {slowest}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS,
+                        help="maximum import time before the first prompt")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to run; the fastest one counts")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to show")
+    args = parser.parse_args()
+
+    total, modules, eager = fastest(args.runs)
+    print(f"import time to first prompt: {total / 1000:.1f} ms (budget {args.budget_ms:g} ms, best of {args.runs})")
+    for module, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total / 1000 > args.budget_ms:
+        print(f"FAIL: startup import time over budget by {total / 1000 - args.budget_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+import threading
+import pytest
+import tracing
+from templates import Templates
+from tracing import NO_SPAN, format_summary, span, trace_methods, write_trace
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable()
+    yield tracer
+    tracing.disable()
+
+
+def test_spans_are_a_shared_no_op_when_disabled():
+    assert tracing.disable() is None
+    with span("render", "phase", size=1) as active:
+        active.set(result="ok")
+
+    assert active is NO_SPAN
+    assert span("other") is NO_SPAN
+
+
+def test_methods_are_only_wrapped_while_tracing():
+    original = Templates.__dict__["get_readme"]
+    trace_methods(Templates, ["get_readme"], "template")
+    assert Templates.__dict__["get_readme"] is original
+
+    tracer = tracing.enable()
+    try:
+        trace_methods(Templates, ["get_readme"], "template")
+        assert Templates.__dict__["get_readme"] is not original
+        assert Templates.get_readme("TestAddon") == Templates.get_readme.__wrapped__("TestAddon")
+    finally:
+        tracing.disable()
+
+    assert Templates.__dict__["get_readme"] is original
+    assert [(stats.name, stats.count) for stats in tracer.summary()] == [("Templates.get_readme", 1)]
+
+
+def test_spans_record_arguments_errors_and_threads(tracer):
+    with span("outer", "phase", size=1) as outer:
+        outer.set(result="ok")
+        with span("inner", "phase"):
+            pass
+    with pytest.raises(KeyError):
+        with span("failing", "phase"):
+            raise KeyError("missing")
+    worker = threading.Thread(target=lambda: span("threaded", "io").__enter__().__exit__(None, None, None),
+                              name="worker")
+    worker.start()
+    worker.join()
+
+    events = {event["name"]: event for event in tracer.events}
+    assert events["outer"]["args"] == {"size": 1, "result": "ok"}
+    assert "args" not in events["inner"]
+    assert events["outer"]["dur"] >= events["inner"]["dur"]
+    assert events["failing"]["args"] == {"error": "KeyError"}
+    assert tracer.threads[events["threaded"]["tid"]] == "worker"
+
+
+def test_trace_file_and_summary(tracer, tmp_path):
+    for _ in range(3):
+        with span("render", "template"):
+            pass
+    with span("write", "phase"):
+        pass
+
+    write_trace(tracer, str(tmp_path / "trace.json"))
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    complete = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert [event["name"] for event in complete] == ["render"] * 3 + ["write"]
+    assert any(event["ph"] == "M" and event["name"] == "thread_name" for event in trace["traceEvents"])
+
+    counts = {(stats.category, stats.name): stats.count for stats in tracer.summary()}
+    assert counts == {("template", "render"): 3, ("phase", "write"): 1}
+    table = format_summary(tracer).splitlines()
+    assert table[0].split() == ["span", "count", "total", "ms", "mean", "ms", "max", "ms"]
+    assert len(table) == 3
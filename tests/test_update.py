@@ -0,0 +1,110 @@
+import json
+import os
+import pytest
+from project import MANIFEST_PATH, AddonConfig, content_hash, render_project, write_project
+from update import ADDED, CONFLICT, OBSOLETE, UNCHANGED, UPDATED, update_project
+
+README = "README.md"
+PLUGIN_YML = "src/main/resources/plugin.yml"
+GRADLE_PROPERTIES = "gradle.properties"
+
+OLD = b"output of an older template\n"
+
+
+@pytest.fixture
+def project(tmp_path):
+    base = tmp_path / "addon"
+    write_project(render_project(AddonConfig(addon_name="TestAddon", package_name="com.example.testaddon")), base)
+    return base
+
+
+def edit_manifest(base, edit):
+    manifest = json.loads((base / MANIFEST_PATH).read_text(encoding="utf-8"))
+    edit(manifest["files"])
+    (base / MANIFEST_PATH).write_text(json.dumps(manifest), encoding="utf-8")
+
+
+def generated_by_older_template(base, path):
+    """Make ``path`` look like the unedited output of an older template version."""
+    (base / path).write_bytes(OLD)
+    edit_manifest(base, lambda files: files[path].update(sha256=content_hash(OLD)))
+
+
+def statuses(results):
+    return {result.path: result.status for result in results}
+
+
+def test_untouched_project_is_left_alone(project):
+    old = 1_000_000_000
+    for path in (README, PLUGIN_YML):
+        os.utime(project / path, (old, old))
+
+    results = update_project(project)
+
+    assert set(statuses(results).values()) == {UNCHANGED}
+    assert all(os.stat(project / path).st_mtime == old for path in (README, PLUGIN_YML))
+
+
+def test_unedited_file_with_changed_output_is_rewritten(project):
+    expected = (project / README).read_bytes()
+    generated_by_older_template(project, README)
+
+    assert statuses(update_project(project))[README] == UPDATED
+    assert (project / README).read_bytes() == expected
+    # The manifest now records the new output, so a second run has nothing to do
+    assert statuses(update_project(project))[README] == UNCHANGED
+
+
+def test_locally_modified_file_is_a_conflict_and_untouched(project):
+    generated_by_older_template(project, README)
+    (project / README).write_bytes(b"my own notes\n")
+
+    results = update_project(project)
+
+    assert statuses(results)[README] == CONFLICT
+    assert next(result for result in results if result.path == README).reason == "modified locally"
+    assert (project / README).read_bytes() == b"my own notes\n"
+    # Still a conflict on the next run
+    assert statuses(update_project(project))[README] == CONFLICT
+
+
+def test_locally_deleted_file_is_a_conflict_and_not_recreated(project):
+    generated_by_older_template(project, README)
+    (project / README).unlink()
+
+    assert statuses(update_project(project))[README] == CONFLICT
+    assert not (project / README).exists()
+
+
+def test_new_template_files_are_added_unless_the_path_is_taken(project):
+    expected = (project / PLUGIN_YML).read_bytes()
+    (project / PLUGIN_YML).unlink()
+    (project / GRADLE_PROPERTIES).write_bytes(b"org.gradle.daemon=false\n")
+
+    def forget(files):
+        del files[PLUGIN_YML]
+        del files[GRADLE_PROPERTIES]
+    edit_manifest(project, forget)
+
+    result = statuses(update_project(project))
+
+    assert result[PLUGIN_YML] == ADDED
+    assert (project / PLUGIN_YML).read_bytes() == expected
+    assert result[GRADLE_PROPERTIES] == CONFLICT
+    assert (project / GRADLE_PROPERTIES).read_bytes() == b"org.gradle.daemon=false\n"
+
+
+def test_files_no_longer_generated_are_reported_obsolete(project):
+    edit_manifest(project, lambda files: files.update({"src/Old.java": {"template": "old", "template_version": 1,
+                                                                       "sha256": content_hash(b"")}}))
+
+    assert statuses(update_project(project))["src/Old.java"] == OBSOLETE
+
+
+def test_dry_run_writes_nothing(project):
+    generated_by_older_template(project, README)
+    manifest = (project / MANIFEST_PATH).read_bytes()
+
+    assert statuses(update_project(project, dry_run=True))[README] == UPDATED
+    assert (project / README).read_bytes() == OLD
+    assert (project / MANIFEST_PATH).read_bytes() == manifest
@@ -0,0 +1,54 @@
+import pytest
+from version_index import VersionIndex
+
+MC = VersionIndex(["1.19.4", "1.20", "1.20.1", "1.20.4", "1.20.6", "1.21-pre1", "1.21", "24w14a", "1.8.9"])
+SKRIPT = VersionIndex(["2.7.3", "2.8.0", "2.8.1", "2.9.0-beta1", "2.9.0"], prereleases=["2.8.1"])
+
+
+def test_versions_are_sorted_newest_first():
+    assert MC.stable() == ["1.21", "1.20.6", "1.20.4", "1.20.1", "1.20", "1.19.4", "1.8.9"]
+    assert len(MC) == 9 and "1.20.4" in MC and "1.20.5" not in MC
+
+
+def test_prereleases_come_from_the_source_and_the_version_shape():
+    assert MC.prereleases == {"1.21-pre1", "24w14a"}
+    assert SKRIPT.prereleases == {"2.8.1", "2.9.0-beta1"}
+    assert SKRIPT.stable() == ["2.9.0", "2.8.0", "2.7.3"]
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("1.20", "1.20.6"),
+    (" 1.20 ", "1.20.6"),
+    ("1.20.4", "1.20.4"),
+    ("1.21", "1.21"),
+    ("1", "1.21"),
+    ("1.21-pre1", "1.21-pre1"),
+    ("1.22", None),
+])
+def test_resolve_prefers_the_newest_stable_release(spec, expected):
+    assert MC.resolve(spec) == expected
+
+
+def test_lines_with_only_prereleases_resolve_to_a_prerelease():
+    index = VersionIndex(["2.8.0", "2.9.0-beta1", "2.9.0-beta2"])
+    assert index.resolve("2.9") == "2.9.0-beta2"
+    assert index.latest("2.9") is None
+
+
+def test_latest_of_a_line():
+    assert MC.latest() == "1.21"
+    assert MC.latest("1.20.") == "1.20.6"
+    assert SKRIPT.latest("2.8") == "2.8.0"
+    assert SKRIPT.latest("2.8", stable=False) == "2.8.1"
+
+
+def test_search_lists_stable_matches_before_prereleases():
+    assert MC.search("1.2") == ["1.21", "1.20.6", "1.20.4", "1.20.1", "1.20", "1.21-pre1"]
+    assert MC.search("1.2", prereleases=False) == ["1.21", "1.20.6", "1.20.4", "1.20.1", "1.20"]
+    assert MC.search("1.2", limit=2) == ["1.21", "1.20.6"]
+
+
+def test_search_without_separators_and_fuzzy():
+    assert MC.search("1204") == ["1.20.4"]
+    assert MC.search("1.2.6") == ["1.20.6"]
+    assert MC.search("xyz") == []
@@ -0,0 +1,159 @@
+from pathlib import Path
+import json
+import subprocess
+import sys
+import time
+import pytest
+from addon_creator import AddonCreator
+from versions import (CACHE_SCHEMA, MINECRAFT, SKRIPT, STATUS_CACHED, STATUS_DEFAULT, STATUS_FETCHED,
+                      STATUS_NOT_MODIFIED, STATUS_STALE, VersionCache, VersionSource, _parse_paper_versions,
+                      fetch_all, fetch_versions)
+from stub_api import StubAPI
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    stub = StubAPI()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def source(api):
+    return VersionSource("minecraft", api.url, _parse_paper_versions, ["1.0"])
+
+
+def expire(cache: VersionCache, name: str):
+    cache.get(name)["fetched_at"] = time.time() - cache.ttl - 1
+
+
+def test_download_is_stored_with_its_etag(tmp_path, api, source):
+    cache = VersionCache(tmp_path / "versions.json")
+
+    result = fetch_versions(source, cache)
+
+    assert result.status == STATUS_FETCHED
+    assert result.versions == ["1.20.4", "1.20.2"]
+    stored = VersionCache(tmp_path / "versions.json").get("minecraft")
+    assert stored["versions"] == ["1.20.4", "1.20.2"]
+    assert stored["etag"] == '"v1"'
+
+
+def test_fresh_entry_needs_no_request(tmp_path, api, source):
+    cache = VersionCache(tmp_path / "versions.json")
+    fetch_versions(source, cache)
+    api.requests.clear()
+
+    assert fetch_versions(source, cache).status == STATUS_CACHED
+    assert api.requests == []
+
+
+def test_expired_entry_is_revalidated_with_a_304(tmp_path, api, source):
+    cache = VersionCache(tmp_path / "versions.json")
+    fetch_versions(source, cache)
+    expire(cache, "minecraft")
+    api.requests.clear()
+
+    result = fetch_versions(source, cache)
+
+    assert result.status == STATUS_NOT_MODIFIED
+    assert result.versions == ["1.20.4", "1.20.2"]
+    assert api.requests[0][1]["If-None-Match"] == '"v1"'
+    # The 304 restarts the TTL
+    assert cache.is_fresh(cache.get("minecraft"))
+
+
+def test_changed_list_is_downloaded_again(tmp_path, api, source):
+    cache = VersionCache(tmp_path / "versions.json")
+    fetch_versions(source, cache)
+    api.pages, api.etag = [{"versions": ["1.21", "1.20.4"]}], '"v2"'
+
+    result = fetch_versions(source, cache, refresh=True)
+
+    assert result.status == STATUS_FETCHED
+    assert result.versions == ["1.21", "1.20.4"]
+    assert cache.get("minecraft")["etag"] == '"v2"'
+
+
+def test_server_errors_fall_back_to_the_cache_or_defaults(tmp_path, api, source):
+    cache = VersionCache(tmp_path / "versions.json")
+    api.status = 500
+    assert fetch_versions(source, cache).status == STATUS_DEFAULT
+
+    api.status = 200
+    fetch_versions(source, cache)
+    expire(cache, "minecraft")
+    api.status = 500
+    result = fetch_versions(source, cache)
+    assert result.status == STATUS_STALE
+    assert result.versions == ["1.20.4", "1.20.2"]
+
+
+def test_offline_never_touches_the_network(tmp_path, api, source):
+    result = fetch_versions(source, VersionCache(tmp_path / "versions.json"), offline=True)
+
+    assert result.status == STATUS_DEFAULT
+    assert result.versions == ["1.0"]
+    assert api.requests == []
+
+
+def test_every_page_of_a_paginated_source_is_read(tmp_path, api):
+    api.pages = [[{"tag_name": "2.8.0", "prerelease": False}],
+                 [{"tag_name": "2.9.0-beta1", "prerelease": True}],
+                 [{"tag_name": "2.7.3", "prerelease": False}]]
+    source = SKRIPT._replace(url=api.url)
+
+    result = fetch_versions(source, VersionCache(tmp_path / "versions.json"))
+
+    assert result.status == STATUS_FETCHED
+    assert result.versions == ["2.9.0-beta1", "2.8.0", "2.7.3"]
+    assert result.prereleases == ("2.9.0-beta1",)
+    assert len(api.requests) == 3
+
+
+@pytest.mark.parametrize("sources", [
+    [],
+    {"minecraft": ["1.20.4"]},
+    {"minecraft": {"versions": ["1.20.4"], "fetched_at": "yesterday", "prereleases": 3, "etag": 5}},
+])
+def test_damaged_cache_degrades_to_defaults_or_stale(tmp_path, api, source, sources):
+    path = tmp_path / "versions.json"
+    path.write_text(json.dumps({"schema": CACHE_SCHEMA, "sources": sources}))
+    api.status = 500
+
+    result = fetch_all([source], VersionCache(path))["minecraft"]
+    assert result.status in (STATUS_DEFAULT, STATUS_STALE)
+    assert fetch_all([source], VersionCache(path), offline=True)["minecraft"].status in (STATUS_DEFAULT,
+                                                                                        STATUS_STALE)
+
+
+def test_slow_sources_miss_the_budget_without_delaying_exit(tmp_path):
+    # The fetch outlives the budget by far; the process must still exit right away
+    script = f"""
+import sys, time
+sys.path.insert(0, {str(SRC)!r})
+import versions
+versions.fetch_versions = lambda *args, **kwargs: time.sleep(5)
+result = versions.fetch_all([versions.MINECRAFT], versions.VersionCache({str(tmp_path / "versions.json")!r}),
+                            budget=0.2)["minecraft"]
+print(result.status, result.timed_out)
+"""
+    start = time.monotonic()
+    output = subprocess.run([sys.executable, "-c", script], check=True, stdout=subprocess.PIPE, text=True).stdout
+
+    assert output.split() == [STATUS_DEFAULT, "True"]
+    assert time.monotonic() - start < 3
+
+
+def test_offline_without_cache_is_reported_as_such(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("SKRIPT_ADDON_CREATOR_CACHE_DIR", str(tmp_path))
+
+    AddonCreator(offline=True).version_report
+
+    output = capsys.readouterr().out
+    assert "offline, no cache" in output
+    assert "request failed" not in output
+    assert MINECRAFT.defaults[0] in AddonCreator(offline=True).mc_versions